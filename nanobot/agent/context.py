@@ -1,11 +1,11 @@
 """Context builder for assembling agent prompts."""
 
-import base64
-import mimetypes
+import asyncio
 import platform
 from pathlib import Path
 from typing import Any
 
+from nanobot.agent.images import DEFAULT_IMAGE_MAX_SIDE, ImageEncoder
 from nanobot.agent.memory import MemoryStore
 from nanobot.agent.skills import SkillsLoader
 
@@ -20,10 +20,11 @@ class ContextBuilder:
     
     BOOTSTRAP_FILES = ["AGENTS.md", "SOUL.md", "USER.md", "TOOLS.md", "IDENTITY.md"]
     
-    def __init__(self, workspace: Path):
+    def __init__(self, workspace: Path, image_max_side: int = DEFAULT_IMAGE_MAX_SIDE):
         self.workspace = workspace
         self.memory = MemoryStore(workspace)
         self.skills = SkillsLoader(workspace)
+        self.images = ImageEncoder(max_side=image_max_side)
     
     def build_system_prompt(self, skill_names: list[str] | None = None) -> str:
         """
@@ -120,7 +121,7 @@ When remembering something, write to {workspace_path}/memory/MEMORY.md"""
         
         return "\n\n".join(parts) if parts else ""
     
-    def build_messages(
+    async def build_messages(
         self,
         history: list[dict[str, Any]],
         current_message: str,
@@ -155,24 +156,19 @@ When remembering something, write to {workspace_path}/memory/MEMORY.md"""
         messages.extend(history)
 
         # Current message (with optional image attachments)
-        user_content = self._build_user_content(current_message, media)
+        user_content = await self._build_user_content(current_message, media)
         messages.append({"role": "user", "content": user_content})
 
         return messages
 
-    def _build_user_content(self, text: str, media: list[str] | None) -> str | list[dict[str, Any]]:
-        """Build user message content with optional base64-encoded images."""
+    async def _build_user_content(self, text: str, media: list[str] | None) -> str | list[dict[str, Any]]:
+        """Build user message content with optional base64-encoded images (resized and cached)."""
         if not media:
             return text
         
-        images = []
-        for path in media:
-            p = Path(path)
-            mime, _ = mimetypes.guess_type(path)
-            if not p.is_file() or not mime or not mime.startswith("image/"):
-                continue
-            b64 = base64.b64encode(p.read_bytes()).decode()
-            images.append({"type": "image_url", "image_url": {"url": f"data:{mime};base64,{b64}"}})
+        # Reading, resizing and base64-encoding photos would stall the event loop
+        urls = await asyncio.to_thread(lambda: [self.images.data_url(path) for path in media])
+        images = [{"type": "image_url", "image_url": {"url": url}} for url in urls if url]
         
         if not images:
             return text
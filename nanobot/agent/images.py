@@ -0,0 +1,137 @@
+"""Image preparation for vision models: downscale, recompress, cache."""
+
+import base64
+import hashlib
+import io
+import mimetypes
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from loguru import logger
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+    Image = None
+    ImageOps = None
+
+# Longest edge providers actually use; anything larger is downscaled server-side anyway.
+DEFAULT_IMAGE_MAX_SIDE = 2048
+_MODEL_MAX_SIDE = {
+    "claude": 1568,
+    "anthropic": 1568,
+    "gemini": 3072,
+}
+# Images under this size and resolution are sent as they are.
+_PASSTHROUGH_BYTES = 512 * 1024
+_JPEG_QUALITY = 85
+
+
+def max_image_side(model: str) -> int:
+    """Longest image edge worth sending to ``model``."""
+    name = model.lower()
+    for marker, side in _MODEL_MAX_SIDE.items():
+        if marker in name:
+            return side
+    return DEFAULT_IMAGE_MAX_SIDE
+
+
+class ImageEncoder:
+    """
+    Turns image files into ``data:`` URLs sized for the model.
+
+    Large images are downscaled to ``max_side`` on their longest edge and
+    re-encoded (JPEG, or PNG when there is transparency). Results are kept
+    in an LRU cache keyed by content hash, so the same photo is processed
+    once no matter how many turns refer to it. Without Pillow the original
+    bytes are sent, still cached.
+
+    ``data_url`` is safe to call from worker threads.
+    """
+
+    _warned_no_pil = False
+
+    def __init__(self, max_side: int = DEFAULT_IMAGE_MAX_SIDE, cache_bytes: int = 64 * 1024 * 1024):
+        self.max_side = max_side
+        self.cache_bytes = cache_bytes
+        self._cache: OrderedDict[str, str] = OrderedDict()  # sha256 -> data URL
+        self._cached_bytes = 0
+        self._digests: dict[tuple[str, int, int], str] = {}  # (path, size, mtime) -> sha256
+        self._lock = threading.Lock()
+        if not PIL_AVAILABLE and not ImageEncoder._warned_no_pil:
+            ImageEncoder._warned_no_pil = True
+            logger.warning("Pillow is not installed; images are sent to the model without resizing")
+
+    def data_url(self, path: str | Path) -> str | None:
+        """``data:`` URL for an image file, or None if it is not a readable image."""
+        p = Path(path)
+        mime, _ = mimetypes.guess_type(str(p))
+        if not mime or not mime.startswith("image/"):
+            return None
+        try:
+            st = p.stat()
+        except OSError:
+            return None
+        stat_key = (str(p), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            digest = self._digests.get(stat_key)
+            if digest and (url := self._cached(digest)):
+                return url
+
+        try:
+            raw = p.read_bytes()
+        except OSError:
+            return None
+        digest = hashlib.sha256(raw).hexdigest()
+        with self._lock:
+            if len(self._digests) > 4096:
+                self._digests.clear()
+            self._digests[stat_key] = digest
+            if url := self._cached(digest):
+                return url
+
+        mime, data = self._prepare(raw, mime)
+        url = f"data:{mime};base64,{base64.b64encode(data).decode()}"
+        with self._lock:
+            return self._remember(digest, url)
+
+    def _prepare(self, raw: bytes, mime: str) -> tuple[str, bytes]:
+        if not PIL_AVAILABLE or mime == "image/gif":
+            return mime, raw
+        try:
+            with Image.open(io.BytesIO(raw)) as img:
+                oversized = max(img.size) > self.max_side
+                if not oversized and len(raw) <= _PASSTHROUGH_BYTES:
+                    return mime, raw
+                img = ImageOps.exif_transpose(img)
+                img.thumbnail((self.max_side, self.max_side), Image.LANCZOS)
+                out = io.BytesIO()
+                if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+                    img.save(out, format="PNG", optimize=True)
+                    encoded = ("image/png", out.getvalue())
+                else:
+                    img.convert("RGB").save(out, format="JPEG", quality=_JPEG_QUALITY, optimize=True)
+                    encoded = ("image/jpeg", out.getvalue())
+        except Exception as e:
+            logger.warning(f"Could not preprocess image, sending original: {e}")
+            return mime, raw
+        return encoded if oversized or len(encoded[1]) < len(raw) else (mime, raw)
+
+    def _cached(self, digest: str) -> str | None:
+        url = self._cache.get(digest)
+        if url:
+            self._cache.move_to_end(digest)
+        return url
+
+    def _remember(self, digest: str, url: str) -> str:
+        if existing := self._cached(digest):
+            return existing  # another thread encoded the same image meanwhile
+        self._cache[digest] = url
+        self._cached_bytes += len(url)
+        while self._cached_bytes > self.cache_bytes and len(self._cache) > 1:
+            _, old = self._cache.popitem(last=False)
+            self._cached_bytes -= len(old)
+        return url
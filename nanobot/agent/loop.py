@@ -2,15 +2,18 @@
 
 import asyncio
 import json
+import uuid
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
-from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.events import PRIORITY_SCHEDULED, InboundMessage, OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.providers.base import LLMProvider
 from nanobot.agent.context import ContextBuilder
+from nanobot.agent.images import max_image_side
+from nanobot.agent.tools.base import ToolContext
 from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, EditFileTool, ListDirTool
 from nanobot.agent.tools.shell import ExecTool
@@ -22,6 +25,9 @@ from nanobot.agent.subagent import SubagentManager
 from nanobot.security.policy import ToolPolicy
 from nanobot.session.manager import SessionManager
 
+if TYPE_CHECKING:
+    from nanobot.config.schema import SubagentConfig
+
 
 class AgentLoop:
     """
@@ -49,6 +55,8 @@ class AgentLoop:
         session_manager: SessionManager | None = None,
         blocked_tools: list[str] | None = None,
         allowed_tools: list[str] | None = None,
+        subagent_config: "SubagentConfig | None" = None,
+        image_max_side: int = 0,
     ):
         from nanobot.config.schema import ExecToolConfig
         from nanobot.cron.service import CronService
@@ -66,7 +74,9 @@ class AgentLoop:
             allowed_tools=allowed_tools,
         )
         
-        self.context = ContextBuilder(workspace)
+        self.context = ContextBuilder(
+            workspace, image_max_side=image_max_side or max_image_side(self.model)
+        )
         self.sessions = session_manager or SessionManager(workspace)
         self.tools = ToolRegistry()
         self.subagents = SubagentManager(
@@ -79,9 +89,12 @@ class AgentLoop:
             restrict_to_workspace=restrict_to_workspace,
             blocked_tools=blocked_tools,
             allowed_tools=allowed_tools,
+            subagent_config=subagent_config,
         )
         
         self._running = False
+        # Callers awaiting a turn they queued via process_scheduled().
+        self._waiters: dict[str, asyncio.Future[OutboundMessage | None]] = {}
         self._register_default_tools()
     
     def _register_default_tools(self) -> None:
@@ -137,19 +150,41 @@ class AgentLoop:
                     timeout=1.0
                 )
                 
+                request_id = msg.metadata.get("_request_id")
+                waiter = self._waiters.pop(request_id, None) if request_id else None
+                if request_id and (waiter is None or waiter.done()):
+                    # Its caller gave up (timeout/cancel) before the turn started.
+                    logger.info(f"Skipping scheduled turn {request_id}: caller no longer waiting")
+                    self.bus.ack_inbound(msg)
+                    continue
+                
                 # Process it
                 try:
                     response = await self._process_message(msg)
-                    if response:
+                    if waiter:
+                        if not waiter.done():
+                            waiter.set_result(response)
+                        else:
+                            logger.info(
+                                f"Dropping response to scheduled turn {request_id}: "
+                                "caller no longer waiting"
+                            )
+                    elif response:
                         await self.bus.publish_outbound(response)
                 except Exception as e:
                     logger.error(f"Error processing message: {e}")
-                    # Send error response
-                    await self.bus.publish_outbound(OutboundMessage(
-                        channel=msg.channel,
-                        chat_id=msg.chat_id,
-                        content=f"Sorry, I encountered an error: {str(e)}"
-                    ))
+                    if waiter:
+                        if not waiter.done():
+                            waiter.set_exception(e)
+                    else:
+                        # Send error response
+                        await self.bus.publish_outbound(OutboundMessage(
+                            channel=msg.channel,
+                            chat_id=msg.chat_id,
+                            content=f"Sorry, I encountered an error: {str(e)}"
+                        ))
+                # The turn is saved (or answered with an error): never replay it.
+                self.bus.ack_inbound(msg)
             except asyncio.TimeoutError:
                 continue
     
@@ -179,21 +214,11 @@ class AgentLoop:
         # Get or create session
         session = self.sessions.get_or_create(msg.session_key)
         
-        # Update tool contexts
-        message_tool = self.tools.get("message")
-        if isinstance(message_tool, MessageTool):
-            message_tool.set_context(msg.channel, msg.chat_id)
-        
-        spawn_tool = self.tools.get("spawn")
-        if isinstance(spawn_tool, SpawnTool):
-            spawn_tool.set_context(msg.channel, msg.chat_id)
-        
-        cron_tool = self.tools.get("cron")
-        if isinstance(cron_tool, CronTool):
-            cron_tool.set_context(msg.channel, msg.chat_id)
+        # Tools see this turn's chat through the context, not shared state
+        tool_context = ToolContext(channel=msg.channel, chat_id=msg.chat_id)
         
         # Build initial messages (use get_history for LLM-formatted messages)
-        messages = self.context.build_messages(
+        messages = await self.context.build_messages(
             history=session.get_history(),
             current_message=msg.content,
             media=msg.media if msg.media else None,
@@ -204,6 +229,7 @@ class AgentLoop:
         # Agent loop
         iteration = 0
         final_content = None
+        usage: dict[str, int] = {}
         
         while iteration < self.max_iterations:
             iteration += 1
@@ -214,6 +240,8 @@ class AgentLoop:
                 tools=self.tools.get_definitions(),
                 model=self.model
             )
+            for key, value in response.usage.items():
+                usage[key] = usage.get(key, 0) + (value or 0)
             
             # Handle tool calls
             if response.has_tool_calls:
@@ -241,7 +269,9 @@ class AgentLoop:
                     if not self.tool_policy.is_allowed(tool_call.name):
                         result = f"Error: {self.tool_policy.rejection_reason(tool_call.name)}"
                     else:
-                        result = await self.tools.execute(tool_call.name, tool_call.arguments)
+                        result = await self.tools.execute(
+                            tool_call.name, tool_call.arguments, tool_context
+                        )
                     messages = self.context.add_tool_result(
                         messages, tool_call.id, tool_call.name, result
                     )
@@ -268,7 +298,8 @@ class AgentLoop:
             channel=msg.channel,
             chat_id=msg.chat_id,
             content=final_content,
-            metadata=msg.metadata or {},  # Pass through for channel-specific needs (e.g. Slack thread_ts)
+            # Pass through for channel-specific needs (e.g. Slack thread_ts)
+            metadata={**(msg.metadata or {}), "_usage": usage},
         )
     
     async def _process_system_message(self, msg: InboundMessage) -> OutboundMessage | None:
@@ -294,21 +325,10 @@ class AgentLoop:
         session_key = f"{origin_channel}:{origin_chat_id}"
         session = self.sessions.get_or_create(session_key)
         
-        # Update tool contexts
-        message_tool = self.tools.get("message")
-        if isinstance(message_tool, MessageTool):
-            message_tool.set_context(origin_channel, origin_chat_id)
-        
-        spawn_tool = self.tools.get("spawn")
-        if isinstance(spawn_tool, SpawnTool):
-            spawn_tool.set_context(origin_channel, origin_chat_id)
-        
-        cron_tool = self.tools.get("cron")
-        if isinstance(cron_tool, CronTool):
-            cron_tool.set_context(origin_channel, origin_chat_id)
+        tool_context = ToolContext(channel=origin_channel, chat_id=origin_chat_id)
         
         # Build messages with the announce content
-        messages = self.context.build_messages(
+        messages = await self.context.build_messages(
             history=session.get_history(),
             current_message=msg.content,
             channel=origin_channel,
@@ -351,7 +371,9 @@ class AgentLoop:
                     if not self.tool_policy.is_allowed(tool_call.name):
                         result = f"Error: {self.tool_policy.rejection_reason(tool_call.name)}"
                     else:
-                        result = await self.tools.execute(tool_call.name, tool_call.arguments)
+                        result = await self.tools.execute(
+                            tool_call.name, tool_call.arguments, tool_context
+                        )
                     messages = self.context.add_tool_result(
                         messages, tool_call.id, tool_call.name, result
                     )
@@ -403,3 +425,61 @@ class AgentLoop:
         
         response = await self._process_message(msg)
         return response.content if response else ""
+    
+    async def process_scheduled(
+        self,
+        content: str,
+        session_key: str = "cli:direct",
+        channel: str = "cli",
+        chat_id: str = "direct",
+        usage: dict[str, int] | None = None,
+    ) -> str:
+        """
+        Queue a cron or heartbeat turn on the bus's scheduled lane and wait for it.
+        
+        Going through the bus lets live user messages take precedence over
+        background turns. Processes the turn inline when the loop is not
+        running (e.g. `cron run` from the CLI).
+        
+        Args:
+            content: The message content.
+            session_key: Session identifier.
+            channel: Source channel (for context).
+            chat_id: Source chat ID (for context).
+            usage: If given, filled with the turn's summed token usage.
+        
+        Returns:
+            The agent's response.
+        """
+        if not self._running:
+            response = await self._process_message(InboundMessage(
+                channel=channel, sender_id="user", chat_id=chat_id, content=content
+            ))
+        else:
+            request_id = uuid.uuid4().hex
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters[request_id] = waiter
+            try:
+                await self.bus.publish_inbound(InboundMessage(
+                    channel=channel,
+                    sender_id="user",
+                    chat_id=chat_id,
+                    content=content,
+                    metadata={"_request_id": request_id},
+                    priority=PRIORITY_SCHEDULED,
+                ))
+                response = await waiter
+            finally:
+                if waiter.cancelled() or not waiter.done():
+                    # Timed out or cancelled: the turn must not run (or be answered) later.
+                    waiter.cancel()
+                    await self.bus.inbound.remove(
+                        lambda m: m.metadata.get("_request_id") == request_id
+                    )
+                self._waiters.pop(request_id, None)
+        
+        if response is None:
+            return ""
+        if usage is not None:
+            usage.update(response.metadata.get("_usage", {}))
+        return response.content
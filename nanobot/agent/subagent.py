@@ -2,21 +2,51 @@
 
 import asyncio
 import json
+import time
 import uuid
+from collections import deque
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
-from nanobot.bus.events import InboundMessage
+from nanobot.bus.events import PRIORITY_SYSTEM, InboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.providers.base import LLMProvider
+from nanobot.agent.tools.base import ToolContext
 from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, EditFileTool, ListDirTool
 from nanobot.agent.tools.shell import ExecTool
 from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
 from nanobot.security.policy import ToolPolicy
 
+if TYPE_CHECKING:
+    from nanobot.config.schema import ExecToolConfig, SubagentConfig
+
+
+class _BudgetExceededError(Exception):
+    pass
+
+
+@dataclass
+class SubagentTask:
+    """A queued, running or finished background task."""
+    id: str
+    label: str
+    task: str
+    origin: dict[str, str]
+    status: str = "queued"  # queued | running | ok | error | timeout | cancelled
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    tokens: int = 0
+    handle: asyncio.Task[None] | None = field(default=None, repr=False)
+    
+    @property
+    def session_key(self) -> str:
+        return f"{self.origin['channel']}:{self.origin['chat_id']}"
+
 
 class SubagentManager:
     """
@@ -25,8 +55,16 @@ class SubagentManager:
     Subagents are lightweight agent instances that run in the background
     to handle specific tasks. They share the same LLM provider but have
     isolated context and a focused system prompt.
+    
+    Spawned tasks wait in a FIFO queue and start only while fewer than
+    ``max_concurrent`` subagents are running overall and fewer than
+    ``max_per_session`` for the spawning chat. Each run is bounded by a
+    timeout and a token budget, and can be cancelled while queued or running.
     """
     
+    # Finished tasks kept for status listing
+    HISTORY_SIZE = 50
+    
     def __init__(
         self,
         provider: LLMProvider,
@@ -38,8 +76,9 @@ class SubagentManager:
         restrict_to_workspace: bool = False,
         blocked_tools: list[str] | None = None,
         allowed_tools: list[str] | None = None,
+        subagent_config: "SubagentConfig | None" = None,
     ):
-        from nanobot.config.schema import ExecToolConfig
+        from nanobot.config.schema import ExecToolConfig, SubagentConfig
         self.provider = provider
         self.workspace = workspace
         self.bus = bus
@@ -51,7 +90,14 @@ class SubagentManager:
             blocked_tools=blocked_tools,
             allowed_tools=allowed_tools,
         )
+        self.config = subagent_config or SubagentConfig()
+        # Built once and shared by every subagent run; the tools hold no
+        # per-task state.
+        self.tools = self._build_tools()
+        self._tasks: dict[str, SubagentTask] = {}
+        self._pending: deque[SubagentTask] = deque()
         self._running_tasks: dict[str, asyncio.Task[None]] = {}
+        self._finished: deque[SubagentTask] = deque(maxlen=self.HISTORY_SIZE)
     
     async def spawn(
         self,
@@ -70,123 +116,203 @@ class SubagentManager:
             origin_chat_id: The chat ID to announce results to.
         
         Returns:
-            Status message indicating the subagent was started.
+            Status message indicating the subagent was started or queued.
         """
-        task_id = str(uuid.uuid4())[:8]
+        if len(self._pending) >= self.config.max_queued:
+            return (
+                f"Error: too many background tasks are waiting ({len(self._pending)}). "
+                "Wait for some to finish or cancel one first."
+            )
+        
         display_label = label or task[:30] + ("..." if len(task) > 30 else "")
+        record = SubagentTask(
+            id=str(uuid.uuid4())[:8],
+            label=display_label,
+            task=task,
+            origin={"channel": origin_channel, "chat_id": origin_chat_id},
+        )
+        self._tasks[record.id] = record
+        self._pending.append(record)
+        self._pump()
         
-        origin = {
-            "channel": origin_channel,
-            "chat_id": origin_chat_id,
-        }
+        if record.status == "running":
+            logger.info(f"Spawned subagent [{record.id}]: {display_label}")
+            return f"Subagent [{display_label}] started (id: {record.id}). I'll notify you when it completes."
+        logger.info(f"Queued subagent [{record.id}]: {display_label}")
+        return (
+            f"Subagent [{display_label}] queued (id: {record.id}, position {len(self._pending)}). "
+            "It will start when a slot frees up."
+        )
+    
+    def cancel(self, task_id: str, session_key: str | None = None) -> str:
+        """Cancel a queued or running subagent, only from ``session_key`` if given."""
+        record = self._tasks.get(task_id)
+        if record is None or (session_key is not None and record.session_key != session_key):
+            return f"Error: no active subagent with id {task_id}"
+        if record.status == "queued":
+            self._pending.remove(record)
+            self._finish(record, "cancelled")
+        elif record.handle is not None:
+            record.handle.cancel()
+        logger.info(f"Subagent [{task_id}] cancelled")
+        return f"Subagent [{record.label}] (id: {task_id}) cancelled."
+    
+    def list_tasks(self, session_key: str | None = None) -> list[SubagentTask]:
+        """Active tasks (running, then queued) followed by recently finished ones."""
+        tasks = [
+            *(t for t in self._tasks.values() if t.status == "running"),
+            *self._pending,
+            *reversed(self._finished),
+        ]
+        if session_key is not None:
+            tasks = [t for t in tasks if t.session_key == session_key]
+        return tasks
+    
+    def _pump(self) -> None:
+        """Start queued tasks while global and per-session slots are free."""
+        for record in list(self._pending):
+            if len(self._running_tasks) >= self.config.max_concurrent:
+                break
+            per_session = sum(
+                1 for t in self._tasks.values()
+                if t.status == "running" and t.session_key == record.session_key
+            )
+            if per_session >= self.config.max_per_session:
+                continue
+            self._pending.remove(record)
+            record.status = "running"
+            record.started_at = time.time()
+            record.handle = asyncio.create_task(self._run_subagent(record))
+            record.handle.add_done_callback(lambda _, r=record: self._on_done(r))
+            self._running_tasks[record.id] = record.handle
+    
+    def _on_done(self, record: SubagentTask) -> None:
+        # Covers tasks cancelled before their coroutine got to run.
+        if record.finished_at is None:
+            self._finish(record, "cancelled")
+            self._pump()
+    
+    def _finish(self, record: SubagentTask, status: str) -> None:
+        if record.finished_at is not None:
+            return
+        record.status = status
+        record.finished_at = time.time()
+        record.handle = None
+        self._tasks.pop(record.id, None)
+        self._running_tasks.pop(record.id, None)
+        self._finished.append(record)
+    
+    async def _run_subagent(self, record: SubagentTask) -> None:
+        """Run a task under its timeout, announce the result and start the next one."""
+        task_id, label, task, origin = record.id, record.label, record.task, record.origin
+        status = "error"
+        try:
+            result = await asyncio.wait_for(
+                self._execute(record), timeout=self.config.timeout_s or None
+            )
+            status = "ok"
+            logger.info(f"Subagent [{task_id}] completed successfully")
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except asyncio.TimeoutError:
+            status = "timeout"
+            result = f"Error: stopped after the {self.config.timeout_s}s time limit."
+            logger.warning(f"Subagent [{task_id}] timed out")
+        except _BudgetExceededError:
+            result = (
+                f"Error: stopped after using {record.tokens} tokens "
+                f"(budget {self.config.token_budget})."
+            )
+            logger.warning(f"Subagent [{task_id}] exceeded its token budget")
+        except Exception as e:
+            result = f"Error: {str(e)}"
+            logger.error(f"Subagent [{task_id}] failed: {e}")
+        finally:
+            self._finish(record, status)
+            self._pump()
+        await self._announce_result(task_id, label, task, result, origin, status)
+    
+    async def _execute(self, record: SubagentTask) -> str:
+        """The subagent's own tool loop; returns its final answer."""
+        task_id, label, task = record.id, record.label, record.task
+        logger.info(f"Subagent [{task_id}] starting task: {label}")
         
-        # Create background task
-        bg_task = asyncio.create_task(
-            self._run_subagent(task_id, task, display_label, origin)
+        tools = self.tools
+        tool_context = ToolContext(
+            channel=record.origin["channel"],
+            chat_id=record.origin["chat_id"],
+            deadline=(
+                time.monotonic() + self.config.timeout_s if self.config.timeout_s else None
+            ),
         )
-        self._running_tasks[task_id] = bg_task
         
-        # Cleanup when done
-        bg_task.add_done_callback(lambda _: self._running_tasks.pop(task_id, None))
+        # Build messages with subagent-specific prompt
+        system_prompt = self._build_subagent_prompt(task)
+        messages: list[dict[str, Any]] = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": task},
+        ]
         
-        logger.info(f"Spawned subagent [{task_id}]: {display_label}")
-        return f"Subagent [{display_label}] started (id: {task_id}). I'll notify you when it completes."
-    
-    async def _run_subagent(
-        self,
-        task_id: str,
-        task: str,
-        label: str,
-        origin: dict[str, str],
-    ) -> None:
-        """Execute the subagent task and announce the result."""
-        logger.info(f"Subagent [{task_id}] starting task: {label}")
+        # Run agent loop (limited iterations)
+        max_iterations = self.config.max_iterations
+        iteration = 0
+        final_result: str | None = None
         
-        try:
-            # Build subagent tools (no message tool, no spawn tool)
-            tools = ToolRegistry()
-            allowed_dir = self.workspace if self.restrict_to_workspace else None
-            self._register_if_allowed(tools, ReadFileTool(allowed_dir=allowed_dir))
-            self._register_if_allowed(tools, WriteFileTool(allowed_dir=allowed_dir))
-            self._register_if_allowed(tools, EditFileTool(allowed_dir=allowed_dir))
-            self._register_if_allowed(tools, ListDirTool(allowed_dir=allowed_dir))
-            self._register_if_allowed(tools, ExecTool(
-                working_dir=str(self.workspace),
-                timeout=self.exec_config.timeout,
-                restrict_to_workspace=self.restrict_to_workspace,
-                allowed_commands=self.exec_config.allowed_commands,
-            ))
-            self._register_if_allowed(tools, WebSearchTool(api_key=self.brave_api_key))
-            self._register_if_allowed(tools, WebFetchTool())
+        while iteration < max_iterations:
+            iteration += 1
             
-            # Build messages with subagent-specific prompt
-            system_prompt = self._build_subagent_prompt(task)
-            messages: list[dict[str, Any]] = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": task},
-            ]
+            response = await self.provider.chat(
+                messages=messages,
+                tools=tools.get_definitions(),
+                model=self.model,
+            )
+            record.tokens += response.usage.get("total_tokens", 0) or 0
+            if self.config.token_budget and record.tokens > self.config.token_budget:
+                raise _BudgetExceededError()
             
-            # Run agent loop (limited iterations)
-            max_iterations = 15
-            iteration = 0
-            final_result: str | None = None
-            
-            while iteration < max_iterations:
-                iteration += 1
-                
-                response = await self.provider.chat(
-                    messages=messages,
-                    tools=tools.get_definitions(),
-                    model=self.model,
-                )
+            if response.has_tool_calls:
+                # Add assistant message with tool calls
+                tool_call_dicts = [
+                    {
+                        "id": tc.id,
+                        "type": "function",
+                        "function": {
+                            "name": tc.name,
+                            "arguments": json.dumps(tc.arguments),
+                        },
+                    }
+                    for tc in response.tool_calls
+                ]
+                messages.append({
+                    "role": "assistant",
+                    "content": response.content or "",
+                    "tool_calls": tool_call_dicts,
+                })
                 
-                if response.has_tool_calls:
-                    # Add assistant message with tool calls
-                    tool_call_dicts = [
-                        {
-                            "id": tc.id,
-                            "type": "function",
-                            "function": {
-                                "name": tc.name,
-                                "arguments": json.dumps(tc.arguments),
-                            },
-                        }
-                        for tc in response.tool_calls
-                    ]
+                # Execute tools
+                for tool_call in response.tool_calls:
+                    args_str = json.dumps(tool_call.arguments)
+                    logger.debug(f"Subagent [{task_id}] executing: {tool_call.name} with arguments: {args_str}")
+                    if not self.tool_policy.is_allowed(tool_call.name):
+                        result = f"Error: {self.tool_policy.rejection_reason(tool_call.name)}"
+                    else:
+                        result = await tools.execute(
+                            tool_call.name, tool_call.arguments, tool_context
+                        )
                     messages.append({
-                        "role": "assistant",
-                        "content": response.content or "",
-                        "tool_calls": tool_call_dicts,
+                        "role": "tool",
+                        "tool_call_id": tool_call.id,
+                        "name": tool_call.name,
+                        "content": result,
                     })
-                    
-                    # Execute tools
-                    for tool_call in response.tool_calls:
-                        args_str = json.dumps(tool_call.arguments)
-                        logger.debug(f"Subagent [{task_id}] executing: {tool_call.name} with arguments: {args_str}")
-                        if not self.tool_policy.is_allowed(tool_call.name):
-                            result = f"Error: {self.tool_policy.rejection_reason(tool_call.name)}"
-                        else:
-                            result = await tools.execute(tool_call.name, tool_call.arguments)
-                        messages.append({
-                            "role": "tool",
-                            "tool_call_id": tool_call.id,
-                            "name": tool_call.name,
-                            "content": result,
-                        })
-                else:
-                    final_result = response.content
-                    break
-            
-            if final_result is None:
-                final_result = "Task completed but no final response was generated."
-            
-            logger.info(f"Subagent [{task_id}] completed successfully")
-            await self._announce_result(task_id, label, task, final_result, origin, "ok")
-            
-        except Exception as e:
-            error_msg = f"Error: {str(e)}"
-            logger.error(f"Subagent [{task_id}] failed: {e}")
-            await self._announce_result(task_id, label, task, error_msg, origin, "error")
+            else:
+                final_result = response.content
+                break
+        
+        if final_result is None:
+            final_result = "Task completed but no final response was generated."
+        return final_result
     
     async def _announce_result(
         self,
@@ -215,6 +341,7 @@ Summarize this naturally for the user. Keep it brief (1-2 sentences). Do not men
             sender_id="subagent",
             chat_id=f"{origin['channel']}:{origin['chat_id']}",
             content=announce_content,
+            priority=PRIORITY_SYSTEM,
         )
         
         await self.bus.publish_inbound(msg)
@@ -260,6 +387,24 @@ Skills are available at: {self.workspace}/skills/ (read SKILL.md files as needed
 
 When you have completed the task, provide a clear summary of your findings or actions."""
 
+    def _build_tools(self) -> ToolRegistry:
+        """Build the shared subagent tool set (no message tool, no spawn tool)."""
+        tools = ToolRegistry()
+        allowed_dir = self.workspace if self.restrict_to_workspace else None
+        self._register_if_allowed(tools, ReadFileTool(allowed_dir=allowed_dir))
+        self._register_if_allowed(tools, WriteFileTool(allowed_dir=allowed_dir))
+        self._register_if_allowed(tools, EditFileTool(allowed_dir=allowed_dir))
+        self._register_if_allowed(tools, ListDirTool(allowed_dir=allowed_dir))
+        self._register_if_allowed(tools, ExecTool(
+            working_dir=str(self.workspace),
+            timeout=self.exec_config.timeout,
+            restrict_to_workspace=self.restrict_to_workspace,
+            allowed_commands=self.exec_config.allowed_commands,
+        ))
+        self._register_if_allowed(tools, WebSearchTool(api_key=self.brave_api_key))
+        self._register_if_allowed(tools, WebFetchTool())
+        return tools.freeze()
+    
     def _register_if_allowed(self, tools: ToolRegistry, tool: Any) -> None:
         """Register a subagent tool only if policy allows it."""
         if self.tool_policy.is_allowed(tool.name):
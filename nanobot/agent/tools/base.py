@@ -1,9 +1,45 @@
 """Base class for agent tools."""
 
+import asyncio
+import time
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from typing import Any
 
 
+@dataclass
+class ToolContext:
+    """
+    Per-turn state handed to every tool call.
+    
+    One context is created for each agent turn and passed through
+    ``ToolRegistry.execute`` as the ``context`` keyword, so tools never need
+    to keep the current chat in instance fields and a single registry can
+    serve many turns at once.
+    """
+    channel: str = "cli"
+    chat_id: str = "direct"
+    # Monotonic time after which tool calls are refused.
+    deadline: float | None = None
+    cancelled: asyncio.Event = field(default_factory=asyncio.Event)
+    # (tool name, duration in ms, succeeded) for each call made in the turn.
+    calls: list[tuple[str, float, bool]] = field(default_factory=list)
+    
+    @property
+    def session_key(self) -> str:
+        return f"{self.channel}:{self.chat_id}"
+    
+    def remaining(self) -> float | None:
+        """Seconds left before the deadline, or None if there is none."""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+    
+    def cancel(self) -> None:
+        """Ask the turn to stop; later tool calls are refused."""
+        self.cancelled.set()
+
+
 class Tool(ABC):
     """
     Abstract base class for agent tools.
@@ -45,7 +81,8 @@ class Tool(ABC):
         Execute the tool with given parameters.
         
         Args:
-            **kwargs: Tool-specific parameters.
+            **kwargs: Tool-specific parameters. When run through a
+                ToolRegistry, ``context`` holds the turn's ToolContext.
         
         Returns:
             String result of the tool execution.
@@ -2,7 +2,7 @@
 
 from typing import Any, Callable, Awaitable
 
-from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.base import Tool, ToolContext
 from nanobot.bus.events import OutboundMessage
 
 
@@ -19,11 +19,6 @@ class MessageTool(Tool):
         self._default_channel = default_channel
         self._default_chat_id = default_chat_id
     
-    def set_context(self, channel: str, chat_id: str) -> None:
-        """Set the current message context."""
-        self._default_channel = channel
-        self._default_chat_id = chat_id
-    
     def set_send_callback(self, callback: Callable[[OutboundMessage], Awaitable[None]]) -> None:
         """Set the callback for sending messages."""
         self._send_callback = callback
@@ -62,10 +57,11 @@ class MessageTool(Tool):
         content: str, 
         channel: str | None = None, 
         chat_id: str | None = None,
+        context: ToolContext | None = None,
         **kwargs: Any
     ) -> str:
-        channel = channel or self._default_channel
-        chat_id = chat_id or self._default_chat_id
+        channel = channel or (context.channel if context else self._default_channel)
+        chat_id = chat_id or (context.chat_id if context else self._default_chat_id)
         
         if not channel or not chat_id:
             return "Error: No target channel/chat specified"
@@ -1,27 +1,50 @@
 """Tool registry for dynamic tool management."""
 
+import asyncio
+import time
 from typing import Any
 
-from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.base import Tool, ToolContext
 
 
 class ToolRegistry:
     """
     Registry for agent tools.
     
-    Allows dynamic registration and execution of tools.
+    Allows dynamic registration and execution of tools. Definitions are
+    built once and reused until the set of tools changes; a frozen registry
+    can be shared by many concurrent runs.
     """
     
     def __init__(self):
         self._tools: dict[str, Tool] = {}
+        self._definitions: list[dict[str, Any]] | None = None
+        self._frozen = False
     
     def register(self, tool: Tool) -> None:
         """Register a tool."""
+        self._check_mutable()
         self._tools[tool.name] = tool
+        self._definitions = None
     
     def unregister(self, name: str) -> None:
         """Unregister a tool by name."""
+        self._check_mutable()
         self._tools.pop(name, None)
+        self._definitions = None
+    
+    def freeze(self) -> "ToolRegistry":
+        """Disallow further changes, so the registry can be shared safely."""
+        self._frozen = True
+        return self
+    
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+    
+    def _check_mutable(self) -> None:
+        if self._frozen:
+            raise RuntimeError("Tool registry is frozen")
     
     def get(self, name: str) -> Tool | None:
         """Get a tool by name."""
@@ -32,16 +55,23 @@ class ToolRegistry:
         return name in self._tools
     
     def get_definitions(self) -> list[dict[str, Any]]:
-        """Get all tool definitions in OpenAI format."""
-        return [tool.to_schema() for tool in self._tools.values()]
+        """Get all tool definitions in OpenAI format (cached; do not mutate)."""
+        if self._definitions is None:
+            self._definitions = [tool.to_schema() for tool in self._tools.values()]
+        return self._definitions
     
-    async def execute(self, name: str, params: dict[str, Any]) -> str:
+    async def execute(
+        self, name: str, params: dict[str, Any], context: ToolContext | None = None
+    ) -> str:
         """
         Execute a tool by name with given parameters.
         
         Args:
             name: Tool name.
             params: Tool parameters.
+            context: The calling turn's context, passed on to the tool. Calls
+                are refused once it is cancelled or past its deadline, and
+                cut off when the deadline is reached.
         
         Returns:
             Tool execution result as string.
@@ -52,14 +82,31 @@ class ToolRegistry:
         tool = self._tools.get(name)
         if not tool:
             return f"Error: Tool '{name}' not found"
-
+        
+        context = context or ToolContext()
+        if context.cancelled.is_set():
+            return f"Error: {name} not run, the turn was cancelled"
+        remaining = context.remaining()
+        if remaining is not None and remaining <= 0:
+            return f"Error: {name} not run, the turn ran out of time"
+        
+        start = time.perf_counter()
+        ok = False
         try:
             errors = tool.validate_params(params)
             if errors:
                 return f"Error: Invalid parameters for tool '{name}': " + "; ".join(errors)
-            return await tool.execute(**params)
+            result = await asyncio.wait_for(
+                tool.execute(**{**params, "context": context}), timeout=remaining
+            )
+            ok = True
+            return result
+        except asyncio.TimeoutError:
+            return f"Error: {name} stopped, the turn ran out of time"
         except Exception as e:
             return f"Error executing {name}: {str(e)}"
+        finally:
+            context.calls.append((name, (time.perf_counter() - start) * 1000, ok))
     
     @property
     def tool_names(self) -> list[str]:
@@ -1,8 +1,9 @@
 """Spawn tool for creating background subagents."""
 
+import time
 from typing import Any, TYPE_CHECKING
 
-from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.base import Tool, ToolContext
 
 if TYPE_CHECKING:
     from nanobot.agent.subagent import SubagentManager
@@ -18,13 +19,6 @@ class SpawnTool(Tool):
     
     def __init__(self, manager: "SubagentManager"):
         self._manager = manager
-        self._origin_channel = "cli"
-        self._origin_chat_id = "direct"
-    
-    def set_context(self, channel: str, chat_id: str) -> None:
-        """Set the origin context for subagent announcements."""
-        self._origin_channel = channel
-        self._origin_chat_id = chat_id
     
     @property
     def name(self) -> str:
@@ -35,7 +29,9 @@ class SpawnTool(Tool):
         return (
             "Spawn a subagent to handle a task in the background. "
             "Use this for complex or time-consuming tasks that can run independently. "
-            "The subagent will complete the task and report back when done."
+            "The subagent will complete the task and report back when done. "
+            "Actions: spawn (default), list (show background tasks for this chat), "
+            "cancel (stop a task by id)."
         )
     
     @property
@@ -43,23 +39,61 @@ class SpawnTool(Tool):
         return {
             "type": "object",
             "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["spawn", "list", "cancel"],
+                    "description": "What to do (default: spawn)",
+                },
                 "task": {
                     "type": "string",
-                    "description": "The task for the subagent to complete",
+                    "description": "The task for the subagent to complete (for spawn)",
                 },
                 "label": {
                     "type": "string",
                     "description": "Optional short label for the task (for display)",
                 },
+                "task_id": {
+                    "type": "string",
+                    "description": "Subagent id (for cancel)",
+                },
             },
-            "required": ["task"],
         }
     
-    async def execute(self, task: str, label: str | None = None, **kwargs: Any) -> str:
-        """Spawn a subagent to execute the given task."""
+    async def execute(
+        self,
+        action: str = "spawn",
+        task: str | None = None,
+        label: str | None = None,
+        task_id: str | None = None,
+        context: ToolContext | None = None,
+        **kwargs: Any,
+    ) -> str:
+        """Spawn, list or cancel background subagents for the calling chat."""
+        context = context or ToolContext()
+        if action == "list":
+            return self._list(context.session_key)
+        if action == "cancel":
+            if not task_id:
+                return "Error: task_id is required for cancel"
+            return self._manager.cancel(task_id, session_key=context.session_key)
+        if action != "spawn":
+            return f"Unknown action: {action}"
+        if not task:
+            return "Error: task is required for spawn"
         return await self._manager.spawn(
             task=task,
             label=label,
-            origin_channel=self._origin_channel,
-            origin_chat_id=self._origin_chat_id,
+            origin_channel=context.channel,
+            origin_chat_id=context.chat_id,
         )
+    
+    def _list(self, session_key: str) -> str:
+        tasks = self._manager.list_tasks(session_key)
+        if not tasks:
+            return "No background tasks."
+        now = time.time()
+        lines = []
+        for t in tasks:
+            age = int(now - (t.started_at or t.created_at))
+            lines.append(f"- {t.label} (id: {t.id}): {t.status}, {age}s, {t.tokens} tokens")
+        return "Background tasks:\n" + "\n".join(lines)
@@ -4,6 +4,13 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 
+# Inbound priority classes, highest first. The bus serves them with weighted
+# fair scheduling so background traffic cannot starve live users.
+PRIORITY_INTERACTIVE = "interactive"  # Messages from humans on chat channels
+PRIORITY_SYSTEM = "system"  # Subagent announcements and other internal events
+PRIORITY_SCHEDULED = "scheduled"  # Cron and heartbeat turns
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_SYSTEM, PRIORITY_SCHEDULED)
+
 
 @dataclass
 class InboundMessage:
@@ -16,11 +23,41 @@ class InboundMessage:
     timestamp: datetime = field(default_factory=datetime.now)
     media: list[str] = field(default_factory=list)  # Media URLs
     metadata: dict[str, Any] = field(default_factory=dict)  # Channel-specific data
+    priority: str = PRIORITY_INTERACTIVE  # One of PRIORITIES
+    enqueued_at: float | None = None  # Epoch seconds, set by the bus on enqueue
+    wal_id: int | None = None  # Write-ahead log entry in durable bus mode
     
     @property
     def session_key(self) -> str:
         """Unique key for session identification."""
         return f"{self.channel}:{self.chat_id}"
+    
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to a JSON-compatible dict (for the WAL and worker IPC)."""
+        return {
+            "channel": self.channel,
+            "sender_id": self.sender_id,
+            "chat_id": self.chat_id,
+            "content": self.content,
+            "timestamp": self.timestamp.isoformat(),
+            "media": self.media,
+            "metadata": self.metadata,
+            "priority": self.priority,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "InboundMessage":
+        """Rebuild a message produced by to_dict()."""
+        return cls(
+            channel=data["channel"],
+            sender_id=data["sender_id"],
+            chat_id=data["chat_id"],
+            content=data["content"],
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            media=data.get("media") or [],
+            metadata=data.get("metadata") or {},
+            priority=data.get("priority", PRIORITY_INTERACTIVE),
+        )
 
 
 @dataclass
@@ -33,5 +70,26 @@ class OutboundMessage:
     reply_to: str | None = None
     media: list[str] = field(default_factory=list)
     metadata: dict[str, Any] = field(default_factory=dict)
-
-
+    
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to a JSON-compatible dict (for worker IPC)."""
+        return {
+            "channel": self.channel,
+            "chat_id": self.chat_id,
+            "content": self.content,
+            "reply_to": self.reply_to,
+            "media": self.media,
+            "metadata": self.metadata,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "OutboundMessage":
+        """Rebuild a message produced by to_dict()."""
+        return cls(
+            channel=data["channel"],
+            chat_id=data["chat_id"],
+            content=data["content"],
+            reply_to=data.get("reply_to"),
+            media=data.get("media") or [],
+            metadata=data.get("metadata") or {},
+        )
@@ -0,0 +1,296 @@
+"""Unix-socket transport between the gateway front-end and agent worker processes."""
+
+import asyncio
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+
+from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.queue import InboundQueue, MessageBus
+
+# Frames are newline-delimited JSON objects with a "type" field:
+#   worker -> front: {"type": "hello", "shard": n}
+#   front -> worker: {"type": "inbound", "id": seq, "message": {...}}
+#   worker -> front: {"type": "outbound", "message": {...}}
+#   worker -> front: {"type": "ack", "id": seq}
+_STREAM_LIMIT = 64 * 1024 * 1024
+
+
+def shard_for(session_key: str, shards: int) -> int:
+    """
+    Pick the worker for a session by rendezvous hashing.
+
+    Every session always maps to the same worker for a given worker count,
+    which keeps per-session ordering, and changing the count only moves the
+    sessions of the added or removed worker.
+    """
+    if shards <= 1:
+        return 0
+    return max(range(shards), key=lambda i: zlib.crc32(f"{i}:{session_key}".encode()))
+
+
+async def _write_frame(writer: asyncio.StreamWriter, frame: dict[str, Any]) -> None:
+    writer.write(json.dumps(frame, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+    await writer.drain()
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> dict[str, Any] | None:
+    line = await reader.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+class _Shard:
+    """Front-end bookkeeping for one worker."""
+
+    def __init__(self, index: int, queue: InboundQueue):
+        self.index = index
+        self.queue = queue
+        self.in_flight: dict[int, InboundMessage] = {}
+        self.writer: asyncio.StreamWriter | None = None
+        self.wakeup = asyncio.Event()
+        self.process: asyncio.subprocess.Process | None = None
+
+
+class ShardRouter:
+    """
+    Front-end side of the multi-process gateway.
+
+    Consumes the front-end bus's inbound queue and forwards each message to
+    the worker chosen by ``shard_for(session_key)``. Responses coming back
+    from workers are published to the bus's outbound queue for the
+    ChannelManager. Messages stay "in flight" until the worker acknowledges
+    the finished turn; if a worker dies they are re-sent to its replacement.
+
+    Each worker has its own queue with the bus's bound, overflow policy and
+    priority weights, and at most ``max_in_flight`` messages are handed to a
+    worker at a time, so the gateway's back-pressure settings hold per
+    worker. A shard queue that is full with the ``block`` policy stops the
+    router, which in turn fills (and blocks) the front-end bus.
+    """
+
+    def __init__(
+        self,
+        bus: MessageBus,
+        socket_path: Path,
+        workers: int,
+        spawn_worker: Callable[[int], Awaitable[asyncio.subprocess.Process]],
+        restart_delay_s: float = 1.0,
+        max_in_flight: int = 4,
+    ):
+        self.bus = bus
+        self.socket_path = socket_path
+        self.workers = max(1, workers)
+        self.spawn_worker = spawn_worker
+        self.restart_delay_s = restart_delay_s
+        self.max_in_flight = max(1, max_in_flight)
+        self._shards = [
+            _Shard(i, InboundQueue(
+                maxsize=bus.inbound.maxsize,
+                policy=bus.inbound.policy,
+                weights=bus.inbound.weights,
+                wal=bus.wal,
+            ))
+            for i in range(self.workers)
+        ]
+        self._seq = 0
+        self._server: asyncio.AbstractServer | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._running = False
+
+    async def start(self) -> None:
+        """Listen on the socket, launch workers and start routing."""
+        self._running = True
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self.socket_path.unlink(missing_ok=True)
+        self._server = await asyncio.start_unix_server(
+            self._on_connect, path=str(self.socket_path), limit=_STREAM_LIMIT
+        )
+        os.chmod(self.socket_path, 0o600)
+        self._tasks.append(asyncio.create_task(self._route()))
+        for shard in self._shards:
+            self._tasks.append(asyncio.create_task(self._send_loop(shard)))
+            self._tasks.append(asyncio.create_task(self._supervise(shard)))
+        logger.info(f"Shard router started with {self.workers} worker(s) on {self.socket_path}")
+
+    async def stop(self) -> None:
+        """Stop routing and terminate the workers."""
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for shard in self._shards:
+            if shard.process and shard.process.returncode is None:
+                shard.process.terminate()
+                try:
+                    await asyncio.wait_for(shard.process.wait(), timeout=10)
+                except asyncio.TimeoutError:
+                    shard.process.kill()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        self.socket_path.unlink(missing_ok=True)
+
+    def get_status(self) -> dict[int, dict[str, Any]]:
+        """Per-worker connection state and load."""
+        return {
+            s.index: {
+                "connected": s.writer is not None,
+                "queued": s.queue.qsize(),
+                "in_flight": len(s.in_flight),
+                "pid": s.process.pid if s.process else None,
+            }
+            for s in self._shards
+        }
+
+    async def _route(self) -> None:
+        while True:
+            msg = await self.bus.consume_inbound()
+            shard = self._shards[shard_for(msg.session_key, self.workers)]
+            if not await shard.queue.put(msg):
+                self.bus.notify_busy(msg)
+
+    async def _send_loop(self, shard: _Shard) -> None:
+        while True:
+            while shard.writer is None or len(shard.in_flight) >= self.max_in_flight:
+                shard.wakeup.clear()
+                await shard.wakeup.wait()
+            msg = await shard.queue.get()
+            writer = shard.writer
+            if writer is None:
+                await shard.queue.requeue([msg])
+                continue
+            self._seq += 1
+            # In flight before the write, so a failed send is re-queued with the rest.
+            shard.in_flight[self._seq] = msg
+            try:
+                await _write_frame(
+                    writer, {"type": "inbound", "id": self._seq, "message": msg.to_dict()}
+                )
+            except (ConnectionError, RuntimeError) as e:
+                logger.warning(f"Worker {shard.index} send failed: {e}")
+                if shard.writer is writer:
+                    shard.writer = None
+
+    async def _supervise(self, shard: _Shard) -> None:
+        while self._running:
+            try:
+                shard.process = await self.spawn_worker(shard.index)
+                code = await shard.process.wait()
+                logger.warning(f"Worker {shard.index} exited with code {code}")
+            except Exception as e:
+                logger.error(f"Worker {shard.index} failed to start: {e}")
+            await self._requeue_in_flight(shard)
+            await asyncio.sleep(self.restart_delay_s)
+
+    async def _requeue_in_flight(self, shard: _Shard) -> None:
+        """Put unacknowledged messages back at the head of the queue, in order."""
+        shard.writer = None
+        pending = [shard.in_flight[seq] for seq in sorted(shard.in_flight)]
+        shard.in_flight.clear()
+        await shard.queue.requeue(pending)
+
+    async def _on_connect(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        shard: _Shard | None = None
+        try:
+            hello = await _read_frame(reader)
+            if not hello or hello.get("type") != "hello":
+                return
+            index = int(hello.get("shard", -1))
+            if not 0 <= index < self.workers:
+                logger.warning(f"Rejecting worker with unknown shard {index}")
+                return
+            shard = self._shards[index]
+            # A reconnecting worker lost whatever it had not acknowledged.
+            await self._requeue_in_flight(shard)
+            shard.writer = writer
+            shard.wakeup.set()
+            logger.info(f"Worker {index} connected")
+
+            while frame := await _read_frame(reader):
+                kind = frame.get("type")
+                if kind == "outbound":
+                    await self.bus.publish_outbound(OutboundMessage.from_dict(frame["message"]))
+                elif kind == "ack":
+                    msg = shard.in_flight.pop(int(frame["id"]), None)
+                    if msg is not None:
+                        self.bus.ack_inbound(msg)
+                        shard.wakeup.set()
+        except (ConnectionError, json.JSONDecodeError, ValueError) as e:
+            logger.warning(f"Worker connection error: {e}")
+        finally:
+            if shard is not None and shard.writer is writer:
+                shard.writer = None
+            writer.close()
+
+
+class WorkerBus(MessageBus):
+    """
+    MessageBus used inside an agent worker process.
+
+    Inbound messages arrive from the front-end over the socket, and
+    outbound messages and turn acknowledgements are sent back to it. Both go
+    through one frame queue in the order they were issued, so a turn's
+    replies always reach the front-end before its acknowledgement lets the
+    front-end forget the message.
+    """
+
+    def __init__(self, socket_path: Path, shard: int, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.socket_path = socket_path
+        self.shard = shard
+        self._frames: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        # id(msg) -> (msg, front-end sequence number)
+        self._seqs: dict[int, tuple[InboundMessage, int]] = {}
+
+    async def publish_outbound(self, msg: OutboundMessage) -> None:
+        self._frames.put_nowait({"type": "outbound", "message": msg.to_dict()})
+
+    def ack_inbound(self, msg: InboundMessage) -> None:
+        entry = self._seqs.pop(id(msg), None)
+        if entry is not None:
+            self._frames.put_nowait({"type": "ack", "id": entry[1]})
+        super().ack_inbound(msg)
+
+    async def run_link(self, connect_timeout_s: float = 30.0) -> None:
+        """Connect to the front-end and pump frames until the socket closes."""
+        reader, writer = await self._connect(connect_timeout_s)
+        await _write_frame(writer, {"type": "hello", "shard": self.shard})
+        logger.info(f"Worker {self.shard} linked to {self.socket_path}")
+        sender = asyncio.create_task(self._write_frames(writer))
+        try:
+            while frame := await _read_frame(reader):
+                if frame.get("type") == "inbound":
+                    msg = InboundMessage.from_dict(frame["message"])
+                    self._seqs[id(msg)] = (msg, int(frame["id"]))
+                    await self.publish_inbound(msg)
+        finally:
+            sender.cancel()
+            writer.close()
+
+    async def _connect(
+        self, timeout_s: float
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        deadline = asyncio.get_running_loop().time() + timeout_s
+        while True:
+            try:
+                return await asyncio.open_unix_connection(
+                    str(self.socket_path), limit=_STREAM_LIMIT
+                )
+            except (FileNotFoundError, ConnectionRefusedError):
+                if asyncio.get_running_loop().time() > deadline:
+                    raise
+                await asyncio.sleep(0.2)
+
+    async def _write_frames(self, writer: asyncio.StreamWriter) -> None:
+        while True:
+            frame = await self._frames.get()
+            await _write_frame(writer, frame)
@@ -1,53 +1,343 @@
 """Async message queue for decoupled channel-agent communication."""
 
 import asyncio
-from typing import Callable, Awaitable
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable
 
 from loguru import logger
 
-from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.events import (
+    PRIORITIES,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_SCHEDULED,
+    PRIORITY_SYSTEM,
+    InboundMessage,
+    OutboundMessage,
+)
+from nanobot.bus.wal import InboundWAL
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "coalesce", "busy")
+
+DEFAULT_PRIORITY_WEIGHTS = {
+    PRIORITY_INTERACTIVE: 6,
+    PRIORITY_SYSTEM: 2,
+    PRIORITY_SCHEDULED: 1,
+}
+
+DEFAULT_BUSY_MESSAGE = "I'm handling a lot of messages right now. Please try again in a moment."
+
+
+@dataclass
+class QueueMetrics:
+    """Counters describing inbound queue load."""
+    enqueued: int = 0
+    consumed: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    rejected: int = 0
+    blocked: int = 0
+    max_depth: int = 0
+    last_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+    total_wait_ms: float = 0.0
+
+    @property
+    def avg_wait_ms(self) -> float:
+        """Average time consumed messages spent in the queue."""
+        return self.total_wait_ms / self.consumed if self.consumed else 0.0
+
+
+class InboundQueue:
+    """
+    Inbound messages split into priority lanes, with an optional bound.
+
+    Each priority class (see ``nanobot.bus.events.PRIORITIES``) has its own
+    FIFO lane. ``get`` picks lanes by smooth weighted round-robin, so with the
+    default weights six interactive messages are served for every two system
+    and one scheduled message while all lanes are busy, and an idle lane never
+    holds others back.
+
+    When ``maxsize`` (counted across lanes) is reached the policy decides
+    what happens to an interactive message:
+
+    - ``block``: the producer waits until the agent frees a slot.
+    - ``drop_oldest``: the oldest queued interactive message of the same
+      session is discarded (or the oldest interactive message overall).
+    - ``coalesce``: the message is merged into the last queued message of the
+      same session so both are answered in one turn; otherwise it blocks.
+    - ``busy``: the message is rejected and the sender gets a busy notice.
+
+    System and scheduled messages have no one to notify and may have a caller
+    awaiting their turn, so they always block instead of being shed.
+
+    With a ``wal``, interactive and system messages are logged on entry and
+    stay logged until acknowledged; shed or merged messages are acknowledged
+    (or rewritten) right away.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        policy: str = "block",
+        weights: dict[str, int] | None = None,
+        wal: InboundWAL | None = None,
+    ):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow policy '{policy}' (expected one of {', '.join(OVERFLOW_POLICIES)})"
+            )
+        self.maxsize = maxsize
+        self.policy = policy
+        weights = {**DEFAULT_PRIORITY_WEIGHTS, **(weights or {})}
+        self.weights = {lane: max(1, int(weights[lane])) for lane in PRIORITIES}
+        self.wal = wal
+        self.metrics = QueueMetrics()
+        self.lane_metrics = {lane: QueueMetrics() for lane in PRIORITIES}
+        self._lanes: dict[str, deque[InboundMessage]] = {lane: deque() for lane in PRIORITIES}
+        self._credit: dict[str, int] = {lane: 0 for lane in PRIORITIES}
+        self._size = 0
+        self._changed = asyncio.Condition()
+
+    def qsize(self) -> int:
+        return self._size
+
+    def lane_size(self, priority: str) -> int:
+        return len(self._lanes[priority])
+
+    def full(self) -> bool:
+        return self.maxsize > 0 and self._size >= self.maxsize
+
+    async def put(self, msg: InboundMessage) -> bool:
+        """
+        Enqueue a message, applying the overflow policy when full.
+
+        Returns:
+            False if the message was rejected (``busy`` policy), True otherwise.
+        """
+        if msg.priority not in self._lanes:
+            raise ValueError(f"Unknown message priority '{msg.priority}'")
+        # Scheduled turns are re-created by their scheduler and have an
+        # in-memory caller waiting, so replaying them after a crash is pointless.
+        if self.wal is not None and msg.wal_id is None and msg.priority != PRIORITY_SCHEDULED:
+            self.wal.append(msg)
+        async with self._changed:
+            if self.full():
+                policy = self.policy if msg.priority == PRIORITY_INTERACTIVE else "block"
+                if policy == "busy":
+                    self.metrics.rejected += 1
+                    self._ack(msg)
+                    return False
+                if policy == "coalesce" and self._coalesce(msg):
+                    return True
+                if not (policy == "drop_oldest" and self._drop_oldest(msg.session_key)):
+                    self.metrics.blocked += 1
+                    await self._changed.wait_for(lambda: not self.full())
+
+            msg.enqueued_at = time.time()
+            self._lanes[msg.priority].append(msg)
+            self._size += 1
+            self.metrics.enqueued += 1
+            self.metrics.max_depth = max(self.metrics.max_depth, self._size)
+            self._changed.notify_all()
+        return True
+
+    async def get(self) -> InboundMessage:
+        """Remove and return the next message, waiting until one is available."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._size > 0)
+            lane = self._next_lane()
+            msg = self._lanes[lane].popleft()
+            self._size -= 1
+            self._record_wait(msg)
+            self._changed.notify_all()
+        return msg
+
+    async def remove(self, predicate: Callable[[InboundMessage], bool]) -> int:
+        """Drop queued messages matching ``predicate``; returns how many were removed."""
+        async with self._changed:
+            removed = 0
+            for lane in self._lanes.values():
+                kept = [m for m in lane if not predicate(m)]
+                removed += len(lane) - len(kept)
+                lane.clear()
+                lane.extend(kept)
+            if removed:
+                self._size -= removed
+                self._changed.notify_all()
+        return removed
+
+    def restore(self, messages: list[InboundMessage]) -> None:
+        """Re-queue messages (recovered or handed back) ahead of the rest, bypassing the bound."""
+        for msg in reversed(messages):
+            msg.enqueued_at = msg.enqueued_at or time.time()
+            self._lanes.get(msg.priority, self._lanes[PRIORITY_INTERACTIVE]).appendleft(msg)
+            self._size += 1
+        self.metrics.max_depth = max(self.metrics.max_depth, self._size)
+
+    async def requeue(self, messages: list[InboundMessage]) -> None:
+        """``restore`` for a running queue: also wakes waiting consumers."""
+        async with self._changed:
+            self.restore(messages)
+            self._changed.notify_all()
+
+    def _ack(self, msg: InboundMessage) -> None:
+        if self.wal is not None:
+            self.wal.ack(msg)
+
+    def _next_lane(self) -> str:
+        """Pick the next non-empty lane by smooth weighted round-robin."""
+        active = [lane for lane in PRIORITIES if self._lanes[lane]]
+        total = 0
+        for lane in active:
+            self._credit[lane] += self.weights[lane]
+            total += self.weights[lane]
+        chosen = max(active, key=lambda lane: self._credit[lane])
+        self._credit[chosen] -= total
+        # Idle lanes do not bank credit while empty.
+        for lane in PRIORITIES:
+            if lane not in active:
+                self._credit[lane] = 0
+        return chosen
+
+    def _record_wait(self, msg: InboundMessage) -> None:
+        wait_ms = max(0.0, (time.time() - (msg.enqueued_at or time.time())) * 1000)
+        for m in (self.metrics, self.lane_metrics[msg.priority]):
+            m.consumed += 1
+            m.last_wait_ms = wait_ms
+            m.max_wait_ms = max(m.max_wait_ms, wait_ms)
+            m.total_wait_ms += wait_ms
+
+    def _coalesce(self, msg: InboundMessage) -> bool:
+        """Merge msg into the newest queued message from the same session."""
+        for queued in reversed(self._lanes[msg.priority]):
+            if queued.session_key == msg.session_key:
+                queued.content = f"{queued.content}\n\n{msg.content}"
+                queued.media.extend(msg.media)
+                self.metrics.coalesced += 1
+                if self.wal is not None:
+                    self.wal.update(queued)
+                self._ack(msg)
+                return True
+        return False
+
+    def _drop_oldest(self, session_key: str) -> bool:
+        """Discard the oldest interactive message of session_key, or the oldest overall."""
+        lane = self._lanes[PRIORITY_INTERACTIVE]
+        if not lane:
+            return False
+        victim = 0
+        for i, queued in enumerate(lane):
+            if queued.session_key == session_key:
+                victim = i
+                break
+        dropped = lane[victim]
+        del lane[victim]
+        self._ack(dropped)
+        self._size -= 1
+        self.metrics.dropped += 1
+        logger.warning(f"Inbound queue full, dropped message for {dropped.session_key}")
+        return True
 
 
 class MessageBus:
     """
     Async message bus that decouples chat channels from the agent core.
-    
+
     Channels push messages to the inbound queue, and the agent processes
-    them and pushes responses to the outbound queue.
+    them and pushes responses to the outbound queue. Both queues are
+    unbounded unless a max size is given.
+
+    In durable mode (``wal_path`` set) inbound messages are kept in a
+    write-ahead log until the agent acknowledges them via ``ack_inbound``,
+    and ``recover`` re-queues whatever a previous process left unfinished.
     """
-    
-    def __init__(self):
-        self.inbound: asyncio.Queue[InboundMessage] = asyncio.Queue()
-        self.outbound: asyncio.Queue[OutboundMessage] = asyncio.Queue()
+
+    def __init__(
+        self,
+        inbound_maxsize: int = 0,
+        outbound_maxsize: int = 0,
+        overflow_policy: str = "block",
+        busy_message: str = DEFAULT_BUSY_MESSAGE,
+        priority_weights: dict[str, int] | None = None,
+        wal_path: Path | None = None,
+    ):
+        self.wal = InboundWAL(wal_path) if wal_path else None
+        self.inbound = InboundQueue(
+            maxsize=inbound_maxsize,
+            policy=overflow_policy,
+            weights=priority_weights,
+            wal=self.wal,
+        )
+        self.outbound: asyncio.Queue[OutboundMessage] = asyncio.Queue(maxsize=outbound_maxsize)
+        self.busy_message = busy_message
         self._outbound_subscribers: dict[str, list[Callable[[OutboundMessage], Awaitable[None]]]] = {}
         self._running = False
-    
+
     async def publish_inbound(self, msg: InboundMessage) -> None:
         """Publish a message from a channel to the agent."""
-        await self.inbound.put(msg)
-    
+        if not await self.inbound.put(msg):
+            self.notify_busy(msg)
+
+    def notify_busy(self, msg: InboundMessage) -> None:
+        """Tell the sender of a message rejected by a full queue to retry later."""
+        logger.warning(f"Inbound queue full, rejected message for {msg.session_key}")
+        if msg.channel == "system":
+            return
+        try:
+            self.outbound.put_nowait(OutboundMessage(
+                channel=msg.channel,
+                chat_id=msg.chat_id,
+                content=self.busy_message,
+                metadata=msg.metadata or {},
+            ))
+        except asyncio.QueueFull:
+            pass
+
     async def consume_inbound(self) -> InboundMessage:
         """Consume the next inbound message (blocks until available)."""
         return await self.inbound.get()
-    
+
+    def ack_inbound(self, msg: InboundMessage) -> None:
+        """Mark an inbound message as fully processed (durable mode only)."""
+        if self.wal is not None:
+            self.wal.ack(msg)
+
+    def recover(self) -> int:
+        """
+        Re-queue unacknowledged messages from the write-ahead log.
+
+        Returns:
+            Number of recovered messages.
+        """
+        if self.wal is None:
+            return 0
+        pending = self.wal.pending()
+        self.inbound.restore(pending)
+        if pending:
+            logger.info(f"Recovered {len(pending)} unprocessed inbound message(s) from WAL")
+        return len(pending)
+
     async def publish_outbound(self, msg: OutboundMessage) -> None:
         """Publish a response from the agent to channels."""
         await self.outbound.put(msg)
-    
+
     async def consume_outbound(self) -> OutboundMessage:
         """Consume the next outbound message (blocks until available)."""
         return await self.outbound.get()
-    
+
     def subscribe_outbound(
-        self, 
-        channel: str, 
+        self,
+        channel: str,
         callback: Callable[[OutboundMessage], Awaitable[None]]
     ) -> None:
         """Subscribe to outbound messages for a specific channel."""
         if channel not in self._outbound_subscribers:
             self._outbound_subscribers[channel] = []
         self._outbound_subscribers[channel].append(callback)
-    
+
     async def dispatch_outbound(self) -> None:
         """
         Dispatch outbound messages to subscribed channels.
@@ -65,16 +355,53 @@ class MessageBus:
                         logger.error(f"Error dispatching to {msg.channel}: {e}")
             except asyncio.TimeoutError:
                 continue
-    
+
     def stop(self) -> None:
         """Stop the dispatcher loop."""
         self._running = False
-    
+
+    def close(self) -> None:
+        """Release the write-ahead log, if any."""
+        if self.wal is not None:
+            self.wal.close()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Queue depth, overflow counters and wait times for monitoring."""
+        m = self.inbound.metrics
+        lanes = {
+            lane: {
+                "size": self.inbound.lane_size(lane),
+                "weight": self.inbound.weights[lane],
+                "consumed": lm.consumed,
+                "avg_wait_ms": round(lm.avg_wait_ms, 1),
+                "max_wait_ms": round(lm.max_wait_ms, 1),
+            }
+            for lane, lm in self.inbound.lane_metrics.items()
+        }
+        return {
+            "inbound_size": self.inbound_size,
+            "inbound_maxsize": self.inbound.maxsize,
+            "overflow_policy": self.inbound.policy,
+            "outbound_size": self.outbound_size,
+            "durable": self.wal is not None,
+            "enqueued": m.enqueued,
+            "consumed": m.consumed,
+            "dropped": m.dropped,
+            "coalesced": m.coalesced,
+            "rejected": m.rejected,
+            "blocked": m.blocked,
+            "max_depth": m.max_depth,
+            "last_wait_ms": round(m.last_wait_ms, 1),
+            "avg_wait_ms": round(m.avg_wait_ms, 1),
+            "max_wait_ms": round(m.max_wait_ms, 1),
+            "lanes": lanes,
+        }
+
     @property
     def inbound_size(self) -> int:
         """Number of pending inbound messages."""
         return self.inbound.qsize()
-    
+
     @property
     def outbound_size(self) -> int:
         """Number of pending outbound messages."""
@@ -0,0 +1,82 @@
+"""Write-ahead log for inbound messages (durable bus mode)."""
+
+import json
+import sqlite3
+from pathlib import Path
+
+from loguru import logger
+
+from nanobot.bus.events import InboundMessage
+
+
+class InboundWAL:
+    """
+    SQLite-backed log of inbound messages that have not finished processing.
+
+    A message is appended when it enters the bus and deleted (acknowledged)
+    once its turn has been saved to the session. Anything still in the log at
+    startup was lost mid-flight and is replayed.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS inbound ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " payload TEXT NOT NULL)"
+        )
+
+    def append(self, msg: InboundMessage) -> int:
+        """Persist a message and record its log id on it."""
+        cur = self._conn.execute(
+            "INSERT INTO inbound (payload) VALUES (?)", (self._encode(msg),)
+        )
+        msg.wal_id = cur.lastrowid
+        return msg.wal_id
+
+    def update(self, msg: InboundMessage) -> None:
+        """Rewrite a logged message after it changed in the queue (coalescing)."""
+        if msg.wal_id is None:
+            return
+        self._conn.execute(
+            "UPDATE inbound SET payload = ? WHERE id = ?", (self._encode(msg), msg.wal_id)
+        )
+
+    def ack(self, msg: InboundMessage) -> None:
+        """Remove a message whose turn is complete."""
+        if msg.wal_id is None:
+            return
+        self._conn.execute("DELETE FROM inbound WHERE id = ?", (msg.wal_id,))
+        msg.wal_id = None
+
+    def pending(self) -> list[InboundMessage]:
+        """Return unacknowledged messages in arrival order."""
+        messages = []
+        for row_id, payload in self._conn.execute("SELECT id, payload FROM inbound ORDER BY id"):
+            try:
+                msg = self._decode(payload)
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Dropping unreadable inbound WAL entry {row_id}: {e}")
+                self._conn.execute("DELETE FROM inbound WHERE id = ?", (row_id,))
+                continue
+            msg.wal_id = row_id
+            messages.append(msg)
+        return messages
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM inbound").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @staticmethod
+    def _encode(msg: InboundMessage) -> str:
+        return json.dumps(msg.to_dict(), ensure_ascii=False, default=str)
+
+    @staticmethod
+    def _decode(payload: str) -> InboundMessage:
+        return InboundMessage.from_dict(json.loads(payload))
@@ -2,6 +2,8 @@
 
 import asyncio
 import json
+import time
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
@@ -12,26 +14,124 @@ from loguru import logger
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
+from nanobot.channels.markdown import to_discord
+from nanobot.channels.media import MediaStore, MediaTooLargeError
 from nanobot.config.schema import DiscordConfig
 
 
 DISCORD_API_BASE = "https://discord.com/api/v10"
-MAX_ATTACHMENT_BYTES = 20 * 1024 * 1024  # 20MB
+GLOBAL_RATE_LIMIT = 50  # requests per second per bot
+MAX_SEND_RETRIES = 3
+MAX_TRACKED_CHANNELS = 1024  # idle per-channel locks/buckets are dropped beyond this
+
+# Gateway close codes after which the session cannot be resumed / we must not reconnect.
+_SESSION_LOST_CODES = {4007, 4009}
+_FATAL_CLOSE_CODES = {4004, 4010, 4011, 4012, 4013, 4014}
+
+
+@dataclass
+class _Bucket:
+    """Discord rate-limit bucket as last reported by response headers."""
+    remaining: int = 1
+    reset_at: float = 0.0  # monotonic
+
+
+class _RateLimiter:
+    """
+    Proactive REST rate limiting from Discord's ``X-RateLimit-*`` headers.
+
+    Routes map to the bucket Discord reports for them (buckets are shared
+    per major parameter, here the channel ID). A request waits until its
+    bucket has quota left or has reset, and takes one unit before it is
+    sent, so concurrent sends never overrun a bucket. A global limiter
+    caps the bot at ``GLOBAL_RATE_LIMIT`` requests per second and honours
+    global 429s.
+    """
+
+    def __init__(self, global_rate: int = GLOBAL_RATE_LIMIT):
+        self._routes: dict[str, str] = {}  # route -> bucket key
+        self._buckets: dict[str, _Bucket] = {}
+        self._global = _Bucket(remaining=global_rate)
+        self._global_rate = global_rate
+
+    def _bucket(self, route: str) -> _Bucket:
+        key = self._routes.get(route, route)
+        return self._buckets.setdefault(key, _Bucket())
+
+    async def acquire(self, route: str) -> None:
+        """Wait until both the route's bucket and the global limit allow a request."""
+        while True:
+            now = time.monotonic()
+            bucket = self._bucket(route)
+            if bucket.reset_at <= now and bucket.remaining <= 0:
+                bucket.remaining = 1  # reset passed; the next response tells us the real quota
+            if self._global.reset_at <= now:
+                self._global.remaining = self._global_rate
+                self._global.reset_at = now + 1.0
+            if bucket.remaining > 0 and self._global.remaining > 0:
+                bucket.remaining -= 1
+                self._global.remaining -= 1
+                return
+            wait = [b.reset_at for b in (bucket, self._global) if b.remaining <= 0]
+            await asyncio.sleep(max(0.0, min(wait) - now) + 0.01)
+
+    def update(self, route: str, major: str, headers: httpx.Headers) -> None:
+        """Record the bucket state Discord returned for a request on ``route``."""
+        if "x-ratelimit-remaining" not in headers:
+            return
+        if bucket_id := headers.get("x-ratelimit-bucket"):
+            key = f"{bucket_id}:{major}"
+            if route not in self._routes:
+                self._buckets.pop(route, None)  # placeholder used before the bucket was known
+            self._routes[route] = key
+        bucket = self._bucket(route)
+        try:
+            bucket.remaining = int(headers["x-ratelimit-remaining"])
+            bucket.reset_at = time.monotonic() + float(headers.get("x-ratelimit-reset-after", 0))
+        except ValueError:
+            pass
+
+    def prune(self, max_buckets: int) -> None:
+        """Forget buckets that have reset once more than ``max_buckets`` are tracked."""
+        if len(self._buckets) <= max_buckets:
+            return
+        now = time.monotonic()
+        for key in [k for k, b in self._buckets.items() if b.reset_at <= now]:
+            del self._buckets[key]
+        live = set(self._buckets)
+        self._routes = {r: k for r, k in self._routes.items() if k in live}
+
+    def rate_limited(self, route: str, retry_after: float, is_global: bool) -> None:
+        """Block the route (or every route) until ``retry_after`` seconds have passed."""
+        target = self._global if is_global else self._bucket(route)
+        target.remaining = 0
+        target.reset_at = max(target.reset_at, time.monotonic() + retry_after)
 
 
 class DiscordChannel(BaseChannel):
-    """Discord channel using Gateway websocket."""
+    """
+    Discord channel using Gateway websocket.
+
+    Sends are scheduled against Discord's per-route and global rate limits
+    before they go out. After a dropped connection the gateway session is
+    RESUMEd so missed events are replayed and no new IDENTIFY is spent.
+    """
 
     name = "discord"
 
-    def __init__(self, config: DiscordConfig, bus: MessageBus):
+    def __init__(self, config: DiscordConfig, bus: MessageBus, media_store: MediaStore | None = None):
         super().__init__(config, bus)
         self.config: DiscordConfig = config
+        self.media_store = media_store or MediaStore()
         self._ws: websockets.WebSocketClientProtocol | None = None
         self._seq: int | None = None
+        self._session_id: str | None = None
+        self._resume_url: str | None = None
         self._heartbeat_task: asyncio.Task | None = None
         self._typing_tasks: dict[str, asyncio.Task] = {}
         self._http: httpx.AsyncClient | None = None
+        self._limiter = _RateLimiter()
+        self._send_locks: dict[str, asyncio.Lock] = {}
 
     async def start(self) -> None:
         """Start the Discord gateway connection."""
@@ -45,11 +145,21 @@ class DiscordChannel(BaseChannel):
         while self._running:
             try:
                 logger.info("Connecting to Discord gateway...")
-                async with websockets.connect(self.config.gateway_url) as ws:
+                async with websockets.connect(self._gateway_url()) as ws:
                     self._ws = ws
                     await self._gateway_loop()
             except asyncio.CancelledError:
                 break
+            except websockets.ConnectionClosed as e:
+                code = e.rcvd.code if e.rcvd else None
+                if code in _FATAL_CLOSE_CODES:
+                    logger.error(f"Discord gateway closed with code {code}, not reconnecting")
+                    self._running = False
+                    break
+                if code in _SESSION_LOST_CODES:
+                    self._reset_session()
+                logger.warning(f"Discord gateway connection closed ({code}), reconnecting...")
+                await asyncio.sleep(1)
             except Exception as e:
                 logger.warning(f"Discord gateway error: {e}")
                 if self._running:
@@ -79,34 +189,75 @@ class DiscordChannel(BaseChannel):
             return
 
         url = f"{DISCORD_API_BASE}/channels/{msg.chat_id}/messages"
-        payload: dict[str, Any] = {"content": msg.content}
+        payload: dict[str, Any] = {"content": to_discord(msg.content)}
 
         if msg.reply_to:
             payload["message_reference"] = {"message_id": msg.reply_to}
             payload["allowed_mentions"] = {"replied_user": False}
 
-        headers = {"Authorization": f"Bot {self.config.token}"}
-
+        self._prune_idle_channels()
+        lock = self._send_locks.setdefault(msg.chat_id, asyncio.Lock())
         try:
-            for attempt in range(3):
-                try:
-                    response = await self._http.post(url, headers=headers, json=payload)
-                    if response.status_code == 429:
-                        data = response.json()
-                        retry_after = float(data.get("retry_after", 1.0))
-                        logger.warning(f"Discord rate limited, retrying in {retry_after}s")
-                        await asyncio.sleep(retry_after)
-                        continue
-                    response.raise_for_status()
-                    return
-                except Exception as e:
-                    if attempt == 2:
-                        logger.error(f"Error sending Discord message: {e}")
-                    else:
-                        await asyncio.sleep(1)
+            async with lock:
+                await self._post(url, payload, route=f"POST /channels/{msg.chat_id}/messages",
+                                 major=msg.chat_id)
+        except Exception as e:
+            logger.error(f"Error sending Discord message: {e}")
         finally:
             await self._stop_typing(msg.chat_id)
 
+    async def _post(self, url: str, payload: dict[str, Any], route: str, major: str) -> None:
+        """POST under the rate limiter, retrying 429s and transient errors."""
+        headers = {"Authorization": f"Bot {self.config.token}"}
+        for attempt in range(MAX_SEND_RETRIES + 1):
+            await self._limiter.acquire(route)
+            try:
+                response = await self._http.post(url, headers=headers, json=payload)
+            except httpx.TransportError:
+                if attempt == MAX_SEND_RETRIES:
+                    raise
+                await asyncio.sleep(1)
+                continue
+            self._limiter.update(route, major, response.headers)
+            if response.status_code >= 500 and attempt < MAX_SEND_RETRIES:
+                await asyncio.sleep(1)
+                continue
+            if response.status_code == 429 and attempt < MAX_SEND_RETRIES:
+                try:
+                    data = response.json()
+                except ValueError:
+                    data = {}
+                retry_after = float(
+                    data.get("retry_after") or response.headers.get("retry-after") or 1.0
+                )
+                is_global = bool(data.get("global")) or "x-ratelimit-global" in response.headers
+                logger.warning(
+                    f"Discord rate limited ({'global' if is_global else route}), "
+                    f"retrying in {retry_after}s"
+                )
+                self._limiter.rate_limited(route, retry_after, is_global)
+                continue
+            response.raise_for_status()
+            return
+
+    def _prune_idle_channels(self) -> None:
+        if len(self._send_locks) > MAX_TRACKED_CHANNELS:
+            self._send_locks = {k: v for k, v in self._send_locks.items() if v.locked()}
+        self._limiter.prune(MAX_TRACKED_CHANNELS)
+
+    def _gateway_url(self) -> str:
+        """Resume URL from READY when we have a session to resume, else the configured URL."""
+        if self._session_id and self._resume_url:
+            query = self.config.gateway_url.partition("?")[2]
+            return f"{self._resume_url.rstrip('/')}/?{query}" if query else self._resume_url
+        return self.config.gateway_url
+
+    def _reset_session(self) -> None:
+        """Forget the gateway session so the next connection IDENTIFYs afresh."""
+        self._session_id = None
+        self._resume_url = None
+        self._seq = None
+
     async def _gateway_loop(self) -> None:
         """Main gateway loop: identify, heartbeat, dispatch events."""
         if not self._ws:
@@ -128,23 +279,45 @@ class DiscordChannel(BaseChannel):
                 self._seq = seq
 
             if op == 10:
-                # HELLO: start heartbeat and identify
+                # HELLO: start heartbeat, then resume the previous session or identify
                 interval_ms = payload.get("heartbeat_interval", 45000)
                 await self._start_heartbeat(interval_ms / 1000)
-                await self._identify()
+                if self._session_id and self._seq is not None:
+                    await self._resume()
+                else:
+                    await self._identify()
+            elif op == 1:
+                # Heartbeat request from the gateway
+                await self._ws.send(json.dumps({"op": 1, "d": self._seq}))
             elif op == 0 and event_type == "READY":
+                self._session_id = payload.get("session_id")
+                self._resume_url = payload.get("resume_gateway_url")
                 logger.info("Discord gateway READY")
+            elif op == 0 and event_type == "RESUMED":
+                logger.info("Discord gateway session resumed")
             elif op == 0 and event_type == "MESSAGE_CREATE":
                 await self._handle_message_create(payload)
             elif op == 7:
                 # RECONNECT: exit loop to reconnect
                 logger.info("Discord gateway requested reconnect")
+                await self._close_for_resume()
                 break
             elif op == 9:
-                # INVALID_SESSION: reconnect
+                # INVALID_SESSION: d says whether the session can still be resumed
                 logger.warning("Discord gateway invalid session")
+                if not payload:
+                    self._reset_session()
+                    await asyncio.sleep(1)
+                    await self._identify()
+                    continue
+                await self._close_for_resume()
                 break
 
+    async def _close_for_resume(self) -> None:
+        """Close with a non-1000 code; a normal closure invalidates the session."""
+        if self._ws:
+            await self._ws.close(code=4000, reason="reconnect")
+
     async def _identify(self) -> None:
         """Send IDENTIFY payload."""
         if not self._ws:
@@ -164,6 +337,22 @@ class DiscordChannel(BaseChannel):
         }
         await self._ws.send(json.dumps(identify))
 
+    async def _resume(self) -> None:
+        """Send RESUME so the gateway replays events missed since ``_seq``."""
+        if not self._ws:
+            return
+
+        resume = {
+            "op": 6,
+            "d": {
+                "token": self.config.token,
+                "session_id": self._session_id,
+                "seq": self._seq,
+            },
+        }
+        logger.info(f"Resuming Discord gateway session at seq {self._seq}")
+        await self._ws.send(json.dumps(resume))
+
     async def _start_heartbeat(self, interval_s: float) -> None:
         """Start or restart the heartbeat loop."""
         if self._heartbeat_task:
@@ -199,7 +388,6 @@ class DiscordChannel(BaseChannel):
 
         content_parts = [content] if content else []
         media_paths: list[str] = []
-        media_dir = Path.home() / ".nanobot" / "media"
 
         for attachment in payload.get("attachments") or []:
             url = attachment.get("url")
@@ -207,17 +395,17 @@ class DiscordChannel(BaseChannel):
             size = attachment.get("size") or 0
             if not url or not self._http:
                 continue
-            if size and size > MAX_ATTACHMENT_BYTES:
-                content_parts.append(f"[attachment: {filename} - too large]")
-                continue
             try:
-                media_dir.mkdir(parents=True, exist_ok=True)
-                file_path = media_dir / f"{attachment.get('id', 'file')}_{filename.replace('/', '_')}"
-                resp = await self._http.get(url)
-                resp.raise_for_status()
-                file_path.write_bytes(resp.content)
+                if size > self.media_store.max_file_bytes:
+                    raise MediaTooLargeError(filename)
+                key = f"discord:{attachment['id']}" if attachment.get("id") else None
+                file_path = await self.media_store.download(
+                    self._http, url, ext=Path(filename).suffix, key=key
+                )
                 media_paths.append(str(file_path))
                 content_parts.append(f"[attachment: {file_path}]")
+            except MediaTooLargeError:
+                content_parts.append(f"[attachment: {filename} - too large]")
             except Exception as e:
                 logger.warning(f"Failed to download Discord attachment: {e}")
                 content_parts.append(f"[attachment: {filename} - download failed]")
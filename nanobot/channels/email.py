@@ -1,11 +1,16 @@
-"""Email channel implementation using IMAP polling + SMTP replies."""
+"""Email channel implementation using IMAP IDLE (or polling) + SMTP replies."""
 
 import asyncio
 import html
 import imaplib
+import itertools
+import json
 import re
 import smtplib
+import socket
 import ssl
+import threading
+import time
 from datetime import date
 from email import policy
 from email.header import decode_header, make_header
@@ -19,7 +24,79 @@ from loguru import logger
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
+from nanobot.channels.markdown import to_plain_text
 from nanobot.config.schema import EmailConfig
+from nanobot.utils.helpers import get_data_path
+
+
+class _SmtpPool:
+    """
+    Small pool of logged-in SMTP sessions shared by send threads.
+
+    A session idle for less than ``idle_timeout_s`` is checked with NOOP
+    before reuse; older ones are closed. At most ``size`` sessions exist at
+    once, so bursts queue instead of opening a connection per email.
+    """
+
+    def __init__(self, connect: Any, size: int, idle_timeout_s: float):
+        self._connect = connect
+        self._idle_timeout_s = idle_timeout_s
+        self._slots = threading.BoundedSemaphore(max(1, size))
+        self._idle: list[tuple[smtplib.SMTP, float]] = []
+        self._lock = threading.Lock()
+
+    def send(self, msg: EmailMessage) -> None:
+        with self._slots:
+            smtp, reused = self._acquire()
+            try:
+                try:
+                    smtp.send_message(msg)
+                except smtplib.SMTPServerDisconnected:
+                    if not reused:
+                        raise
+                    # The server dropped an idle session; log in again once.
+                    self._quit(smtp)
+                    smtp = self._connect()
+                    smtp.send_message(msg)
+            except Exception:
+                self._quit(smtp)
+                raise
+            with self._lock:
+                self._idle.append((smtp, time.monotonic()))
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            self._quit(smtp)
+
+    def _acquire(self) -> tuple[smtplib.SMTP, bool]:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                smtp, last_used = self._idle.pop()
+            if time.monotonic() - last_used < self._idle_timeout_s and self._alive(smtp):
+                return smtp, True
+            self._quit(smtp)
+        return self._connect(), False
+
+    @staticmethod
+    def _alive(smtp: smtplib.SMTP) -> bool:
+        try:
+            return smtp.noop()[0] == 250
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(smtp: smtplib.SMTP) -> None:
+        try:
+            smtp.quit()
+        except Exception:
+            try:
+                smtp.close()
+            except Exception:
+                pass
 
 
 class EmailChannel(BaseChannel):
@@ -27,11 +104,14 @@ class EmailChannel(BaseChannel):
     Email channel.
 
     Inbound:
-    - Poll IMAP mailbox for unread messages.
-    - Convert each message into an inbound event.
+    - Keep one IMAP session open and wait for new mail with IDLE; servers
+      without IDLE are polled over the same session instead.
+    - Reconnect with exponential backoff when the session drops.
+    - Convert each unread message into an inbound event.
 
     Outbound:
-    - Send responses via SMTP back to the sender address.
+    - Send responses via SMTP back to the sender address, reusing a small
+      pool of logged-in sessions.
     """
 
     name = "email"
@@ -49,17 +129,32 @@ class EmailChannel(BaseChannel):
         "Nov",
         "Dec",
     )
+    # First reconnect delay; doubles up to imap_reconnect_max_seconds.
+    _RECONNECT_MIN_S = 1.0
+    # UIDs per FETCH/STORE command during backlog catch-up.
+    _FETCH_BATCH = 100
+    _EXISTS_RE = re.compile(rb"^\* \d+ EXISTS", re.IGNORECASE)
 
     def __init__(self, config: EmailConfig, bus: MessageBus):
         super().__init__(config, bus)
         self.config: EmailConfig = config
         self._last_subject_by_chat: dict[str, str] = {}
         self._last_message_id_by_chat: dict[str, str] = {}
-        self._processed_uids: set[str] = set()  # Capped to prevent unbounded growth
-        self._MAX_PROCESSED_UIDS = 100000
+        # Highest handled UID per mailbox, persisted across restarts
+        self._state_path = get_data_path() / "email" / "uid_state.json"
+        self._uid_state: dict[str, Any] | None = None
+        # Long-lived IMAP session used by the inbound loop (None when disconnected)
+        self._imap: imaplib.IMAP4 | None = None
+        self._idle_capable: bool | None = None
+        self._idle_tags = itertools.count(1)
+        self._smtp_pool = _SmtpPool(
+            self._smtp_connect,
+            size=config.smtp_pool_size,
+            idle_timeout_s=config.smtp_idle_timeout_seconds,
+        )
 
     async def start(self) -> None:
-        """Start polling IMAP for inbound emails."""
+        """Start watching the IMAP mailbox for inbound emails."""
         if not self.config.consent_granted:
             logger.warning(
                 "Email channel disabled: consent_granted is false. "
@@ -71,9 +166,10 @@ class EmailChannel(BaseChannel):
             return
 
         self._running = True
-        logger.info("Starting Email channel (IMAP polling mode)...")
+        logger.info("Starting Email channel...")
 
         poll_seconds = max(5, int(self.config.poll_interval_seconds))
+        backoff = self._RECONNECT_MIN_S
         while self._running:
             try:
                 inbound_items = await asyncio.to_thread(self._fetch_new_messages)
@@ -93,14 +189,33 @@ class EmailChannel(BaseChannel):
                         content=item["content"],
                         metadata=item.get("metadata", {}),
                     )
+
+                if self._use_idle():
+                    await asyncio.to_thread(self._idle_wait)
+                else:
+                    await asyncio.sleep(poll_seconds)
+                backoff = self._RECONNECT_MIN_S
             except Exception as e:
-                logger.error(f"Email polling error: {e}")
+                self._disconnect()
+                if not self._running:
+                    break
+                logger.warning(f"Email IMAP error: {e}; reconnecting in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, max(self._RECONNECT_MIN_S, self.config.imap_reconnect_max_seconds))
 
-            await asyncio.sleep(poll_seconds)
+        self._disconnect()
 
     async def stop(self) -> None:
-        """Stop polling loop."""
+        """Stop the inbound loop and close the IMAP and SMTP sessions."""
         self._running = False
+        await asyncio.to_thread(self._smtp_pool.close)
+        client = self._imap
+        if client is not None:
+            # Unblocks a thread waiting in IDLE; the loop then closes the session.
+            try:
+                client.socket().shutdown(socket.SHUT_RDWR)
+            except Exception:
+                pass
 
     async def send(self, msg: OutboundMessage) -> None:
         """Send email via SMTP."""
@@ -133,7 +248,7 @@ class EmailChannel(BaseChannel):
         email_msg["From"] = self.config.from_address or self.config.smtp_username or self.config.imap_username
         email_msg["To"] = to_addr
         email_msg["Subject"] = subject
-        email_msg.set_content(msg.content or "")
+        email_msg.set_content(to_plain_text(msg.content or ""))
 
         in_reply_to = self._last_message_id_by_chat.get(to_addr)
         if in_reply_to:
@@ -167,30 +282,157 @@ class EmailChannel(BaseChannel):
         return True
 
     def _smtp_send(self, msg: EmailMessage) -> None:
+        self._smtp_pool.send(msg)
+
+    def _smtp_connect(self) -> smtplib.SMTP:
+        """Open and log in a new SMTP session."""
         timeout = 30
         if self.config.smtp_use_ssl:
-            with smtplib.SMTP_SSL(
+            smtp: smtplib.SMTP = smtplib.SMTP_SSL(
                 self.config.smtp_host,
                 self.config.smtp_port,
                 timeout=timeout,
-            ) as smtp:
-                smtp.login(self.config.smtp_username, self.config.smtp_password)
-                smtp.send_message(msg)
-            return
-
-        with smtplib.SMTP(self.config.smtp_host, self.config.smtp_port, timeout=timeout) as smtp:
-            if self.config.smtp_use_tls:
+            )
+        else:
+            smtp = smtplib.SMTP(self.config.smtp_host, self.config.smtp_port, timeout=timeout)
+        try:
+            if self.config.smtp_use_tls and not self.config.smtp_use_ssl:
                 smtp.starttls(context=ssl.create_default_context())
             smtp.login(self.config.smtp_username, self.config.smtp_password)
-            smtp.send_message(msg)
+        except Exception:
+            _SmtpPool._quit(smtp)
+            raise
+        return smtp
+
+    def _connect(self) -> imaplib.IMAP4:
+        """Open, log in and select the mailbox."""
+        if self.config.imap_use_ssl:
+            client = imaplib.IMAP4_SSL(self.config.imap_host, self.config.imap_port)
+        else:
+            client = imaplib.IMAP4(self.config.imap_host, self.config.imap_port)
+        try:
+            client.login(self.config.imap_username, self.config.imap_password)
+            status, _ = client.select(self.config.imap_mailbox or "INBOX")
+            if status != "OK":
+                raise imaplib.IMAP4.error(f"cannot select mailbox {self.config.imap_mailbox!r}")
+        except Exception:
+            self._close_client(client)
+            raise
+        return client
+
+    @staticmethod
+    def _close_client(client: imaplib.IMAP4) -> None:
+        try:
+            client.logout()
+        except Exception:
+            pass
+
+    def _session(self) -> imaplib.IMAP4:
+        """The persistent inbound session, connecting if needed."""
+        if self._imap is None:
+            self._imap = self._connect()
+            self._idle_capable = None
+            logger.info(f"Email IMAP session opened to {self.config.imap_host}")
+        return self._imap
+
+    def _disconnect(self) -> None:
+        client, self._imap = self._imap, None
+        if client is not None:
+            self._close_client(client)
+
+    def _use_idle(self) -> bool:
+        if not self.config.imap_idle or self._imap is None:
+            return False
+        if self._idle_capable is None:
+            try:
+                status, data = self._imap.capability()
+                caps = b" ".join(data or []).upper().split() if status == "OK" else []
+            except Exception:
+                caps = []
+            self._idle_capable = b"IDLE" in caps
+            if not self._idle_capable:
+                logger.info("IMAP server does not support IDLE, falling back to polling")
+        return self._idle_capable
+
+    def _idle_wait(self) -> None:
+        """
+        Block in IMAP IDLE until the server reports new mail.
+
+        Returns on an EXISTS notification or after imap_idle_seconds of
+        silence (servers drop idle sessions after ~30 minutes, RFC 2177).
+        Returns at once, without idling, if mail was announced during the
+        previous fetch. Raises on connection errors so the caller reconnects.
+        """
+        client = self._session()
+        if self._take_new_mail_notices(client):
+            logger.debug("IMAP reported new mail during the last fetch, polling again")
+            return
+        tag = f"NBI{next(self._idle_tags)}".encode()
+        client.send(tag + b" IDLE\r\n")
+        # Untagged updates may arrive before the continuation; only a tagged
+        # reply means the server refused IDLE.
+        new_mail = False
+        while True:
+            line = self._read_idle_line(client)
+            if line.startswith(b"+"):
+                break
+            if not line.startswith(b"*"):
+                raise imaplib.IMAP4.error(f"IDLE rejected: {line.strip()!r}")
+            new_mail = new_mail or bool(self._EXISTS_RE.match(line))
+
+        sock = client.socket()
+        sock.settimeout(max(1, self.config.imap_idle_seconds))
+        try:
+            while self._running and not new_mail:
+                new_mail = bool(self._EXISTS_RE.match(self._read_idle_line(client)))
+        except (socket.timeout, TimeoutError):
+            # The buffered reader is unusable after a timeout; start afresh.
+            logger.debug("IMAP IDLE timed out, renewing session")
+            self._disconnect()
+            return
+        sock.settimeout(None)
+
+        client.send(b"DONE\r\n")
+        while True:
+            line = client.readline()
+            if not line:
+                raise ConnectionError("IMAP connection closed")
+            if line.startswith(tag + b" "):
+                break
+
+    @staticmethod
+    def _read_idle_line(client: imaplib.IMAP4) -> bytes:
+        line = client.readline()
+        if not line:
+            raise ConnectionError("IMAP connection closed")
+        if line.startswith(b"* BYE"):
+            raise ConnectionError(f"IMAP server closed the session: {line.strip()!r}")
+        return line
+
+    @staticmethod
+    def _take_new_mail_notices(client: imaplib.IMAP4) -> bool:
+        """
+        Pop EXISTS/RECENT updates imaplib buffered during earlier commands.
+
+        Servers may announce mail in the middle of a SEARCH or FETCH; imaplib
+        keeps those in ``untagged_responses`` where IDLE would never see them.
+        """
+        responses = getattr(client, "untagged_responses", None)
+        if not responses:
+            return False
+        exists = responses.pop("EXISTS", None)
+        recent = responses.pop("RECENT", None) or []
+        return bool(exists) or any(int(n or 0) > 0 for n in recent)
 
     def _fetch_new_messages(self) -> list[dict[str, Any]]:
-        """Poll IMAP and return parsed unread messages."""
+        """Return parsed unread messages from the persistent session."""
         return self._fetch_messages(
             search_criteria=("UNSEEN",),
             mark_seen=self.config.mark_seen,
             dedupe=True,
             limit=0,
+            client=self._session(),
+            allowed_only=True,
         )
 
     def fetch_messages_between_dates(
@@ -225,96 +467,197 @@ class EmailChannel(BaseChannel):
         mark_seen: bool,
         dedupe: bool,
         limit: int,
+        client: imaplib.IMAP4 | None = None,
+        allowed_only: bool = False,
     ) -> list[dict[str, Any]]:
-        """Fetch messages by arbitrary IMAP search criteria."""
-        messages: list[dict[str, Any]] = []
-        mailbox = self.config.imap_mailbox or "INBOX"
+        """
+        Fetch messages by arbitrary IMAP search criteria.
 
-        if self.config.imap_use_ssl:
-            client = imaplib.IMAP4_SSL(self.config.imap_host, self.config.imap_port)
-        else:
-            client = imaplib.IMAP4(self.config.imap_host, self.config.imap_port)
+        Messages are fetched by UID in batches: sender headers first, then
+        bodies (truncated to ``max_fetch_bytes``) only for messages that will
+        be used, and ``\\Seen`` flags are set with one STORE per batch. With
+        ``dedupe`` only UIDs above the persisted high-water mark are returned.
 
-        try:
-            client.login(self.config.imap_username, self.config.imap_password)
-            status, _ = client.select(mailbox)
-            if status != "OK":
+        Uses ``client`` if given, otherwise a short-lived connection of its own.
+        """
+        messages: list[dict[str, Any]] = []
+        owned = client is None
+        if owned:
+            try:
+                client = self._connect()
+            except imaplib.IMAP4.error as e:
+                logger.warning(f"Email IMAP fetch failed: {e}")
                 return messages
 
-            status, data = client.search(None, *search_criteria)
-            if status != "OK" or not data:
+        try:
+            last_uid = self._last_uid(client) if dedupe else 0
+            criteria = search_criteria
+            if last_uid:
+                criteria = (*search_criteria, "UID", f"{last_uid + 1}:*")
+            status, data = client.uid("SEARCH", *criteria)
+            if status != "OK" or not data or not data[0]:
                 return messages
 
-            ids = data[0].split()
-            if limit > 0 and len(ids) > limit:
-                ids = ids[-limit:]
-            for imap_id in ids:
-                status, fetched = client.fetch(imap_id, "(BODY.PEEK[] UID)")
-                if status != "OK" or not fetched:
-                    continue
+            # "n:*" always matches the newest message, even below n.
+            uids = sorted(u for u in map(int, data[0].split()) if u > last_uid)
+            if limit > 0 and len(uids) > limit:
+                uids = uids[-limit:]
+
+            for start in range(0, len(uids), self._FETCH_BATCH):
+                batch = uids[start:start + self._FETCH_BATCH]
+                wanted = batch
+                if allowed_only:
+                    headers = self._uid_fetch(client, batch, "BODY.PEEK[HEADER.FIELDS (FROM)]")
+                    wanted = [uid for uid in batch if self.is_allowed(self._sender_of(headers.get(uid)))]
+                    if len(wanted) < len(batch):
+                        logger.info(f"Skipping {len(batch) - len(wanted)} email(s) from unlisted senders")
+
+                cap = max(1, int(self.config.max_fetch_bytes))
+                bodies = self._uid_fetch(client, wanted, f"BODY.PEEK[]<0.{cap}>") if wanted else {}
+                for uid in wanted:
+                    item = self._parse_message(uid, bodies.get(uid))
+                    if item is not None:
+                        messages.append(item)
 
-                raw_bytes = self._extract_message_bytes(fetched)
-                if raw_bytes is None:
-                    continue
+                if mark_seen:
+                    client.uid("STORE", self._uid_set(batch), "+FLAGS", "(\\Seen)")
+                if dedupe:
+                    self._save_last_uid(batch[-1])
+        finally:
+            if owned:
+                self._close_client(client)
 
-                uid = self._extract_uid(fetched)
-                if dedupe and uid and uid in self._processed_uids:
-                    continue
+        return messages
 
-                parsed = BytesParser(policy=policy.default).parsebytes(raw_bytes)
-                sender = parseaddr(parsed.get("From", ""))[1].strip().lower()
-                if not sender:
-                    continue
+    def _parse_message(self, uid: int, raw_bytes: bytes | None) -> dict[str, Any] | None:
+        if raw_bytes is None:
+            return None
+
+        parsed = BytesParser(policy=policy.default).parsebytes(raw_bytes)
+        sender = parseaddr(parsed.get("From", ""))[1].strip().lower()
+        if not sender:
+            return None
+
+        subject = self._decode_header_value(parsed.get("Subject", ""))
+        date_value = parsed.get("Date", "")
+        message_id = parsed.get("Message-ID", "").strip()
+        body = self._extract_text_body(parsed)
+
+        if not body:
+            body = "(empty email body)"
+
+        body = body[: self.config.max_body_chars]
+        content = (
+            f"Email received.\n"
+            f"From: {sender}\n"
+            f"Subject: {subject}\n"
+            f"Date: {date_value}\n\n"
+            f"{body}"
+        )
 
-                subject = self._decode_header_value(parsed.get("Subject", ""))
-                date_value = parsed.get("Date", "")
-                message_id = parsed.get("Message-ID", "").strip()
-                body = self._extract_text_body(parsed)
-
-                if not body:
-                    body = "(empty email body)"
-
-                body = body[: self.config.max_body_chars]
-                content = (
-                    f"Email received.\n"
-                    f"From: {sender}\n"
-                    f"Subject: {subject}\n"
-                    f"Date: {date_value}\n\n"
-                    f"{body}"
-                )
-
-                metadata = {
-                    "message_id": message_id,
-                    "subject": subject,
-                    "date": date_value,
-                    "sender_email": sender,
-                    "uid": uid,
-                }
-                messages.append(
-                    {
-                        "sender": sender,
-                        "subject": subject,
-                        "message_id": message_id,
-                        "content": content,
-                        "metadata": metadata,
-                    }
-                )
-
-                if dedupe and uid:
-                    self._processed_uids.add(uid)
-                    # mark_seen is the primary dedup; this set is a safety net
-                    if len(self._processed_uids) > self._MAX_PROCESSED_UIDS:
-                        self._processed_uids.clear()
+        metadata = {
+            "message_id": message_id,
+            "subject": subject,
+            "date": date_value,
+            "sender_email": sender,
+            "uid": str(uid),
+        }
+        return {
+            "sender": sender,
+            "subject": subject,
+            "message_id": message_id,
+            "content": content,
+            "metadata": metadata,
+        }
+
+    def _uid_fetch(self, client: imaplib.IMAP4, uids: list[int], part: str) -> dict[int, bytes]:
+        """UID FETCH one message part for a batch of UIDs."""
+        status, fetched = client.uid("FETCH", self._uid_set(uids), f"(UID {part})")
+        if status != "OK" or not fetched:
+            return {}
+        return self._parse_fetch_response(fetched)
 
-                if mark_seen:
-                    client.store(imap_id, "+FLAGS", "\\Seen")
-        finally:
+    @staticmethod
+    def _parse_fetch_response(fetched: list[Any]) -> dict[int, bytes]:
+        """Map UID -> literal from an imaplib FETCH response."""
+        result: dict[int, bytes] = {}
+        for i, item in enumerate(fetched):
+            if not (isinstance(item, tuple) and len(item) >= 2):
+                continue
+            head = bytes(item[0])
+            m = re.search(rb"UID\s+(\d+)", head)
+            # Some servers send the UID after the literal.
+            if not m and i + 1 < len(fetched) and isinstance(fetched[i + 1], (bytes, bytearray)):
+                m = re.search(rb"UID\s+(\d+)", bytes(fetched[i + 1]))
+            if m and isinstance(item[1], (bytes, bytearray)):
+                result[int(m.group(1))] = bytes(item[1])
+        return result
+
+    @staticmethod
+    def _sender_of(header: bytes | None) -> str:
+        if not header:
+            return ""
+        parsed = BytesParser(policy=policy.default).parsebytes(header, headersonly=True)
+        return parseaddr(parsed.get("From", ""))[1].strip().lower()
+
+    @staticmethod
+    def _uid_set(uids: list[int]) -> str:
+        """Compress sorted UIDs into an IMAP message set, e.g. "3:5,9"."""
+        ranges: list[str] = []
+        for _, group in itertools.groupby(enumerate(uids), lambda p: p[1] - p[0]):
+            run = [uid for _, uid in group]
+            ranges.append(f"{run[0]}:{run[-1]}" if len(run) > 1 else str(run[0]))
+        return ",".join(ranges)
+
+    # ---- UID high-water mark ------------------------------------------------
+
+    def _state_key(self) -> str:
+        mailbox = self.config.imap_mailbox or "INBOX"
+        return f"{self.config.imap_username}@{self.config.imap_host}/{mailbox}"
+
+    def _load_uid_state(self) -> dict[str, Any]:
+        if self._uid_state is None:
+            self._uid_state = {}
             try:
-                client.logout()
-            except Exception:
+                data = json.loads(self._state_path.read_text("utf-8"))
+                entry = data.get("mailboxes", {}).get(self._state_key())
+                if isinstance(entry, dict):
+                    self._uid_state = entry
+            except FileNotFoundError:
                 pass
-
-        return messages
+            except Exception as e:
+                logger.warning(f"Failed to read email state file: {e}")
+        return self._uid_state
+
+    def _last_uid(self, client: imaplib.IMAP4) -> int:
+        """Highest UID already handled, or 0 after a UIDVALIDITY change."""
+        state = self._load_uid_state()
+        _, data = client.response("UIDVALIDITY")
+        validity = int(data[0]) if data and data[0] else None
+        if validity is not None and state.get("uidValidity") != validity:
+            if state.get("uidValidity") is not None:
+                logger.warning("IMAP UIDVALIDITY changed, resetting email UID high-water mark")
+            state.clear()
+            state["uidValidity"] = validity
+        return int(state.get("lastUid", 0))
+
+    def _save_last_uid(self, uid: int) -> None:
+        state = self._load_uid_state()
+        if uid <= int(state.get("lastUid", 0)):
+            return
+        state["lastUid"] = uid
+        try:
+            try:
+                data = json.loads(self._state_path.read_text("utf-8"))
+            except (FileNotFoundError, ValueError):
+                data = {}
+            data.setdefault("mailboxes", {})[self._state_key()] = state
+            self._state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._state_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, indent=2) + "\n", "utf-8")
+            tmp.replace(self._state_path)
+        except Exception as e:
+            logger.warning(f"Failed to save email state file: {e}")
 
     @classmethod
     def _format_imap_date(cls, value: date) -> str:
@@ -322,23 +665,6 @@ class EmailChannel(BaseChannel):
         month = cls._IMAP_MONTHS[value.month - 1]
         return f"{value.day:02d}-{month}-{value.year}"
 
-    @staticmethod
-    def _extract_message_bytes(fetched: list[Any]) -> bytes | None:
-        for item in fetched:
-            if isinstance(item, tuple) and len(item) >= 2 and isinstance(item[1], (bytes, bytearray)):
-                return bytes(item[1])
-        return None
-
-    @staticmethod
-    def _extract_uid(fetched: list[Any]) -> str:
-        for item in fetched:
-            if isinstance(item, tuple) and item and isinstance(item[0], (bytes, bytearray)):
-                head = bytes(item[0]).decode("utf-8", errors="ignore")
-                m = re.search(r"UID\s+(\d+)", head)
-                if m:
-                    return m.group(1)
-        return ""
-
     @staticmethod
     def _decode_header_value(value: str) -> str:
         if not value:
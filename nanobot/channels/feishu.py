@@ -2,9 +2,9 @@
 
 import asyncio
 import json
-import re
 import threading
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from loguru import logger
@@ -12,6 +12,7 @@ from loguru import logger
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
+from nanobot.channels.markdown import to_feishu_elements
 from nanobot.config.schema import FeishuConfig
 
 try:
@@ -49,6 +50,11 @@ class FeishuChannel(BaseChannel):
     - App ID and App Secret from Feishu Open Platform
     - Bot capability enabled
     - Event subscription enabled (im.message.receive_v1)
+    
+    The SDK's HTTP calls are blocking, so outbound work (card building,
+    messages, reactions) runs on a small dedicated thread pool that bounds
+    concurrent API calls and never stalls the event loop. The single client
+    is reused so the SDK's cached tenant token is shared by all sends.
     """
     
     name = "feishu"
@@ -61,6 +67,7 @@ class FeishuChannel(BaseChannel):
         self._ws_thread: threading.Thread | None = None
         self._processed_message_ids: OrderedDict[str, None] = OrderedDict()  # Ordered dedup cache
         self._loop: asyncio.AbstractEventLoop | None = None
+        self._executor = self._new_executor()
     
     async def start(self) -> None:
         """Start the Feishu bot with WebSocket long connection."""
@@ -126,8 +133,18 @@ class FeishuChannel(BaseChannel):
                 self._ws_client.stop()
             except Exception as e:
                 logger.warning(f"Error stopping WebSocket client: {e}")
+        # Drop queued sends, but leave a fresh pool for a later start().
+        executor, self._executor = self._executor, self._new_executor()
+        executor.shutdown(wait=False, cancel_futures=True)
         logger.info("Feishu bot stopped")
     
+    def _new_executor(self) -> ThreadPoolExecutor:
+        # Threads are spawned lazily, so an unused pool costs nothing.
+        return ThreadPoolExecutor(
+            max_workers=max(1, self.config.send_concurrency),
+            thread_name_prefix="feishu-send",
+        )
+    
     def _add_reaction_sync(self, message_id: str, emoji_type: str) -> None:
         """Sync helper for adding reaction (runs in thread pool)."""
         try:
@@ -158,52 +175,23 @@ class FeishuChannel(BaseChannel):
             return
         
         loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, self._add_reaction_sync, message_id, emoji_type)
+        await loop.run_in_executor(self._executor, self._add_reaction_sync, message_id, emoji_type)
     
-    # Regex to match markdown tables (header + separator + data rows)
-    _TABLE_RE = re.compile(
-        r"((?:^[ \t]*\|.+\|[ \t]*\n)(?:^[ \t]*\|[-:\s|]+\|[ \t]*\n)(?:^[ \t]*\|.+\|[ \t]*\n?)+)",
-        re.MULTILINE,
-    )
-
-    @staticmethod
-    def _parse_md_table(table_text: str) -> dict | None:
-        """Parse a markdown table into a Feishu table element."""
-        lines = [l.strip() for l in table_text.strip().split("\n") if l.strip()]
-        if len(lines) < 3:
-            return None
-        split = lambda l: [c.strip() for c in l.strip("|").split("|")]
-        headers = split(lines[0])
-        rows = [split(l) for l in lines[2:]]
-        columns = [{"tag": "column", "name": f"c{i}", "display_name": h, "width": "auto"}
-                   for i, h in enumerate(headers)]
-        return {
-            "tag": "table",
-            "page_size": len(rows) + 1,
-            "columns": columns,
-            "rows": [{f"c{i}": r[i] if i < len(r) else "" for i in range(len(headers))} for r in rows],
-        }
-
     def _build_card_elements(self, content: str) -> list[dict]:
         """Split content into markdown + table elements for Feishu card."""
-        elements, last_end = [], 0
-        for m in self._TABLE_RE.finditer(content):
-            before = content[last_end:m.start()].strip()
-            if before:
-                elements.append({"tag": "markdown", "content": before})
-            elements.append(self._parse_md_table(m.group(1)) or {"tag": "markdown", "content": m.group(1)})
-            last_end = m.end()
-        remaining = content[last_end:].strip()
-        if remaining:
-            elements.append({"tag": "markdown", "content": remaining})
-        return elements or [{"tag": "markdown", "content": content}]
+        return to_feishu_elements(content)
 
     async def send(self, msg: OutboundMessage) -> None:
-        """Send a message through Feishu."""
+        """Send a message through Feishu (non-blocking)."""
         if not self._client:
             logger.warning("Feishu client not initialized")
             return
         
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._send_sync, msg)
+    
+    def _send_sync(self, msg: OutboundMessage) -> None:
+        """Sync helper for building and sending a card (runs in the send pool)."""
         try:
             # Determine receive_id_type based on chat_id format
             # open_id starts with "ou_", chat_id starts with "oc_"
@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import asyncio
+import time
+from dataclasses import dataclass
 from typing import Any, TYPE_CHECKING
 
 from loguru import logger
@@ -10,12 +12,126 @@ from loguru import logger
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
+from nanobot.channels.media import MediaStore
 from nanobot.config.schema import Config
 
 if TYPE_CHECKING:
     from nanobot.session.manager import SessionManager
 
 
+@dataclass
+class OutboundStats:
+    """Delivery counters for one channel's outbound queue."""
+    sent: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    last_send_ms: float = 0.0
+    total_send_ms: float = 0.0
+
+    @property
+    def avg_send_ms(self) -> float:
+        """Average send latency over all completed sends."""
+        done = self.sent + self.failed
+        return self.total_send_ms / done if done else 0.0
+
+
+class ChannelOutbox:
+    """
+    Outbound queue with dedicated workers for a single channel.
+
+    Each channel gets its own queue so a slow or failing channel (SMTP,
+    rate-limited Discord) cannot delay delivery on the others. Up to
+    ``concurrency`` sends run at once, but messages for the same chat are
+    still delivered in order.
+    """
+
+    def __init__(self, name: str, channel: BaseChannel, concurrency: int = 1):
+        self.name = name
+        self.channel = channel
+        self.concurrency = max(1, concurrency)
+        self.queue: asyncio.Queue[OutboundMessage] = asyncio.Queue()
+        self.stats = OutboundStats()
+        self._chat_locks: dict[str, asyncio.Lock] = {}
+        self._chat_refs: dict[str, int] = {}
+        self._workers: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start the worker tasks."""
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the worker tasks."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, msg: OutboundMessage) -> None:
+        """Queue a message for delivery."""
+        self.queue.put_nowait(msg)
+
+    @property
+    def depth(self) -> int:
+        """Number of messages waiting to be sent."""
+        return self.queue.qsize()
+
+    async def _worker(self) -> None:
+        while True:
+            msg = await self.queue.get()
+            lock = self._acquire_chat_lock(msg.chat_id)
+            try:
+                async with lock:
+                    await self._send(msg)
+            finally:
+                self._release_chat_lock(msg.chat_id)
+                self.queue.task_done()
+
+    async def _send(self, msg: OutboundMessage) -> None:
+        self.stats.in_flight += 1
+        start = time.monotonic()
+        try:
+            await self.channel.send(msg)
+            self.stats.sent += 1
+        except Exception as e:
+            self.stats.failed += 1
+            logger.error(f"Error sending to {self.name}: {e}")
+        finally:
+            elapsed_ms = (time.monotonic() - start) * 1000
+            self.stats.in_flight -= 1
+            self.stats.last_send_ms = elapsed_ms
+            self.stats.total_send_ms += elapsed_ms
+
+    def _acquire_chat_lock(self, chat_id: str) -> asyncio.Lock:
+        lock = self._chat_locks.get(chat_id)
+        if lock is None:
+            lock = self._chat_locks[chat_id] = asyncio.Lock()
+        self._chat_refs[chat_id] = self._chat_refs.get(chat_id, 0) + 1
+        return lock
+
+    def _release_chat_lock(self, chat_id: str) -> None:
+        refs = self._chat_refs.get(chat_id, 1) - 1
+        if refs <= 0:
+            self._chat_refs.pop(chat_id, None)
+            self._chat_locks.pop(chat_id, None)
+        else:
+            self._chat_refs[chat_id] = refs
+
+    def get_status(self) -> dict[str, Any]:
+        """Queue depth and send latency for this channel."""
+        return {
+            "queue_depth": self.depth,
+            "in_flight": self.stats.in_flight,
+            "sent": self.stats.sent,
+            "failed": self.stats.failed,
+            "last_send_ms": round(self.stats.last_send_ms, 1),
+            "avg_send_ms": round(self.stats.avg_send_ms, 1),
+        }
+
+
 class ChannelManager:
     """
     Manages chat channels and coordinates message routing.
@@ -23,7 +139,7 @@ class ChannelManager:
     Responsibilities:
     - Initialize enabled channels (Telegram, WhatsApp, etc.)
     - Start/stop channels
-    - Route outbound messages
+    - Route outbound messages to per-channel outboxes
     """
     
     def __init__(self, config: Config, bus: MessageBus, session_manager: "SessionManager | None" = None):
@@ -31,7 +147,15 @@ class ChannelManager:
         self.bus = bus
         self.session_manager = session_manager
         self.channels: dict[str, BaseChannel] = {}
+        self.outboxes: dict[str, ChannelOutbox] = {}
         self._dispatch_task: asyncio.Task | None = None
+        media = config.channels.media
+        self.media_store = MediaStore(
+            max_bytes=media.max_bytes,
+            max_age_s=media.max_age_seconds,
+            max_file_bytes=media.max_file_bytes,
+            gc_interval_s=media.gc_interval_seconds,
+        )
         
         self._init_channels()
     
@@ -47,6 +171,7 @@ class ChannelManager:
                     self.bus,
                     groq_api_key=self.config.providers.groq.api_key,
                     session_manager=self.session_manager,
+                    media_store=self.media_store,
                 )
                 logger.info("Telegram channel enabled")
             except ImportError as e:
@@ -68,7 +193,7 @@ class ChannelManager:
             try:
                 from nanobot.channels.discord import DiscordChannel
                 self.channels["discord"] = DiscordChannel(
-                    self.config.channels.discord, self.bus
+                    self.config.channels.discord, self.bus, media_store=self.media_store
                 )
                 logger.info("Discord channel enabled")
             except ImportError as e:
@@ -197,6 +322,11 @@ class ChannelManager:
             except asyncio.CancelledError:
                 pass
         
+        # Stop outbound workers
+        for outbox in self.outboxes.values():
+            await outbox.stop()
+        self.outboxes.clear()
+        
         # Stop all channels
         for name, channel in self.channels.items():
             try:
@@ -206,7 +336,7 @@ class ChannelManager:
                 logger.error(f"Error stopping {name}: {e}")
     
     async def _dispatch_outbound(self) -> None:
-        """Dispatch outbound messages to the appropriate channel."""
+        """Route outbound messages from the bus to each channel's outbox."""
         logger.info("Outbound dispatcher started")
         
         while True:
@@ -216,12 +346,9 @@ class ChannelManager:
                     timeout=1.0
                 )
                 
-                channel = self.channels.get(msg.channel)
-                if channel:
-                    try:
-                        await channel.send(msg)
-                    except Exception as e:
-                        logger.error(f"Error sending to {msg.channel}: {e}")
+                outbox = self._get_outbox(msg.channel)
+                if outbox:
+                    outbox.submit(msg)
                 else:
                     logger.warning(f"Unknown channel: {msg.channel}")
                     
@@ -230,19 +357,38 @@ class ChannelManager:
             except asyncio.CancelledError:
                 break
     
+    def _get_outbox(self, name: str) -> ChannelOutbox | None:
+        """Get (or lazily start) the outbox for a channel."""
+        outbox = self.outboxes.get(name)
+        if outbox is None:
+            channel = self.channels.get(name)
+            if channel is None:
+                return None
+            outbox = ChannelOutbox(
+                name,
+                channel,
+                concurrency=self.config.gateway.outbound_concurrency,
+            )
+            outbox.start()
+            self.outboxes[name] = outbox
+        return outbox
+    
     def get_channel(self, name: str) -> BaseChannel | None:
         """Get a channel by name."""
         return self.channels.get(name)
     
     def get_status(self) -> dict[str, Any]:
         """Get status of all channels."""
-        return {
-            name: {
+        status: dict[str, Any] = {}
+        for name, channel in self.channels.items():
+            status[name] = {
                 "enabled": True,
-                "running": channel.is_running
+                "running": channel.is_running,
             }
-            for name, channel in self.channels.items()
-        }
+            outbox = self.outboxes.get(name)
+            if outbox:
+                status[name]["outbound"] = outbox.get_status()
+        return status
     
     @property
     def enabled_channels(self) -> list[str]:
@@ -0,0 +1,270 @@
+"""
+Markdown rendering shared by chat channels.
+
+Model output is parsed once into blocks (fenced code, tables, ordinary
+text) with precompiled patterns, and each renderer turns those blocks into
+one channel's format. Inline markup is handled in a single left-to-right
+pass per line, so nested constructs such as a link inside bold text come
+out right without a stack of ``re.sub`` passes.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any
+
+# Fenced code blocks may start mid-line; tables need header, separator and rows.
+FENCE_RE = re.compile(r"```(?P<lang>[\w]*)\n?(?P<body>[\s\S]*?)```")
+_BLOCK_RE = re.compile(
+    FENCE_RE.pattern
+    + r"|(?P<table>(?:^[ \t]*\|.+\|[ \t]*\n)(?:^[ \t]*\|[-:\s|]+\|[ \t]*\n)(?:^[ \t]*\|.+\|[ \t]*\n?)+)",
+    re.MULTILINE,
+)
+_LINE_RE = re.compile(r"^(?:#{1,6}\s+(?P<header>.+)|>\s*(?P<quote>.*)|[-*]\s+(?P<item>.*))$")
+_INLINE_RE = re.compile(
+    r"`(?P<code>[^`]+)`"
+    r"|\[(?P<label>[^\]]+)\]\((?P<url>[^)]+)\)"
+    r"|\*\*(?P<bold>.+?)\*\*"
+    r"|__(?P<bold2>.+?)__"
+    r"|(?<![a-zA-Z0-9])_(?P<italic>[^_]+)_(?![a-zA-Z0-9])"
+    r"|~~(?P<strike>.+?)~~"
+)
+
+
+@dataclass(frozen=True)
+class Block:
+    """One top-level piece of a markdown document."""
+    kind: str  # "text" | "code" | "table"
+    raw: str
+    lang: str = ""
+    body: str = ""
+    rows: tuple[tuple[str, ...], ...] = ()  # table: header row first
+
+
+def parse(text: str) -> list[Block]:
+    """Split markdown into text, fenced code and table blocks."""
+    blocks: list[Block] = []
+    pos = 0
+    for m in _BLOCK_RE.finditer(text):
+        if m.start() > pos:
+            blocks.append(Block("text", text[pos:m.start()]))
+        if m.group("table") is not None:
+            lines = [line.strip() for line in m.group("table").strip().split("\n") if line.strip()]
+            cells = [tuple(c.strip() for c in line.strip("|").split("|")) for line in lines]
+            blocks.append(Block("table", m.group(0), rows=(cells[0], *cells[2:])))
+        else:
+            blocks.append(Block("code", m.group(0), lang=m.group("lang"), body=m.group("body")))
+        pos = m.end()
+    if pos < len(text):
+        blocks.append(Block("text", text[pos:]))
+    return blocks
+
+
+class _Renderer:
+    """Plain text: markup removed, links spelled out."""
+
+    def escape(self, text: str) -> str:
+        return text
+
+    def code(self, text: str) -> str:
+        return text
+
+    def link(self, label: str, url: str) -> str:
+        return f"{label} ({url})"
+
+    def bold(self, inner: str) -> str:
+        return inner
+
+    def italic(self, inner: str) -> str:
+        return inner
+
+    def strike(self, inner: str) -> str:
+        return inner
+
+    def header(self, inner: str) -> str:
+        return inner
+
+    def quote(self, inner: str) -> str:
+        return f"> {inner}"
+
+    def item(self, inner: str) -> str:
+        return f"- {inner}"
+
+    def code_block(self, block: Block) -> str:
+        return block.body
+
+    def table(self, block: Block) -> str:
+        return self.text(block.raw)
+
+    def render(self, text: str) -> str:
+        if not text:
+            return ""
+        out = []
+        for block in parse(text):
+            if block.kind == "code":
+                out.append(self.code_block(block))
+            elif block.kind == "table":
+                out.append(self.table(block))
+            else:
+                out.append(self.text(block.raw))
+        return "".join(out)
+
+    def text(self, text: str) -> str:
+        return "\n".join(self.line(line) for line in text.split("\n"))
+
+    def line(self, line: str) -> str:
+        m = _LINE_RE.match(line)
+        if m is None:
+            return self.inline(line)
+        if m.group("header") is not None:
+            return self.header(self.inline(m.group("header")))
+        if m.group("quote") is not None:
+            return self.quote(self.inline(m.group("quote")))
+        return self.item(self.inline(m.group("item")))
+
+    def inline(self, text: str) -> str:
+        out = []
+        pos = 0
+        for m in _INLINE_RE.finditer(text):
+            out.append(self.escape(text[pos:m.start()]))
+            kind = m.lastgroup
+            if kind == "code":
+                out.append(self.code(m.group("code")))
+            elif kind == "url":
+                out.append(self.link(self.inline(m.group("label")), m.group("url")))
+            elif kind in ("bold", "bold2"):
+                out.append(self.bold(self.inline(m.group(kind))))
+            elif kind == "italic":
+                out.append(self.italic(self.inline(m.group("italic"))))
+            else:
+                out.append(self.strike(self.inline(m.group("strike"))))
+            pos = m.end()
+        out.append(self.escape(text[pos:]))
+        return "".join(out)
+
+
+def _html_escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+class _TelegramRenderer(_Renderer):
+    escape = staticmethod(_html_escape)
+
+    def code(self, text: str) -> str:
+        return f"<code>{_html_escape(text)}</code>"
+
+    def link(self, label: str, url: str) -> str:
+        return f'<a href="{_html_escape(url)}">{label}</a>'
+
+    def bold(self, inner: str) -> str:
+        return f"<b>{inner}</b>"
+
+    def italic(self, inner: str) -> str:
+        return f"<i>{inner}</i>"
+
+    def strike(self, inner: str) -> str:
+        return f"<s>{inner}</s>"
+
+    def quote(self, inner: str) -> str:
+        return inner
+
+    def item(self, inner: str) -> str:
+        return f"• {inner}"
+
+    def code_block(self, block: Block) -> str:
+        return f"<pre><code>{_html_escape(block.body)}</code></pre>"
+
+
+class _SlackRenderer(_Renderer):
+    escape = staticmethod(_html_escape)
+
+    def code(self, text: str) -> str:
+        return f"`{_html_escape(text)}`"
+
+    def link(self, label: str, url: str) -> str:
+        return f"<{url}|{label}>"
+
+    def bold(self, inner: str) -> str:
+        return f"*{inner}*"
+
+    def italic(self, inner: str) -> str:
+        return f"_{inner}_"
+
+    def strike(self, inner: str) -> str:
+        return f"~{inner}~"
+
+    def header(self, inner: str) -> str:
+        return f"*{inner}*"
+
+    def quote(self, inner: str) -> str:
+        return f"> {inner}"
+
+    def item(self, inner: str) -> str:
+        return f"• {inner}"
+
+    def code_block(self, block: Block) -> str:
+        return f"```\n{_html_escape(block.body)}```"
+
+    def table(self, block: Block) -> str:
+        return f"```\n{_html_escape(block.raw.rstrip())}\n```\n"
+
+
+_PLAIN = _Renderer()
+_TELEGRAM = _TelegramRenderer()
+_SLACK = _SlackRenderer()
+
+
+def to_telegram_html(text: str) -> str:
+    """Telegram HTML (parse_mode="HTML"); headers and quotes become plain lines."""
+    return _TELEGRAM.render(text)
+
+
+def to_slack_mrkdwn(text: str) -> str:
+    """Slack mrkdwn; tables are shown as preformatted text."""
+    return _SLACK.render(text)
+
+
+def to_plain_text(text: str) -> str:
+    """Plain text with markup removed (e.g. for email bodies)."""
+    return _PLAIN.render(text)
+
+
+def to_discord(text: str) -> str:
+    """Discord renders markdown itself; only tables need to become code blocks."""
+    blocks = parse(text or "")
+    if not any(b.kind == "table" for b in blocks):
+        return text
+    return "".join(
+        f"```\n{b.raw.rstrip()}\n```\n" if b.kind == "table" else b.raw for b in blocks
+    )
+
+
+def to_feishu_elements(text: str) -> list[dict[str, Any]]:
+    """Feishu card elements: markdown elements with tables as table elements."""
+    elements: list[dict[str, Any]] = []
+    pending: list[str] = []
+
+    def flush() -> None:
+        chunk = "".join(pending).strip()
+        if chunk:
+            elements.append({"tag": "markdown", "content": chunk})
+        pending.clear()
+
+    for block in parse(text):
+        if block.kind != "table":
+            pending.append(block.raw)
+            continue
+        flush()
+        headers, *rows = block.rows
+        elements.append({
+            "tag": "table",
+            "page_size": len(rows) + 1,
+            "columns": [
+                {"tag": "column", "name": f"c{i}", "display_name": h, "width": "auto"}
+                for i, h in enumerate(headers)
+            ],
+            "rows": [
+                {f"c{i}": r[i] if i < len(r) else "" for i in range(len(headers))} for r in rows
+            ],
+        })
+    flush()
+    return elements or [{"tag": "markdown", "content": text}]
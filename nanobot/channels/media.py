@@ -0,0 +1,224 @@
+"""
+Content-addressed store for media downloaded by chat channels.
+
+Files are named by the SHA-256 of their content, so the same photo sent
+twice (or forwarded between chats) is stored once. Channels that know a
+stable remote ID for a file (e.g. Telegram's ``file_unique_id``) can look
+it up before downloading at all. Downloads are streamed to a temporary file
+with a size cap, and a periodic garbage collection evicts files that have
+not been used for ``max_age_s`` and then the least recently used ones until
+the store fits in ``max_bytes``.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator
+
+import httpx
+from loguru import logger
+
+from nanobot.utils.helpers import get_data_path
+
+_CHUNK_BYTES = 64 * 1024
+_EXT_RE = re.compile(r"\.[A-Za-z0-9]{1,10}")
+
+
+def _safe_ext(ext: str) -> str:
+    return ext.lower() if _EXT_RE.fullmatch(ext) else ""
+
+
+class MediaTooLargeError(ValueError):
+    """Raised when a download exceeds the store's per-file size cap."""
+
+
+class MediaStore:
+    """Deduplicated, size-bounded media directory shared by all channels."""
+
+    def __init__(
+        self,
+        root: Path | None = None,
+        max_bytes: int = 2 * 1024**3,
+        max_age_s: float = 30 * 86400,
+        max_file_bytes: int = 20 * 1024 * 1024,
+        gc_interval_s: float = 600,
+    ):
+        self.root = root or get_data_path() / "media"
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.max_file_bytes = max_file_bytes
+        self.gc_interval_s = gc_interval_s
+        self._tmp = self.root / ".tmp"
+        self._index_path = self.root / ".index.json"
+        self._index: dict[str, str] | None = None  # remote key -> stored file name
+        self._last_gc = 0.0
+        # GC runs in a worker thread; this guards the index and the
+        # touch-vs-evict decision it shares with the event loop.
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> Path | None:
+        """Stored file previously saved under ``key``, marked as used; None if gone."""
+        with self._lock:
+            name = self._load_index().get(key)
+            if not name:
+                return None
+            path = self.root / name
+            if not path.exists():
+                self._index.pop(key, None)
+                return None
+            self._touch(path)
+            return path
+
+    async def save_stream(
+        self, chunks: AsyncIterator[bytes], ext: str = "", key: str | None = None
+    ) -> Path:
+        """Write a byte stream into the store and return the content-addressed path."""
+        tmp = self._tmp_path()
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(tmp, "wb") as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > self.max_file_bytes:
+                        raise MediaTooLargeError(f"media exceeds {self.max_file_bytes} bytes")
+                    digest.update(chunk)
+                    f.write(chunk)
+            path = self._commit(tmp, digest.hexdigest(), ext, key)
+        finally:
+            tmp.unlink(missing_ok=True)
+        await self.maybe_gc(keep=path)
+        return path
+
+    async def download(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        ext: str = "",
+        key: str | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> Path:
+        """Stream ``url`` into the store, reusing the stored copy for a known ``key``."""
+        if key and (path := self.lookup(key)):
+            return path
+        async with client.stream("GET", url, headers=headers) as response:
+            response.raise_for_status()
+            length = int(response.headers.get("content-length") or 0)
+            if length > self.max_file_bytes:
+                raise MediaTooLargeError(f"media exceeds {self.max_file_bytes} bytes")
+            return await self.save_stream(response.aiter_bytes(_CHUNK_BYTES), ext, key)
+
+    def add_file(self, src: Path, ext: str = "", key: str | None = None) -> Path:
+        """Move a file written by an SDK downloader into the store (then await ``maybe_gc``)."""
+        try:
+            if src.stat().st_size > self.max_file_bytes:
+                raise MediaTooLargeError(f"media exceeds {self.max_file_bytes} bytes")
+            digest = hashlib.sha256()
+            with open(src, "rb") as f:
+                while chunk := f.read(_CHUNK_BYTES):
+                    digest.update(chunk)
+            return self._commit(src, digest.hexdigest(), ext, key)
+        finally:
+            src.unlink(missing_ok=True)
+
+    def temp_path(self, ext: str = "") -> Path:
+        """Fresh path inside the store for SDKs that can only download to a file."""
+        return self._tmp_path(ext)
+
+    async def maybe_gc(self, keep: Path | None = None) -> None:
+        """Run ``gc`` in a worker thread once ``gc_interval_s`` has passed since the last run."""
+        if time.monotonic() - self._last_gc < self.gc_interval_s:
+            return
+        # Claimed up front so concurrent downloads don't start a second scan.
+        self._last_gc = time.monotonic()
+        await asyncio.to_thread(self.gc, keep)
+
+    def gc(self, keep: Path | None = None) -> int:
+        """Evict expired and least recently used files (except ``keep``); returns bytes freed."""
+        self._last_gc = time.monotonic()
+        if not self.root.exists():
+            return 0
+        now = time.time()
+        if self._tmp.exists():
+            # Leftovers from downloads interrupted by a crash
+            for entry in os.scandir(self._tmp):
+                if now - entry.stat().st_mtime > 3600:
+                    Path(entry.path).unlink(missing_ok=True)
+        files = []
+        for entry in os.scandir(self.root):
+            if entry.is_file() and not entry.name.startswith(".") and entry.path != str(keep):
+                st = entry.stat()
+                files.append((st.st_mtime, st.st_size, Path(entry.path)))
+        files.sort()
+
+        total = sum(size for _, size, _ in files)
+        freed = 0
+        evicted: set[str] = set()
+        for mtime, size, path in files:
+            if total <= self.max_bytes and now - mtime <= self.max_age_s:
+                break
+            with self._lock:
+                # Skip files stored or looked up again since the scan.
+                try:
+                    if path.stat().st_mtime != mtime:
+                        continue
+                except FileNotFoundError:
+                    pass
+                path.unlink(missing_ok=True)
+            evicted.add(path.name)
+            total -= size
+            freed += size
+
+        if freed:
+            with self._lock:
+                index = self._load_index()
+                self._index = {
+                    k: n for k, n in index.items()
+                    if n not in evicted or (self.root / n).exists()
+                }
+                self._save_index()
+            logger.debug(f"Media GC freed {freed} bytes")
+        return freed
+
+    def _commit(self, tmp: Path, digest: str, ext: str, key: str | None) -> Path:
+        path = self.root / f"{digest[:32]}{_safe_ext(ext)}"
+        with self._lock:
+            if path.exists():
+                self._touch(path)
+            else:
+                os.replace(tmp, path)
+            if key:
+                self._load_index()[key] = path.name
+                self._save_index()
+        return path
+
+    def _tmp_path(self, ext: str = "") -> Path:
+        self._tmp.mkdir(parents=True, exist_ok=True)
+        return self._tmp / f"{uuid.uuid4().hex}{_safe_ext(ext)}"
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _load_index(self) -> dict[str, str]:
+        if self._index is None:
+            try:
+                self._index = json.loads(self._index_path.read_text())
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self._index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._index or {}))
+        os.replace(tmp, self._index_path)
@@ -13,6 +13,7 @@ from slack_sdk.web.async_client import AsyncWebClient
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
+from nanobot.channels.markdown import to_slack_mrkdwn
 from nanobot.config.schema import SlackConfig
 
 
@@ -84,7 +85,7 @@ class SlackChannel(BaseChannel):
             use_thread = thread_ts and channel_type != "im"
             await self._web_client.chat_postMessage(
                 channel=msg.chat_id,
-                text=msg.content or "",
+                text=to_slack_mrkdwn(msg.content or ""),
                 thread_ts=thread_ts if use_thread else None,
             )
         except Exception as e:
@@ -3,17 +3,23 @@
 from __future__ import annotations
 
 import asyncio
-import re
-from typing import TYPE_CHECKING
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
+import httpx
 from loguru import logger
 from telegram import BotCommand, Update
+from telegram.error import BadRequest, RetryAfter
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
 from telegram.request import HTTPXRequest
 
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
+from nanobot.channels.markdown import FENCE_RE, to_telegram_html
+from nanobot.channels.media import MediaStore, MediaTooLargeError
 from nanobot.config.schema import TelegramConfig
 
 if TYPE_CHECKING:
@@ -24,63 +30,103 @@ def _markdown_to_telegram_html(text: str) -> str:
     """
     Convert markdown to Telegram-safe HTML.
     """
-    if not text:
-        return ""
-    
-    # 1. Extract and protect code blocks (preserve content from other processing)
-    code_blocks: list[str] = []
-    def save_code_block(m: re.Match) -> str:
-        code_blocks.append(m.group(1))
-        return f"\x00CB{len(code_blocks) - 1}\x00"
-    
-    text = re.sub(r'```[\w]*\n?([\s\S]*?)```', save_code_block, text)
-    
-    # 2. Extract and protect inline code
-    inline_codes: list[str] = []
-    def save_inline_code(m: re.Match) -> str:
-        inline_codes.append(m.group(1))
-        return f"\x00IC{len(inline_codes) - 1}\x00"
-    
-    text = re.sub(r'`([^`]+)`', save_inline_code, text)
-    
-    # 3. Headers # Title -> just the title text
-    text = re.sub(r'^#{1,6}\s+(.+)$', r'\1', text, flags=re.MULTILINE)
-    
-    # 4. Blockquotes > text -> just the text (before HTML escaping)
-    text = re.sub(r'^>\s*(.*)$', r'\1', text, flags=re.MULTILINE)
-    
-    # 5. Escape HTML special characters
-    text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-    
-    # 6. Links [text](url) - must be before bold/italic to handle nested cases
-    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2">\1</a>', text)
-    
-    # 7. Bold **text** or __text__
-    text = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', text)
-    text = re.sub(r'__(.+?)__', r'<b>\1</b>', text)
-    
-    # 8. Italic _text_ (avoid matching inside words like some_var_name)
-    text = re.sub(r'(?<![a-zA-Z0-9])_([^_]+)_(?![a-zA-Z0-9])', r'<i>\1</i>', text)
-    
-    # 9. Strikethrough ~~text~~
-    text = re.sub(r'~~(.+?)~~', r'<s>\1</s>', text)
-    
-    # 10. Bullet lists - item -> • item
-    text = re.sub(r'^[-*]\s+', '• ', text, flags=re.MULTILINE)
-    
-    # 11. Restore inline code with HTML tags
-    for i, code in enumerate(inline_codes):
-        # Escape HTML in code content
-        escaped = code.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        text = text.replace(f"\x00IC{i}\x00", f"<code>{escaped}</code>")
-    
-    # 12. Restore code blocks with HTML tags
-    for i, code in enumerate(code_blocks):
-        # Escape HTML in code content
-        escaped = code.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        text = text.replace(f"\x00CB{i}\x00", f"<pre><code>{escaped}</code></pre>")
-    
-    return text
+    return to_telegram_html(text)
+
+
+# Telegram rejects messages longer than this (counted after entity parsing;
+# measuring the generated HTML is a conservative stand-in).
+TELEGRAM_MAX_MESSAGE_LEN = 4096
+
+def _split_markdown(text: str, limit: int = TELEGRAM_MAX_MESSAGE_LEN) -> list[str]:
+    """
+    Split markdown into chunks whose Telegram HTML fits within ``limit``.
+
+    Chunks break between lines, never inside a fenced code block (those are
+    the placeholders ``_markdown_to_telegram_html`` protects); a block that is
+    too long on its own is split by lines and each part re-fenced. Lines too
+    long on their own are cut at whitespace where possible.
+    """
+    if len(_markdown_to_telegram_html(text)) <= limit:
+        return [text]
+
+    # Units: whole code blocks and single lines of ordinary text.
+    units: list[str] = []
+    pos = 0
+    for m in FENCE_RE.finditer(text):
+        units.extend(text[pos:m.start()].split("\n"))
+        units.append(m.group(0))
+        pos = m.end()
+    units.extend(text[pos:].split("\n"))
+
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for unit in units:
+        for piece in _fit_unit(unit, limit):
+            piece_len = len(_markdown_to_telegram_html(piece)) + 1
+            if current and size + piece_len > limit:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += piece_len
+    if current:
+        chunks.append("\n".join(current))
+    return [c for c in (chunk.strip("\n") for chunk in chunks) if c.strip()]
+
+
+def _fit_unit(unit: str, limit: int) -> list[str]:
+    """Split one line or code block until each part renders within ``limit``."""
+    if len(_markdown_to_telegram_html(unit)) <= limit:
+        return [unit]
+
+    fence = FENCE_RE.fullmatch(unit)
+    if fence:
+        lang, body = fence.group("lang"), fence.group("body")
+        lines = body.rstrip("\n").split("\n")
+        if len(lines) > 1:
+            mid = len(lines) // 2
+            halves = ["\n".join(lines[:mid]), "\n".join(lines[mid:])]
+        else:
+            halves = [body[: len(body) // 2], body[len(body) // 2:]]
+        return [
+            part
+            for half in halves
+            for part in _fit_unit(f"```{lang}\n{half}\n```", limit)
+        ]
+
+    mid = len(unit) // 2
+    cut = unit.rfind(" ", 0, mid + 1)
+    if cut <= 0:
+        cut = mid
+    return _fit_unit(unit[:cut], limit) + _fit_unit(unit[cut:].lstrip(" "), limit)
+
+
+class _TokenBucket:
+    """Allows ``rate`` sends per second on average, with bursts up to ``burst``."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def full(self) -> bool:
+        self._refill()
+        return self._tokens >= self.burst
+
+    async def acquire(self) -> None:
+        while True:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
 
 
 class TelegramChannel(BaseChannel):
@@ -88,6 +134,11 @@ class TelegramChannel(BaseChannel):
     Telegram channel using long polling.
     
     Simple and reliable - no webhook/public IP needed.
+    
+    Outbound replies are split to fit Telegram's message limit and paced by
+    token buckets matching its flood limits (about 30 messages/s overall,
+    1/s per private chat, 20/min per group); each chat's messages go out in
+    order, and a RetryAfter from Telegram is waited out and retried.
     """
     
     name = "telegram"
@@ -99,20 +150,34 @@ class TelegramChannel(BaseChannel):
         BotCommand("help", "Show available commands"),
     ]
     
+    # Flood limits: (rate per second, burst)
+    GLOBAL_RATE = (30.0, 30.0)
+    PRIVATE_CHAT_RATE = (1.0, 3.0)
+    GROUP_CHAT_RATE = (20 / 60, 5.0)
+    MAX_SEND_RETRIES = 3
+    # Idle per-chat limiters are dropped beyond this many chats
+    MAX_TRACKED_CHATS = 1024
+    
     def __init__(
         self,
         config: TelegramConfig,
         bus: MessageBus,
         groq_api_key: str = "",
         session_manager: SessionManager | None = None,
+        media_store: MediaStore | None = None,
     ):
         super().__init__(config, bus)
         self.config: TelegramConfig = config
         self.groq_api_key = groq_api_key
         self.session_manager = session_manager
+        self.media_store = media_store or MediaStore()
         self._app: Application | None = None
+        self._http: httpx.AsyncClient | None = None  # media downloads
         self._chat_ids: dict[str, int] = {}  # Map sender_id to chat_id for replies
         self._typing_tasks: dict[str, asyncio.Task] = {}  # chat_id -> typing loop task
+        self._global_bucket = _TokenBucket(*self.GLOBAL_RATE)
+        self._chat_buckets: dict[int, _TokenBucket] = {}
+        self._chat_locks: dict[int, asyncio.Lock] = {}
     
     async def start(self) -> None:
         """Start the Telegram bot with long polling."""
@@ -184,6 +249,9 @@ class TelegramChannel(BaseChannel):
             await self._app.stop()
             await self._app.shutdown()
             self._app = None
+        if self._http:
+            await self._http.aclose()
+            self._http = None
     
     async def send(self, msg: OutboundMessage) -> None:
         """Send a message through Telegram."""
@@ -197,25 +265,60 @@ class TelegramChannel(BaseChannel):
         try:
             # chat_id should be the Telegram chat ID (integer)
             chat_id = int(msg.chat_id)
-            # Convert markdown to Telegram HTML
-            html_content = _markdown_to_telegram_html(msg.content)
-            await self._app.bot.send_message(
-                chat_id=chat_id,
-                text=html_content,
-                parse_mode="HTML"
-            )
         except ValueError:
             logger.error(f"Invalid chat_id: {msg.chat_id}")
-        except Exception as e:
-            # Fallback to plain text if HTML parsing fails
+            return
+        
+        lock = self._chat_locks.setdefault(chat_id, asyncio.Lock())
+        async with lock:
+            for chunk in _split_markdown(msg.content or ""):
+                try:
+                    await self._send_chunk(chat_id, chunk)
+                except Exception as e:
+                    logger.error(f"Error sending Telegram message: {e}")
+                    break
+    
+    async def _send_chunk(self, chat_id: int, chunk: str) -> None:
+        """Send one chunk as HTML, falling back to plain text if Telegram rejects the markup."""
+        try:
+            await self._send_paced(chat_id, text=_markdown_to_telegram_html(chunk), parse_mode="HTML")
+        except BadRequest as e:
             logger.warning(f"HTML parse failed, falling back to plain text: {e}")
+            await self._send_paced(chat_id, text=chunk[:TELEGRAM_MAX_MESSAGE_LEN])
+    
+    async def _send_paced(self, chat_id: int, **kwargs: Any) -> None:
+        """send_message under the flood limits, waiting out RetryAfter."""
+        for attempt in range(self.MAX_SEND_RETRIES + 1):
+            await self._chat_bucket(chat_id).acquire()
+            await self._global_bucket.acquire()
             try:
-                await self._app.bot.send_message(
-                    chat_id=int(msg.chat_id),
-                    text=msg.content
-                )
-            except Exception as e2:
-                logger.error(f"Error sending Telegram message: {e2}")
+                await self._app.bot.send_message(chat_id=chat_id, **kwargs)
+                return
+            except RetryAfter as e:
+                if attempt == self.MAX_SEND_RETRIES:
+                    raise
+                delay = e.retry_after
+                if isinstance(delay, timedelta):
+                    delay = delay.total_seconds()
+                logger.warning(f"Telegram flood control for {chat_id}, retrying in {delay}s")
+                await asyncio.sleep(float(delay))
+    
+    def _chat_bucket(self, chat_id: int) -> _TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= self.MAX_TRACKED_CHATS:
+                self._prune_idle_chats()
+            # Group and channel ids are negative
+            rate = self.GROUP_CHAT_RATE if chat_id < 0 else self.PRIVATE_CHAT_RATE
+            bucket = self._chat_buckets[chat_id] = _TokenBucket(*rate)
+        return bucket
+    
+    def _prune_idle_chats(self) -> None:
+        for chat_id, bucket in list(self._chat_buckets.items()):
+            lock = self._chat_locks.get(chat_id)
+            if bucket.full and not (lock and lock.locked()):
+                del self._chat_buckets[chat_id]
+                self._chat_locks.pop(chat_id, None)
     
     async def _on_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /start command."""
@@ -311,16 +414,7 @@ class TelegramChannel(BaseChannel):
         # Download media if present
         if media_file and self._app:
             try:
-                file = await self._app.bot.get_file(media_file.file_id)
-                ext = self._get_extension(media_type, getattr(media_file, 'mime_type', None))
-                
-                # Save to workspace/media/
-                from pathlib import Path
-                media_dir = Path.home() / ".nanobot" / "media"
-                media_dir.mkdir(parents=True, exist_ok=True)
-                
-                file_path = media_dir / f"{media_file.file_id[:16]}{ext}"
-                await file.download_to_drive(str(file_path))
+                file_path = await self._download_media(media_file, media_type)
                 
                 media_paths.append(str(file_path))
                 
@@ -338,6 +432,8 @@ class TelegramChannel(BaseChannel):
                     content_parts.append(f"[{media_type}: {file_path}]")
                     
                 logger.debug(f"Downloaded {media_type} to {file_path}")
+            except MediaTooLargeError:
+                content_parts.append(f"[{media_type}: too large]")
             except Exception as e:
                 logger.error(f"Failed to download media: {e}")
                 content_parts.append(f"[{media_type}: download failed]")
@@ -393,6 +489,28 @@ class TelegramChannel(BaseChannel):
         """Log polling / handler errors instead of silently swallowing them."""
         logger.error(f"Telegram error: {context.error}")
 
+    async def _download_media(self, media_file: Any, media_type: str) -> Path:
+        """Fetch a Telegram file into the media store, reusing an earlier copy."""
+        key = f"telegram:{media_file.file_unique_id}"
+        if path := self.media_store.lookup(key):
+            return path
+        size = getattr(media_file, "file_size", None) or 0
+        if size > self.media_store.max_file_bytes:
+            raise MediaTooLargeError(f"{media_type} is {size} bytes")
+        ext = self._get_extension(media_type, getattr(media_file, "mime_type", None))
+        file = await self._app.bot.get_file(media_file.file_id)
+        if str(file.file_path or "").startswith(("https://", "http://")):
+            # Stream through the store so the size cap also holds mid-download.
+            if self._http is None:
+                self._http = httpx.AsyncClient(timeout=30.0, proxy=self.config.proxy or None)
+            return await self.media_store.download(self._http, file.file_path, ext, key=key)
+        # Local Bot API server: file_path is already a file on this machine.
+        tmp = self.media_store.temp_path(ext)
+        await file.download_to_drive(str(tmp))
+        path = self.media_store.add_file(tmp, ext, key=key)
+        await self.media_store.maybe_gc(keep=path)
+        return path
+
     def _get_extension(self, media_type: str, mime_type: str | None) -> str:
         """Get file extension based on media type."""
         if mime_type:
@@ -2,23 +2,22 @@
 
 import asyncio
 import os
-import signal
-from pathlib import Path
 import select
+import signal
 import sys
+from pathlib import Path
 
 import typer
-from rich.console import Console
-from rich.markdown import Markdown
-from rich.table import Table
-from rich.text import Text
-
 from prompt_toolkit import PromptSession
 from prompt_toolkit.formatted_text import HTML
 from prompt_toolkit.history import FileHistory
 from prompt_toolkit.patch_stdout import patch_stdout
+from rich.console import Console
+from rich.markdown import Markdown
+from rich.table import Table
+from rich.text import Text
 
-from nanobot import __version__, __logo__
+from nanobot import __logo__, __version__
 
 app = typer.Typer(
     name="goodbot",
@@ -319,63 +318,82 @@ def _enforce_runtime_profile(config, mode: str) -> None:
 # ============================================================================
 
 
-@app.command()
-def gateway(
-    port: int = typer.Option(18790, "--port", "-p", help="Gateway port"),
-    verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output"),
-):
-    """Start the goodbot gateway."""
-    from nanobot.config.loader import load_config, get_data_dir
-    from nanobot.bus.queue import MessageBus
+HEARTBEAT_SESSION_KEY = "cli:direct"  # Session heartbeat turns run in
+
+
+def _cron_session_key(job) -> str:
+    """Session a cron job's turn runs in (its delivery chat)."""
+    return f"{job.payload.channel or 'cli'}:{job.payload.to or 'direct'}"
+
+
+def _build_agent_runtime(config, bus, owns_session=None):
+    """Create the agent loop plus its cron and heartbeat services.
+
+    Returns (agent, cron, heartbeat); cron and heartbeat are only started by
+    the caller. With ``owns_session`` (a predicate on session keys), cron
+    only fires the jobs whose session this process owns and heartbeat only
+    runs here if it owns the heartbeat session, so every scheduled turn
+    lands in the worker that holds that session.
+    """
     from nanobot.agent.loop import AgentLoop
-    from nanobot.channels.manager import ChannelManager
-    from nanobot.session.manager import SessionManager
+    from nanobot.config.loader import get_data_dir
     from nanobot.cron.service import CronService
     from nanobot.cron.types import CronJob
+    from nanobot.heartbeat.scheduler import HeartbeatScheduler
     from nanobot.heartbeat.service import HeartbeatService
-    
-    if verbose:
-        import logging
-        logging.basicConfig(level=logging.DEBUG)
-    
-    console.print(f"{__logo__} Starting goodbot gateway on port {port}...")
-    
-    config = load_config()
-    config.gateway.port = port
-    _enforce_runtime_profile(config, mode="gateway")
-    bus = MessageBus()
+    from nanobot.session.manager import SessionManager
+
     provider = _make_provider(config)
     session_manager = SessionManager(config.workspace_path)
     
     # Create cron service first (callback set after agent creation)
-    cron_store_path = get_data_dir() / "cron" / "jobs.json"
-    cron = CronService(cron_store_path)
+    cron_store_path = get_data_dir() / "cron" / "jobs.db"
+    cron_config = config.gateway.cron
+    cron = CronService(
+        cron_store_path,
+        max_concurrency=cron_config.max_concurrency,
+        job_timeout_s=cron_config.job_timeout_s or None,
+        jitter_s=cron_config.jitter_s,
+        history_limit=cron_config.history_per_job,
+        misfire_grace_s=cron_config.misfire_grace_s,
+        owns=(lambda job: owns_session(_cron_session_key(job))) if owns_session else None,
+    )
     
-    # Create agent with cron service
-    agent = AgentLoop(
+    agent_kwargs = dict(
         bus=bus,
         provider=provider,
-        workspace=config.workspace_path,
         model=config.agents.defaults.model,
         max_iterations=config.agents.defaults.max_tool_iterations,
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
-        cron_service=cron,
         restrict_to_workspace=config.tools.restrict_to_workspace,
-        session_manager=session_manager,
         blocked_tools=config.tools.blocked_tools,
         allowed_tools=config.tools.allowed_tools,
+        subagent_config=config.agents.subagents,
+        image_max_side=config.agents.defaults.image_max_side,
+    )
+    
+    # Create agent with cron service
+    agent = AgentLoop(
+        workspace=config.workspace_path,
+        cron_service=cron,
+        session_manager=session_manager,
+        **agent_kwargs,
     )
     
     # Set cron callback (needs agent)
     async def on_cron_job(job: CronJob) -> str | None:
         """Execute a cron job through the agent."""
-        response = await agent.process_direct(
+        usage: dict[str, int] = {}
+        response = await agent.process_scheduled(
             job.payload.message,
             session_key=f"cron:{job.id}",
             channel=job.payload.channel or "cli",
             chat_id=job.payload.to or "direct",
+            usage=usage,
         )
+        if (run := CronService.current_run()) and usage:
+            run.tokens = usage.get("total_tokens")
         if job.payload.deliver and job.payload.to:
             from nanobot.bus.events import OutboundMessage
             await bus.publish_outbound(OutboundMessage(
@@ -389,14 +407,106 @@ def gateway(
     # Create heartbeat service
     async def on_heartbeat(prompt: str) -> str:
         """Execute heartbeat through the agent."""
-        return await agent.process_direct(prompt, session_key="heartbeat")
+        return await agent.process_scheduled(prompt, session_key="heartbeat")
     
-    heartbeat = HeartbeatService(
-        workspace=config.workspace_path,
-        on_heartbeat=on_heartbeat,
-        interval_s=30 * 60,  # 30 minutes
-        enabled=True
+    heartbeat_config = config.gateway.heartbeat
+    heartbeat_kwargs = dict(
+        interval_s=heartbeat_config.interval_s,
+        enabled=heartbeat_config.enabled and (
+            owns_session is None or owns_session(HEARTBEAT_SESSION_KEY)
+        ),
+        jitter_s=heartbeat_config.jitter_s,
+        recheck_s=heartbeat_config.recheck_s,
     )
+    if not heartbeat_config.workspaces:
+        heartbeat = HeartbeatService(
+            workspace=config.workspace_path, on_heartbeat=on_heartbeat, **heartbeat_kwargs
+        )
+        return agent, cron, heartbeat
+    
+    # Context, memory, skills and the file tools are bound to one workspace,
+    # so each extra workspace gets its own AgentLoop. These loops are never
+    # started: process_scheduled() runs their turns inline, in this process.
+    # They share the provider and session manager with the main agent and
+    # keep their heartbeat history in a per-workspace session.
+    workspace_agents: dict[Path, AgentLoop] = {config.workspace_path: agent}
+    
+    async def on_workspace_heartbeat(workspace: Path, prompt: str) -> str:
+        if workspace == config.workspace_path:
+            return await on_heartbeat(prompt)
+        if workspace not in workspace_agents:
+            workspace_agents[workspace] = AgentLoop(
+                workspace=workspace, session_manager=session_manager, **agent_kwargs
+            )
+        return await workspace_agents[workspace].process_scheduled(
+            prompt, chat_id=f"heartbeat:{workspace}"
+        )
+    
+    extra = [Path(ws).expanduser() for ws in heartbeat_config.workspaces]
+    heartbeat = HeartbeatScheduler(
+        [config.workspace_path, *extra],
+        on_heartbeat=on_workspace_heartbeat,
+        max_concurrency=heartbeat_config.max_concurrency,
+        **heartbeat_kwargs,
+    )
+    return agent, cron, heartbeat
+
+
+def _make_bus(config):
+    """Create the front-end message bus from gateway.bus settings."""
+    from nanobot.bus.queue import MessageBus
+    from nanobot.config.loader import get_data_dir
+
+    bus_cfg = config.gateway.bus
+    wal_path = None
+    if bus_cfg.durable:
+        wal_path = Path(bus_cfg.wal_path).expanduser() if bus_cfg.wal_path else None
+        wal_path = wal_path or get_data_dir() / "bus" / "inbound.db"
+    bus = MessageBus(
+        inbound_maxsize=bus_cfg.inbound_max_size,
+        outbound_maxsize=bus_cfg.outbound_max_size,
+        overflow_policy=bus_cfg.overflow_policy,
+        busy_message=bus_cfg.busy_message,
+        priority_weights=bus_cfg.priority_weights,
+        wal_path=wal_path,
+    )
+    recovered = bus.recover()
+    if recovered:
+        console.print(f"[green]✓[/green] Recovered {recovered} unprocessed inbound message(s)")
+    return bus
+
+
+@app.command()
+def gateway(
+    port: int = typer.Option(18790, "--port", "-p", help="Gateway port"),
+    workers: int = typer.Option(None, "--workers", "-w", help="Agent worker processes (default: gateway.workers)"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output"),
+):
+    """Start the goodbot gateway."""
+    from nanobot.channels.manager import ChannelManager
+    from nanobot.config.loader import load_config
+    from nanobot.heartbeat.scheduler import HeartbeatScheduler
+    from nanobot.session.manager import SessionManager
+    
+    if verbose:
+        import logging
+        logging.basicConfig(level=logging.DEBUG)
+    
+    console.print(f"{__logo__} Starting goodbot gateway on port {port}...")
+    
+    config = load_config()
+    config.gateway.port = port
+    if workers is not None:
+        config.gateway.workers = workers
+    _enforce_runtime_profile(config, mode="gateway")
+    bus = _make_bus(config)
+    
+    if config.gateway.workers > 1:
+        _run_sharded_gateway(config, bus)
+        return
+    
+    session_manager = SessionManager(config.workspace_path)
+    agent, cron, heartbeat = _build_agent_runtime(config, bus)
     
     # Create channel manager
     channels = ChannelManager(config, bus, session_manager=session_manager)
@@ -410,7 +520,10 @@ def gateway(
     if cron_status["jobs"] > 0:
         console.print(f"[green]✓[/green] Cron: {cron_status['jobs']} scheduled jobs")
     
-    console.print(f"[green]✓[/green] Heartbeat: every 30m")
+    if heartbeat.enabled:
+        console.print(f"[green]✓[/green] Heartbeat: every {heartbeat.interval_s // 60}m")
+    if heartbeat.enabled and isinstance(heartbeat, HeartbeatScheduler):
+        console.print(f"[green]✓[/green] Heartbeat workspaces: {len(heartbeat.services)}")
     
     async def run():
         try:
@@ -426,10 +539,101 @@ def gateway(
             cron.stop()
             agent.stop()
             await channels.stop_all()
+            bus.close()
     
     asyncio.run(run())
 
 
+def _run_sharded_gateway(config, bus) -> None:
+    """Run channels in this process and agents in N worker processes."""
+    import sys
+
+    from nanobot.bus.ipc import ShardRouter
+    from nanobot.channels.manager import ChannelManager
+    from nanobot.config.loader import get_data_dir
+    from nanobot.session.manager import SessionManager
+
+    n_workers = config.gateway.workers
+    socket_path = get_data_dir() / "gateway" / f"workers-{os.getpid()}.sock"
+
+    async def spawn_worker(shard: int) -> asyncio.subprocess.Process:
+        return await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "nanobot", "gateway-worker",
+            "--shard", str(shard),
+            "--workers", str(n_workers),
+            "--socket", str(socket_path),
+        )
+
+    router = ShardRouter(bus, socket_path, n_workers, spawn_worker)
+    channels = ChannelManager(config, bus, session_manager=SessionManager(config.workspace_path))
+
+    if channels.enabled_channels:
+        console.print(f"[green]✓[/green] Channels enabled: {', '.join(channels.enabled_channels)}")
+    else:
+        console.print("[yellow]Warning: No channels enabled[/yellow]")
+    console.print(
+        f"[green]✓[/green] Agent workers: {n_workers} "
+        "(cron jobs and heartbeat run in the worker owning their session)"
+    )
+
+    async def run():
+        try:
+            await router.start()
+            # Keep serving workers (cron, heartbeat) even with no channels enabled.
+            await asyncio.gather(channels.start_all(), asyncio.Event().wait())
+        except KeyboardInterrupt:
+            console.print("\nShutting down...")
+        finally:
+            await router.stop()
+            await channels.stop_all()
+            bus.close()
+
+    asyncio.run(run())
+
+
+@app.command("gateway-worker", hidden=True)
+def gateway_worker(
+    shard: int = typer.Option(..., "--shard", help="Worker index"),
+    workers: int = typer.Option(..., "--workers", help="Total number of workers"),
+    socket: str = typer.Option(..., "--socket", help="Front-end Unix socket path"),
+):
+    """Run one agent worker of a multi-process gateway."""
+    from nanobot.bus.ipc import WorkerBus, shard_for
+    from nanobot.config.loader import load_config
+
+    config = load_config()
+    _enforce_runtime_profile(config, mode="gateway")
+    bus_cfg = config.gateway.bus
+    bus = WorkerBus(
+        Path(socket),
+        shard,
+        priority_weights=bus_cfg.priority_weights,
+    )
+    # Every worker runs the schedulers, but a scheduled turn only fires in the
+    # worker the router sends that session's messages to, so each session
+    # keeps a single owner process.
+    agent, cron, heartbeat = _build_agent_runtime(
+        config, bus, owns_session=lambda key: shard_for(key, workers) == shard
+    )
+
+    async def run():
+        await cron.start()
+        await heartbeat.start()
+        loop_task = asyncio.create_task(agent.run())
+        try:
+            await bus.run_link()
+        finally:
+            heartbeat.stop()
+            cron.stop()
+            agent.stop()
+            await loop_task
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
 
 
 # ============================================================================
@@ -445,10 +649,11 @@ def agent(
     logs: bool = typer.Option(False, "--logs/--no-logs", help="Show goodbot runtime logs during chat"),
 ):
     """Interact with the agent directly."""
-    from nanobot.config.loader import load_config
-    from nanobot.bus.queue import MessageBus
-    from nanobot.agent.loop import AgentLoop
     from loguru import logger
+
+    from nanobot.agent.loop import AgentLoop
+    from nanobot.bus.queue import MessageBus
+    from nanobot.config.loader import load_config
     
     config = load_config()
     _enforce_runtime_profile(config, mode="agent")
@@ -470,6 +675,8 @@ def agent(
         restrict_to_workspace=config.tools.restrict_to_workspace,
         blocked_tools=config.tools.blocked_tools,
         allowed_tools=config.tools.allowed_tools,
+        subagent_config=config.agents.subagents,
+        image_max_side=config.agents.defaults.image_max_side,
     )
     
     # Show spinner when logs are off (no output to miss); skip when logs are on
@@ -675,6 +882,7 @@ def channels_login():
     """Link device via QR code."""
     import secrets
     import subprocess
+
     from nanobot.config.loader import load_config, save_config
     
     bridge_dir = _get_bridge_dir()
@@ -714,7 +922,7 @@ def cron_list(
     from nanobot.config.loader import get_data_dir
     from nanobot.cron.service import CronService
     
-    store_path = get_data_dir() / "cron" / "jobs.json"
+    store_path = get_data_dir() / "cron" / "jobs.db"
     service = CronService(store_path)
     
     jobs = service.list_jobs(include_disabled=all)
@@ -759,7 +967,9 @@ def cron_add(
     message: str = typer.Option(..., "--message", "-m", help="Message for agent"),
     every: int = typer.Option(None, "--every", "-e", help="Run every N seconds"),
     cron_expr: str = typer.Option(None, "--cron", "-c", help="Cron expression (e.g. '0 9 * * *')"),
+    tz: str = typer.Option(None, "--tz", help="Timezone for --cron (e.g. 'Europe/Berlin'; default: local)"),
     at: str = typer.Option(None, "--at", help="Run once at time (ISO format)"),
+    misfire: str = typer.Option("once", "--misfire", help="Missed runs after downtime: once, skip or all"),
     deliver: bool = typer.Option(False, "--deliver", "-d", help="Deliver response to channel"),
     to: str = typer.Option(None, "--to", help="Recipient for delivery"),
     channel: str = typer.Option(None, "--channel", help="Channel for delivery (e.g. 'telegram', 'whatsapp')"),
@@ -773,7 +983,7 @@ def cron_add(
     if every:
         schedule = CronSchedule(kind="every", every_ms=every * 1000)
     elif cron_expr:
-        schedule = CronSchedule(kind="cron", expr=cron_expr)
+        schedule = CronSchedule(kind="cron", expr=cron_expr, tz=tz)
     elif at:
         import datetime
         dt = datetime.datetime.fromisoformat(at)
@@ -782,17 +992,22 @@ def cron_add(
         console.print("[red]Error: Must specify --every, --cron, or --at[/red]")
         raise typer.Exit(1)
     
-    store_path = get_data_dir() / "cron" / "jobs.json"
+    store_path = get_data_dir() / "cron" / "jobs.db"
     service = CronService(store_path)
     
-    job = service.add_job(
-        name=name,
-        schedule=schedule,
-        message=message,
-        deliver=deliver,
-        to=to,
-        channel=channel,
-    )
+    try:
+        job = service.add_job(
+            name=name,
+            schedule=schedule,
+            message=message,
+            deliver=deliver,
+            to=to,
+            channel=channel,
+            misfire=misfire,
+        )
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
     
     console.print(f"[green]✓[/green] Added job '{job.name}' ({job.id})")
 
@@ -805,7 +1020,7 @@ def cron_remove(
     from nanobot.config.loader import get_data_dir
     from nanobot.cron.service import CronService
     
-    store_path = get_data_dir() / "cron" / "jobs.json"
+    store_path = get_data_dir() / "cron" / "jobs.db"
     service = CronService(store_path)
     
     if service.remove_job(job_id):
@@ -823,7 +1038,7 @@ def cron_enable(
     from nanobot.config.loader import get_data_dir
     from nanobot.cron.service import CronService
     
-    store_path = get_data_dir() / "cron" / "jobs.json"
+    store_path = get_data_dir() / "cron" / "jobs.db"
     service = CronService(store_path)
     
     job = service.enable_job(job_id, enabled=not disable)
@@ -843,18 +1058,114 @@ def cron_run(
     from nanobot.config.loader import get_data_dir
     from nanobot.cron.service import CronService
     
-    store_path = get_data_dir() / "cron" / "jobs.json"
+    store_path = get_data_dir() / "cron" / "jobs.db"
     service = CronService(store_path)
     
     async def run():
         return await service.run_job(job_id, force=force)
     
     if asyncio.run(run()):
-        console.print(f"[green]✓[/green] Job executed")
+        console.print("[green]✓[/green] Job executed")
     else:
         console.print(f"[red]Failed to run job {job_id}[/red]")
 
 
+@cron_app.command("runs")
+def cron_runs(
+    job_id: str = typer.Argument(None, help="Only show runs of this job"),
+    limit: int = typer.Option(20, "--limit", "-l", help="Number of runs to show"),
+):
+    """Show recent job runs."""
+    from nanobot.config.loader import get_data_dir
+    from nanobot.cron.service import CronService
+    
+    store_path = get_data_dir() / "cron" / "jobs.db"
+    service = CronService(store_path)
+    
+    runs = service.history(job_id=job_id, limit=limit)
+    if not runs:
+        console.print("No recorded runs.")
+        return
+    
+    names = {j.id: j.name for j in service.list_jobs(include_disabled=True)}
+    table = Table(title="Job Runs")
+    table.add_column("Started")
+    table.add_column("Job", style="cyan")
+    table.add_column("Status")
+    table.add_column("Late", justify="right")
+    table.add_column("Duration", justify="right")
+    table.add_column("Tokens", justify="right")
+    table.add_column("Chars", justify="right")
+    
+    import time
+    styles = {"ok": "green", "error": "red", "skipped": "yellow"}
+    for run in runs:
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run.started_at_ms / 1000))
+        status = f"[{styles[run.status]}]{run.status}[/{styles[run.status]}]"
+        if run.error:
+            status += f" {run.error[:40]}"
+        table.add_row(
+            started,
+            f"{names.get(run.job_id, '?')} ({run.job_id})",
+            status,
+            f"{run.lateness_ms}ms" if run.lateness_ms is not None else "manual",
+            f"{run.duration_ms}ms",
+            str(run.tokens) if run.tokens is not None else "",
+            str(run.response_chars) if run.response_chars is not None else "",
+        )
+    
+    console.print(table)
+
+
+@cron_app.command("stats")
+def cron_stats(
+    hours: float = typer.Option(None, "--hours", help="Only count runs from the last N hours"),
+):
+    """Show aggregate run metrics (outcomes, lateness, duration, tokens)."""
+    from nanobot.config.loader import get_data_dir
+    from nanobot.cron.service import CronService
+    
+    store_path = get_data_dir() / "cron" / "jobs.db"
+    service = CronService(store_path)
+    
+    import time
+    since_ms = int((time.time() - hours * 3600) * 1000) if hours else None
+    metrics = service.metrics(since_ms=since_ms)
+    if not metrics["all"]["runs"]:
+        console.print("No recorded runs.")
+        return
+    
+    names = {j.id: j.name for j in service.list_jobs(include_disabled=True)}
+    table = Table(title="Job Run Metrics")
+    table.add_column("Job", style="cyan")
+    table.add_column("Runs", justify="right")
+    table.add_column("OK", justify="right")
+    table.add_column("Errors", justify="right")
+    table.add_column("Skipped", justify="right")
+    table.add_column("Late avg/p95/max", justify="right")
+    table.add_column("Duration avg/p95", justify="right")
+    table.add_column("Tokens", justify="right")
+    
+    def ms(value: int | None) -> str:
+        return "-" if value is None else f"{value}ms"
+    
+    rows = [(f"{names.get(job_id, '?')} ({job_id})", m) for job_id, m in metrics["jobs"].items()]
+    rows.append(("[bold]all[/bold]", metrics["all"]))
+    for label, m in rows:
+        table.add_row(
+            label,
+            str(m["runs"]),
+            str(m["ok"]),
+            str(m["errors"]),
+            str(m["skipped"]),
+            f"{ms(m['lateness_avg_ms'])} / {ms(m['lateness_p95_ms'])} / {ms(m['lateness_max_ms'])}",
+            f"{ms(m['duration_avg_ms'])} / {ms(m['duration_p95_ms'])}",
+            str(m["tokens"]),
+        )
+    
+    console.print(table)
+
+
 # ============================================================================
 # Status Commands
 # ============================================================================
@@ -863,7 +1174,7 @@ def cron_run(
 @app.command()
 def status():
     """Show goodbot status."""
-    from nanobot.config.loader import load_config, get_config_path
+    from nanobot.config.loader import get_config_path, load_config
 
     config_path = get_config_path()
     config = load_config()
@@ -30,6 +30,7 @@ class FeishuConfig(BaseModel):
     app_secret: str = ""  # App Secret from Feishu Open Platform
     encrypt_key: str = ""  # Encrypt Key for event subscription (optional)
     verification_token: str = ""  # Verification Token for event subscription (optional)
+    send_concurrency: int = 4  # Concurrent outbound API calls (messages, reactions)
     allow_from: list[str] = Field(default_factory=list)  # Allowed user open_ids
     allow_unlisted_senders: bool = False  # If false, empty allow_from means deny all senders
 
@@ -95,12 +96,18 @@ class EmailConfig(BaseModel):
     smtp_use_tls: bool = True
     smtp_use_ssl: bool = False
     from_address: str = ""
+    smtp_pool_size: int = 2  # Logged-in SMTP sessions kept for reuse
+    smtp_idle_timeout_seconds: int = 60  # Close pooled sessions idle longer than this
 
     # Behavior
     auto_reply_enabled: bool = True  # If false, inbound email is read but no automatic reply is sent
-    poll_interval_seconds: int = 30
+    poll_interval_seconds: int = 30  # Used when the server lacks IDLE or imap_idle is off
+    imap_idle: bool = True  # Wait for new mail with IMAP IDLE on a persistent session
+    imap_idle_seconds: int = 1500  # Renew IDLE after this much silence (servers cap ~30 min)
+    imap_reconnect_max_seconds: int = 300  # Upper bound of the reconnect backoff
     mark_seen: bool = True
     max_body_chars: int = 12000
+    max_fetch_bytes: int = 1_000_000  # Only this much of each message is downloaded
     subject_prefix: str = "Re: "
     allow_from: list[str] = Field(default_factory=list)  # Allowed sender email addresses
     allow_unlisted_senders: bool = False  # If false, empty allow_from means deny all senders
@@ -170,8 +177,17 @@ class QQConfig(BaseModel):
     allow_from: list[str] = Field(default_factory=list)  # Allowed user openids (empty = public access)
 
 
+class MediaConfig(BaseModel):
+    """Shared store for media downloaded by channels (~/.nanobot/media)."""
+    max_bytes: int = 2 * 1024**3  # Least recently used files are evicted above this total
+    max_age_seconds: int = 30 * 86400  # Files unused for this long are evicted
+    max_file_bytes: int = 20 * 1024 * 1024  # Larger downloads are refused
+    gc_interval_seconds: int = 600  # Minimum time between garbage collections
+
+
 class ChannelsConfig(BaseModel):
     """Configuration for chat channels."""
+    media: MediaConfig = Field(default_factory=MediaConfig)
     whatsapp: WhatsAppConfig = Field(default_factory=WhatsAppConfig)
     telegram: TelegramConfig = Field(default_factory=TelegramConfig)
     discord: DiscordConfig = Field(default_factory=DiscordConfig)
@@ -191,11 +207,23 @@ class AgentDefaults(BaseModel):
     max_tokens: int = 8192
     temperature: float = 0.7
     max_tool_iterations: int = 20
+    image_max_side: int = 0  # Longest image edge sent to the model; 0 picks one for the model
+
+
+class SubagentConfig(BaseModel):
+    """Limits for background subagents started by the spawn tool."""
+    max_concurrent: int = 3  # Running at once across all chats
+    max_per_session: int = 2  # Running at once for one chat
+    max_queued: int = 20  # Waiting tasks before spawn is refused
+    timeout_s: float = 600.0  # Per task (0 = none)
+    token_budget: int = 200_000  # Total tokens per task (0 = unlimited)
+    max_iterations: int = 15
 
 
 class AgentsConfig(BaseModel):
     """Agent configuration."""
     defaults: AgentDefaults = Field(default_factory=AgentDefaults)
+    subagents: SubagentConfig = Field(default_factory=SubagentConfig)
 
 
 class ProviderConfig(BaseModel):
@@ -222,10 +250,49 @@ class ProvidersConfig(BaseModel):
     aihubmix: ProviderConfig = Field(default_factory=ProviderConfig)  # AiHubMix API gateway
 
 
+class BusConfig(BaseModel):
+    """Message bus queue limits and overload behavior."""
+    inbound_max_size: int = 0  # 0 = unbounded; with workers > 1 it also bounds each worker's queue
+    outbound_max_size: int = 0  # 0 = unbounded; producers wait when full
+    overflow_policy: str = "block"  # block | drop_oldest | coalesce | busy
+    busy_message: str = "I'm handling a lot of messages right now. Please try again in a moment."
+    # Weighted fair share per priority lane (interactive | system | scheduled)
+    priority_weights: dict[str, int] = Field(
+        default_factory=lambda: {"interactive": 6, "system": 2, "scheduled": 1}
+    )
+    durable: bool = False  # Log inbound messages and replay unfinished ones after a restart
+    wal_path: str = ""  # Defaults to ~/.nanobot/bus/inbound.db
+
+
+class CronConfig(BaseModel):
+    """Scheduled job execution limits."""
+    max_concurrency: int = 4  # Due jobs that may run at the same time
+    job_timeout_s: float = 600.0  # Default per-run timeout (0 = none)
+    jitter_s: float = 0.0  # Random start delay of up to this many seconds
+    history_per_job: int = 200  # Run records kept per job
+    misfire_grace_s: float = 60.0  # Lateness beyond this applies the job's misfire policy
+
+
+class HeartbeatConfig(BaseModel):
+    """Periodic HEARTBEAT.md check."""
+    enabled: bool = True
+    interval_s: int = 30 * 60
+    jitter_s: float = 0.0  # Each wait is interval_s +/- up to this many seconds
+    recheck_s: float = 6 * 60 * 60  # Check unchanged HEARTBEAT.md at least this often (0 = never)
+    # Extra workspaces to heartbeat from this gateway (staggered over the interval)
+    workspaces: list[str] = Field(default_factory=list)
+    max_concurrency: int = 4  # Heartbeat turns running at once across workspaces
+
+
 class GatewayConfig(BaseModel):
     """Gateway/server configuration."""
     host: str = "0.0.0.0"
     port: int = 18790
+    workers: int = 1  # Agent worker processes; >1 shards sessions across processes
+    bus: BusConfig = Field(default_factory=BusConfig)
+    outbound_concurrency: int = 2  # Concurrent sends per channel (same-chat order is preserved)
+    cron: CronConfig = Field(default_factory=CronConfig)
+    heartbeat: HeartbeatConfig = Field(default_factory=HeartbeatConfig)
 
 
 class WebSearchConfig(BaseModel):
@@ -1,21 +1,102 @@
 """Cron service for scheduling agent tasks."""
 
 import asyncio
-import json
+import heapq
+import random
 import time
 import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime
 from pathlib import Path
 from typing import Any, Callable, Coroutine
+from zoneinfo import ZoneInfo
 
 from loguru import logger
 
-from nanobot.cron.types import CronJob, CronJobState, CronPayload, CronSchedule, CronStore
+from nanobot.cron.store import CronJobStore
+from nanobot.cron.types import CronJob, CronJobState, CronPayload, CronRun, CronSchedule
+
+# The run record of the job executing in the current task, so on_job
+# callbacks can attach details such as token usage.
+_current_run: ContextVar[CronRun | None] = ContextVar("cron_current_run", default=None)
 
 
 def _now_ms() -> int:
     return int(time.time() * 1000)
 
 
+def _percentile(values: list[int], pct: float) -> int | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def _summarize(runs: list[CronRun]) -> dict[str, Any]:
+    lateness = [r.lateness_ms for r in runs if r.lateness_ms is not None]
+    durations = [r.duration_ms for r in runs if r.status != "skipped"]
+    return {
+        "runs": len(runs),
+        "ok": sum(r.status == "ok" for r in runs),
+        "errors": sum(r.status == "error" for r in runs),
+        "skipped": sum(r.status == "skipped" for r in runs),
+        "lateness_avg_ms": sum(lateness) // len(lateness) if lateness else None,
+        "lateness_p95_ms": _percentile(lateness, 0.95),
+        "lateness_max_ms": max(lateness, default=None),
+        "duration_avg_ms": sum(durations) // len(durations) if durations else None,
+        "duration_p95_ms": _percentile(durations, 0.95),
+        "tokens": sum(r.tokens or 0 for r in runs),
+    }
+
+
+# What to do with a recurring job whose slot passed while the service was
+# down or overloaded: run it once, skip to the next slot, or run every
+# missed slot in order.
+MISFIRE_POLICIES = ("once", "skip", "all")
+MAX_CATCH_UP_RUNS = 100
+
+# Parsed croniter objects keyed by (expr, tz). They are repositioned with
+# set_current() before each use, so one instance serves every job that
+# shares an expression.
+_CRON_CACHE_SIZE = 1024
+_cron_cache: "OrderedDict[tuple[str, str | None], Any]" = OrderedDict()
+
+
+def _cron_iter(expr: str, tz: str | None) -> Any:
+    key = (expr, tz)
+    it = _cron_cache.get(key)
+    if it is None:
+        from croniter import croniter
+        it = croniter(expr, _localize(_now_ms(), tz))
+        _cron_cache[key] = it
+        if len(_cron_cache) > _CRON_CACHE_SIZE:
+            _cron_cache.popitem(last=False)
+    else:
+        _cron_cache.move_to_end(key)
+    return it
+
+
+def _localize(ms: int, tz: str | None) -> datetime:
+    """Wall-clock time in the schedule's zone (naive local time if none)."""
+    if tz:
+        return datetime.fromtimestamp(ms / 1000, ZoneInfo(tz))
+    return datetime.fromtimestamp(ms / 1000)
+
+
+def validate_schedule(schedule: CronSchedule) -> None:
+    """Raise ValueError if the schedule's expression or timezone is invalid."""
+    if schedule.tz:
+        try:
+            ZoneInfo(schedule.tz)
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"Unknown timezone: {schedule.tz}") from e
+    if schedule.kind == "cron":
+        from croniter import croniter
+        if not schedule.expr or not croniter.is_valid(schedule.expr):
+            raise ValueError(f"Invalid cron expression: {schedule.expr!r}")
+
+
 def _compute_next_run(schedule: CronSchedule, now_ms: int) -> int | None:
     """Compute next run time in ms."""
     if schedule.kind == "at":
@@ -29,10 +110,9 @@ def _compute_next_run(schedule: CronSchedule, now_ms: int) -> int | None:
     
     if schedule.kind == "cron" and schedule.expr:
         try:
-            from croniter import croniter
-            cron = croniter(schedule.expr, time.time())
-            next_time = cron.get_next()
-            return int(next_time * 1000)
+            it = _cron_iter(schedule.expr, schedule.tz)
+            it.set_current(_localize(now_ms, schedule.tz), force=True)
+            return int(it.get_next(datetime).timestamp() * 1000)
         except Exception:
             return None
     
@@ -40,118 +120,125 @@ def _compute_next_run(schedule: CronSchedule, now_ms: int) -> int | None:
 
 
 class CronService:
-    """Service for managing and executing scheduled jobs."""
+    """
+    Service for managing and executing scheduled jobs.
+    
+    Jobs are indexed by id and armed on a min-heap of (next_run_at_ms, id)
+    entries, so finding the next wake time, popping due jobs and mutating a
+    job are O(log n) regardless of how many jobs exist. Heap entries are
+    invalidated lazily: an entry only counts if it still matches the job's
+    current next_run_at_ms.
+    
+    Due jobs run concurrently, at most ``max_concurrency`` at a time, each
+    under a timeout and after an optional random start delay of up to
+    ``jitter_s`` so jobs sharing a slot don't hit the LLM all at once.
+    
+    Cron expressions are evaluated in the schedule's timezone. A job found
+    more than ``misfire_grace_s`` past its slot is handled by its misfire
+    policy (see MISFIRE_POLICIES).
+    
+    Jobs live in a SQLite store that other processes (CLI, agent workers)
+    may write to; the timer wakes at least every ``REFRESH_INTERVAL_S`` to
+    pick up their changes, reading back only the rows that changed. With ``owns`` set, only the jobs it accepts are
+    scheduled here, so several processes can share one store and each fire
+    its own share of the jobs.
+    """
+    
+    REFRESH_INTERVAL_S = 30.0
     
     def __init__(
         self,
         store_path: Path,
-        on_job: Callable[[CronJob], Coroutine[Any, Any, str | None]] | None = None
+        on_job: Callable[[CronJob], Coroutine[Any, Any, str | None]] | None = None,
+        max_concurrency: int = 4,
+        job_timeout_s: float | None = 600.0,
+        jitter_s: float = 0.0,
+        history_limit: int = 200,
+        misfire_grace_s: float = 60.0,
+        owns: Callable[[CronJob], bool] | None = None,
     ):
         self.store_path = store_path
         self.on_job = on_job  # Callback to execute job, returns response text
-        self._store: CronStore | None = None
+        self.max_concurrency = max(1, max_concurrency)
+        self.job_timeout_s = job_timeout_s
+        self.jitter_s = max(0.0, jitter_s)
+        self.history_limit = history_limit  # Runs kept per job
+        self.misfire_grace_ms = int(misfire_grace_s * 1000)
+        self.owns = owns  # Which jobs this process fires (default: all)
+        self._db: CronJobStore | None = None
+        self._jobs: dict[str, CronJob] = {}
+        self._heap: list[tuple[int, str]] = []
         self._timer_task: asyncio.Task | None = None
         self._running = False
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._run_tasks: set[asyncio.Task] = set()
+        self._in_flight: dict[str, int] = {}  # job id -> runs in progress
     
-    def _load_store(self) -> CronStore:
-        """Load jobs from disk."""
-        if self._store:
-            return self._store
+    def _load_store(self) -> CronJobStore:
+        """Open the job database, picking up changes made by other processes."""
+        if self._db is not None:
+            if self._db.changed():
+                self._refresh()
+            return self._db
         
-        if self.store_path.exists():
+        self._db = CronJobStore(self.store_path)
+        self._reload()
+        legacy = self.store_path.with_suffix(".json")
+        if not self._jobs and legacy.exists() and legacy != self.store_path:
             try:
-                data = json.loads(self.store_path.read_text())
-                jobs = []
-                for j in data.get("jobs", []):
-                    jobs.append(CronJob(
-                        id=j["id"],
-                        name=j["name"],
-                        enabled=j.get("enabled", True),
-                        schedule=CronSchedule(
-                            kind=j["schedule"]["kind"],
-                            at_ms=j["schedule"].get("atMs"),
-                            every_ms=j["schedule"].get("everyMs"),
-                            expr=j["schedule"].get("expr"),
-                            tz=j["schedule"].get("tz"),
-                        ),
-                        payload=CronPayload(
-                            kind=j["payload"].get("kind", "agent_turn"),
-                            message=j["payload"].get("message", ""),
-                            deliver=j["payload"].get("deliver", False),
-                            channel=j["payload"].get("channel"),
-                            to=j["payload"].get("to"),
-                        ),
-                        state=CronJobState(
-                            next_run_at_ms=j.get("state", {}).get("nextRunAtMs"),
-                            last_run_at_ms=j.get("state", {}).get("lastRunAtMs"),
-                            last_status=j.get("state", {}).get("lastStatus"),
-                            last_error=j.get("state", {}).get("lastError"),
-                        ),
-                        created_at_ms=j.get("createdAtMs", 0),
-                        updated_at_ms=j.get("updatedAtMs", 0),
-                        delete_after_run=j.get("deleteAfterRun", False),
-                    ))
-                self._store = CronStore(jobs=jobs)
+                count = self._db.import_json(legacy)
+                legacy.rename(legacy.with_name(legacy.name + ".migrated"))
+                logger.info(f"Cron: migrated {count} jobs from {legacy}")
             except Exception as e:
-                logger.warning(f"Failed to load cron store: {e}")
-                self._store = CronStore()
-        else:
-            self._store = CronStore()
-        
-        return self._store
+                logger.warning(f"Failed to migrate legacy cron store {legacy}: {e}")
+            self._reload()
+        return self._db
+    
+    def _reload(self) -> None:
+        """Rebuild the in-memory index from the database."""
+        jobs = {j.id: j for j in self._db.load()}
+        # Jobs that are running keep their live objects so results aren't lost.
+        for job_id in self._in_flight:
+            if job_id in jobs and job_id in self._jobs:
+                jobs[job_id] = self._jobs[job_id]
+        self._jobs = jobs
+        self._rebuild_heap()
     
-    def _save_store(self) -> None:
-        """Save jobs to disk."""
-        if not self._store:
+    def _refresh(self) -> None:
+        """Apply only the jobs other processes wrote or deleted since we last looked."""
+        changes = self._db.changes()
+        if changes is None:
+            self._reload()
             return
-        
-        self.store_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        data = {
-            "version": self._store.version,
-            "jobs": [
-                {
-                    "id": j.id,
-                    "name": j.name,
-                    "enabled": j.enabled,
-                    "schedule": {
-                        "kind": j.schedule.kind,
-                        "atMs": j.schedule.at_ms,
-                        "everyMs": j.schedule.every_ms,
-                        "expr": j.schedule.expr,
-                        "tz": j.schedule.tz,
-                    },
-                    "payload": {
-                        "kind": j.payload.kind,
-                        "message": j.payload.message,
-                        "deliver": j.payload.deliver,
-                        "channel": j.payload.channel,
-                        "to": j.payload.to,
-                    },
-                    "state": {
-                        "nextRunAtMs": j.state.next_run_at_ms,
-                        "lastRunAtMs": j.state.last_run_at_ms,
-                        "lastStatus": j.state.last_status,
-                        "lastError": j.state.last_error,
-                    },
-                    "createdAtMs": j.created_at_ms,
-                    "updatedAtMs": j.updated_at_ms,
-                    "deleteAfterRun": j.delete_after_run,
-                }
-                for j in self._store.jobs
-            ]
-        }
-        
-        self.store_path.write_text(json.dumps(data, indent=2))
+        written, deleted = changes
+        for job_id in deleted:
+            self._jobs.pop(job_id, None)
+        for job in written:
+            if job.id in self._in_flight and job.id in self._jobs:
+                continue  # Running jobs keep their live objects
+            self._jobs[job.id] = job
+            self._schedule(job)
+    
+    def _save(self, *jobs: CronJob) -> None:
+        """Persist the given jobs (only their rows are written)."""
+        if self._db is None:
+            return
+        self._db.save(*(j for j in jobs if self._jobs.get(j.id) is j))
+    
+    def _forget(self, job_id: str) -> bool:
+        """Drop a job from the index and the database."""
+        removed = self._jobs.pop(job_id, None) is not None
+        if removed and self._db is not None:
+            self._db.delete(job_id)
+        return removed
     
     async def start(self) -> None:
         """Start the cron service."""
         self._running = True
         self._load_store()
-        self._recompute_next_runs()
-        self._save_store()
+        self._save(*self._recompute_next_runs())
         self._arm_timer()
-        logger.info(f"Cron service started with {len(self._store.jobs if self._store else [])} jobs")
+        logger.info(f"Cron service started with {len(self._jobs)} jobs")
     
     def stop(self) -> None:
         """Stop the cron service."""
@@ -159,35 +246,86 @@ class CronService:
         if self._timer_task:
             self._timer_task.cancel()
             self._timer_task = None
+        for task in self._run_tasks:
+            task.cancel()
+        if self._db is not None:
+            self._db.compact()
     
-    def _recompute_next_runs(self) -> None:
-        """Recompute next run times for all enabled jobs."""
-        if not self._store:
-            return
+    def _recompute_next_runs(self) -> list[CronJob]:
+        """Recompute next run times for all enabled jobs; returns the changed ones."""
         now = _now_ms()
-        for job in self._store.jobs:
-            if job.enabled:
-                job.state.next_run_at_ms = _compute_next_run(job.schedule, now)
+        changed = []
+        for job in self._jobs.values():
+            if job.enabled and self._owned(job):
+                if job.state.next_run_at_ms and job.state.next_run_at_ms <= now:
+                    continue  # Missed while down; the timer applies the misfire policy
+                next_run = _compute_next_run(job.schedule, now)
+                if next_run != job.state.next_run_at_ms:
+                    job.state.next_run_at_ms = next_run
+                    changed.append(job)
+        self._rebuild_heap()
+        return changed
+    
+    # ========== Scheduling heap ==========
+    
+    def _owned(self, job: CronJob) -> bool:
+        return self.owns is None or self.owns(job)
+    
+    def _rebuild_heap(self) -> None:
+        """Rebuild the heap from scratch (O(n)), dropping stale entries."""
+        # A running one-shot job keeps its due time until it finishes; arming
+        # it again would fire it twice.
+        self._heap = [
+            (j.state.next_run_at_ms, j.id) for j in self._jobs.values()
+            if j.enabled and j.state.next_run_at_ms and self._owned(j)
+            and not (j.schedule.kind == "at" and self._in_flight.get(j.id))
+        ]
+        heapq.heapify(self._heap)
+    
+    def _schedule(self, job: CronJob) -> None:
+        """Arm a job at its current next_run_at_ms (after any change to it)."""
+        if job.enabled and job.state.next_run_at_ms and self._owned(job):
+            heapq.heappush(self._heap, (job.state.next_run_at_ms, job.id))
+        # Superseded entries are skipped lazily; compact if they pile up.
+        if len(self._heap) > 2 * len(self._jobs) + 64:
+            self._rebuild_heap()
+    
+    def _is_live(self, entry: tuple[int, str]) -> bool:
+        run_at, job_id = entry
+        job = self._jobs.get(job_id)
+        return bool(job and job.enabled and job.state.next_run_at_ms == run_at)
+    
+    def _peek(self) -> tuple[int, str] | None:
+        """Return the earliest live heap entry, discarding stale ones."""
+        while self._heap and not self._is_live(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+    
+    def _pop_due(self, now_ms: int) -> list[CronJob]:
+        """Pop every job whose next run is at or before now_ms."""
+        due: dict[str, CronJob] = {}
+        while (entry := self._peek()) is not None and entry[0] <= now_ms:
+            heapq.heappop(self._heap)
+            due[entry[1]] = self._jobs[entry[1]]
+        return list(due.values())
     
     def _get_next_wake_ms(self) -> int | None:
         """Get the earliest next run time across all jobs."""
-        if not self._store:
-            return None
-        times = [j.state.next_run_at_ms for j in self._store.jobs 
-                 if j.enabled and j.state.next_run_at_ms]
-        return min(times) if times else None
+        entry = self._peek()
+        return entry[0] if entry else None
     
     def _arm_timer(self) -> None:
         """Schedule the next timer tick."""
         if self._timer_task:
             self._timer_task.cancel()
         
-        next_wake = self._get_next_wake_ms()
-        if not next_wake or not self._running:
+        if not self._running:
             return
         
-        delay_ms = max(0, next_wake - _now_ms())
-        delay_s = delay_ms / 1000
+        delay_s = self.REFRESH_INTERVAL_S
+        next_wake = self._get_next_wake_ms()
+        if next_wake:
+            delay_s = min(delay_s, max(0, next_wake - _now_ms()) / 1000)
         
         async def tick():
             await asyncio.sleep(delay_s)
@@ -197,61 +335,164 @@ class CronService:
         self._timer_task = asyncio.create_task(tick())
     
     async def _on_timer(self) -> None:
-        """Handle timer tick - run due jobs."""
-        if not self._store:
-            return
-        
+        """Handle timer tick - dispatch due jobs to the run pool."""
+        self._load_store()
         now = _now_ms()
-        due_jobs = [
-            j for j in self._store.jobs
-            if j.enabled and j.state.next_run_at_ms and now >= j.state.next_run_at_ms
-        ]
-        
-        for job in due_jobs:
-            await self._execute_job(job)
+        due = self._pop_due(now)
+        for job in due:
+            scheduled_at = job.state.next_run_at_ms or now
+            slots = self._slots_to_run(job, scheduled_at, now)
+            # Recurring jobs get their next slot right away, so a run that
+            # outlasts its interval meets the next slot while still in flight.
+            if job.schedule.kind != "at":
+                job.state.next_run_at_ms = _compute_next_run(job.schedule, now)
+                self._schedule(job)
+            
+            if not slots:
+                self._skip(job, now, scheduled_at, f"missed by {(now - scheduled_at) // 1000}s")
+                if job.schedule.kind == "at":
+                    self._finish_one_shot(job)
+                continue
+            if job.skip_if_running and self._in_flight.get(job.id):
+                self._skip(job, now, scheduled_at, "previous run still in progress")
+                continue
+            
+            self._in_flight[job.id] = self._in_flight.get(job.id, 0) + 1
+            task = asyncio.create_task(self._run_pooled(job, slots))
+            self._run_tasks.add(task)
+            task.add_done_callback(self._run_tasks.discard)
         
-        self._save_store()
+        self._save(*due)
         self._arm_timer()
     
-    async def _execute_job(self, job: CronJob) -> None:
-        """Execute a single job."""
+    def _slots_to_run(self, job: CronJob, scheduled_at: int, now: int) -> list[int]:
+        """The scheduled times to run now, after applying the misfire policy."""
+        if job.schedule.kind == "at":
+            missed = now - scheduled_at > self.misfire_grace_ms
+            return [] if missed and job.misfire == "skip" else [scheduled_at]
+        
+        slots = [scheduled_at]
+        while len(slots) <= MAX_CATCH_UP_RUNS:
+            slot = _compute_next_run(job.schedule, slots[-1])
+            if slot is None or slot > now:
+                break
+            slots.append(slot)
+        if now - scheduled_at <= self.misfire_grace_ms:
+            return slots[-1:]
+        if job.misfire == "skip":
+            return []
+        if job.misfire == "once":
+            return slots[-1:]
+        if len(slots) > MAX_CATCH_UP_RUNS:
+            logger.warning(f"Cron: job '{job.name}' catch-up capped at {MAX_CATCH_UP_RUNS} runs")
+        return slots[:MAX_CATCH_UP_RUNS]
+    
+    def _skip(self, job: CronJob, now: int, scheduled_at: int, reason: str) -> None:
+        job.state.last_status = "skipped"
+        job.state.last_error = reason
+        logger.warning(f"Cron: skipping job '{job.name}' ({job.id}), {reason}")
+        self._record(CronRun(
+            job_id=job.id, started_at_ms=now, scheduled_at_ms=scheduled_at,
+            status="skipped", error=reason,
+        ))
+    
+    async def _run_pooled(self, job: CronJob, slots: list[int]) -> None:
+        """Run a due job (once per slot, in order) inside the concurrency pool."""
+        try:
+            if self.jitter_s:
+                await asyncio.sleep(random.uniform(0, self.jitter_s))
+            async with self._slots:
+                for scheduled_at_ms in slots:
+                    await self._execute_job(job, scheduled_at_ms)
+        finally:
+            remaining = self._in_flight.get(job.id, 1) - 1
+            if remaining > 0:
+                self._in_flight[job.id] = remaining
+            else:
+                self._in_flight.pop(job.id, None)
+        if self._running:
+            self._save(job)
+            self._arm_timer()
+    
+    async def _execute_job(self, job: CronJob, scheduled_at_ms: int | None = None) -> None:
+        """
+        Execute a single job.
+        
+        Timer-driven runs pass the slot they were due at; those have already
+        been rescheduled. Manual runs pass None and are rescheduled here.
+        """
         start_ms = _now_ms()
-        logger.info(f"Cron: executing job '{job.name}' ({job.id})")
+        lateness = f" ({start_ms - scheduled_at_ms}ms late)" if scheduled_at_ms else ""
+        logger.info(f"Cron: executing job '{job.name}' ({job.id}){lateness}")
+        timeout = job.timeout_s if job.timeout_s is not None else self.job_timeout_s
+        run = CronRun(job_id=job.id, started_at_ms=start_ms, scheduled_at_ms=scheduled_at_ms)
+        token = _current_run.set(run)
         
         try:
             response = None
             if self.on_job:
-                response = await self.on_job(job)
+                response = await asyncio.wait_for(self.on_job(job), timeout=timeout)
+            if response is not None:
+                run.response_chars = len(response)
             
             job.state.last_status = "ok"
             job.state.last_error = None
             logger.info(f"Cron: job '{job.name}' completed")
             
+        except asyncio.TimeoutError:
+            job.state.last_status = "error"
+            job.state.last_error = f"timed out after {timeout}s"
+            logger.error(f"Cron: job '{job.name}' timed out after {timeout}s")
         except Exception as e:
             job.state.last_status = "error"
             job.state.last_error = str(e)
             logger.error(f"Cron: job '{job.name}' failed: {e}")
+        finally:
+            _current_run.reset(token)
         
         job.state.last_run_at_ms = start_ms
+        job.state.last_lateness_ms = run.lateness_ms
+        job.state.last_duration_ms = _now_ms() - start_ms
         job.updated_at_ms = _now_ms()
+        run.duration_ms = job.state.last_duration_ms
+        run.status = job.state.last_status
+        run.error = job.state.last_error
+        self._record(run)
         
-        # Handle one-shot jobs
         if job.schedule.kind == "at":
-            if job.delete_after_run:
-                self._store.jobs = [j for j in self._store.jobs if j.id != job.id]
-            else:
-                job.enabled = False
-                job.state.next_run_at_ms = None
-        else:
+            self._finish_one_shot(job)
+        elif scheduled_at_ms is None:
             # Compute next run
             job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
+            self._schedule(job)
+    
+    def _finish_one_shot(self, job: CronJob) -> None:
+        if job.delete_after_run:
+            self._forget(job.id)
+        else:
+            job.enabled = False
+            job.state.next_run_at_ms = None
+    
+    def _record(self, run: CronRun) -> None:
+        """Append a run to the job's history."""
+        if self._db is None or run.job_id not in self._jobs:
+            return
+        try:
+            self._db.add_run(run, keep=self.history_limit)
+        except Exception as e:
+            logger.warning(f"Cron: failed to record run of {run.job_id}: {e}")
     
     # ========== Public API ==========
     
+    @staticmethod
+    def current_run() -> CronRun | None:
+        """The run record of the job executing in this task (for on_job callbacks)."""
+        return _current_run.get()
+    
     def list_jobs(self, include_disabled: bool = False) -> list[CronJob]:
         """List all jobs."""
-        store = self._load_store()
-        jobs = store.jobs if include_disabled else [j for j in store.jobs if j.enabled]
+        self._load_store()
+        jobs = [j for j in self._jobs.values() if include_disabled or j.enabled]
         return sorted(jobs, key=lambda j: j.state.next_run_at_ms or float('inf'))
     
     def add_job(
@@ -263,9 +504,15 @@ class CronService:
         channel: str | None = None,
         to: str | None = None,
         delete_after_run: bool = False,
+        timeout_s: float | None = None,
+        skip_if_running: bool = True,
+        misfire: str = "once",
     ) -> CronJob:
-        """Add a new job."""
-        store = self._load_store()
+        """Add a new job. Raises ValueError for an invalid schedule or misfire policy."""
+        validate_schedule(schedule)
+        if misfire not in MISFIRE_POLICIES:
+            raise ValueError(f"Unknown misfire policy: {misfire}")
+        self._load_store()
         now = _now_ms()
         
         job = CronJob(
@@ -284,10 +531,14 @@ class CronService:
             created_at_ms=now,
             updated_at_ms=now,
             delete_after_run=delete_after_run,
+            timeout_s=timeout_s,
+            skip_if_running=skip_if_running,
+            misfire=misfire,
         )
         
-        store.jobs.append(job)
-        self._save_store()
+        self._jobs[job.id] = job
+        self._schedule(job)
+        self._save(job)
         self._arm_timer()
         
         logger.info(f"Cron: added job '{name}' ({job.id})")
@@ -295,13 +546,10 @@ class CronService:
     
     def remove_job(self, job_id: str) -> bool:
         """Remove a job by ID."""
-        store = self._load_store()
-        before = len(store.jobs)
-        store.jobs = [j for j in store.jobs if j.id != job_id]
-        removed = len(store.jobs) < before
+        self._load_store()
+        removed = self._forget(job_id)
         
         if removed:
-            self._save_store()
             self._arm_timer()
             logger.info(f"Cron: removed job {job_id}")
         
@@ -309,38 +557,61 @@ class CronService:
     
     def enable_job(self, job_id: str, enabled: bool = True) -> CronJob | None:
         """Enable or disable a job."""
-        store = self._load_store()
-        for job in store.jobs:
-            if job.id == job_id:
-                job.enabled = enabled
-                job.updated_at_ms = _now_ms()
-                if enabled:
-                    job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
-                else:
-                    job.state.next_run_at_ms = None
-                self._save_store()
-                self._arm_timer()
-                return job
-        return None
+        self._load_store()
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        job.enabled = enabled
+        job.updated_at_ms = _now_ms()
+        if enabled:
+            job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
+            self._schedule(job)
+        else:
+            job.state.next_run_at_ms = None
+        self._save(job)
+        self._arm_timer()
+        return job
     
     async def run_job(self, job_id: str, force: bool = False) -> bool:
         """Manually run a job."""
-        store = self._load_store()
-        for job in store.jobs:
-            if job.id == job_id:
-                if not force and not job.enabled:
-                    return False
-                await self._execute_job(job)
-                self._save_store()
-                self._arm_timer()
-                return True
-        return False
+        self._load_store()
+        job = self._jobs.get(job_id)
+        if job is None or (not force and not job.enabled):
+            return False
+        await self._execute_job(job)
+        self._save(job)
+        self._arm_timer()
+        return True
+    
+    def history(self, job_id: str | None = None, limit: int = 20) -> list[CronRun]:
+        """Recent runs, newest first, optionally for one job."""
+        self._load_store()
+        return self._db.runs(job_id=job_id, limit=limit)
+    
+    def metrics(self, since_ms: int | None = None) -> dict[str, Any]:
+        """
+        Aggregate run metrics over the retained history.
+        
+        Returns {"all": summary, "jobs": {job_id: summary}} where a summary
+        counts outcomes and gives lateness (scheduled vs actual start),
+        duration and token totals.
+        """
+        self._load_store()
+        runs = self._db.runs(since_ms=since_ms)
+        by_job: dict[str, list[CronRun]] = {}
+        for run in runs:
+            by_job.setdefault(run.job_id, []).append(run)
+        return {
+            "all": _summarize(runs),
+            "jobs": {job_id: _summarize(job_runs) for job_id, job_runs in by_job.items()},
+        }
     
     def status(self) -> dict:
         """Get service status."""
-        store = self._load_store()
+        self._load_store()
         return {
             "enabled": self._running,
-            "jobs": len(store.jobs),
+            "jobs": len(self._jobs),
+            "running": sum(self._in_flight.values()),
             "next_wake_at_ms": self._get_next_wake_ms(),
         }
@@ -0,0 +1,333 @@
+"""SQLite-backed persistence for cron jobs."""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.cron.types import CronJob, CronJobState, CronPayload, CronRun, CronSchedule
+
+
+def job_to_dict(job: CronJob) -> dict[str, Any]:
+    """Serialize a job to its camelCase JSON form."""
+    return {
+        "id": job.id,
+        "name": job.name,
+        "enabled": job.enabled,
+        "schedule": {
+            "kind": job.schedule.kind,
+            "atMs": job.schedule.at_ms,
+            "everyMs": job.schedule.every_ms,
+            "expr": job.schedule.expr,
+            "tz": job.schedule.tz,
+        },
+        "payload": {
+            "kind": job.payload.kind,
+            "message": job.payload.message,
+            "deliver": job.payload.deliver,
+            "channel": job.payload.channel,
+            "to": job.payload.to,
+        },
+        "state": {
+            "nextRunAtMs": job.state.next_run_at_ms,
+            "lastRunAtMs": job.state.last_run_at_ms,
+            "lastStatus": job.state.last_status,
+            "lastError": job.state.last_error,
+            "lastLatenessMs": job.state.last_lateness_ms,
+            "lastDurationMs": job.state.last_duration_ms,
+        },
+        "createdAtMs": job.created_at_ms,
+        "updatedAtMs": job.updated_at_ms,
+        "deleteAfterRun": job.delete_after_run,
+        "timeoutS": job.timeout_s,
+        "skipIfRunning": job.skip_if_running,
+        "misfire": job.misfire,
+    }
+
+
+def job_from_dict(j: dict[str, Any]) -> CronJob:
+    """Parse a job from its camelCase JSON form."""
+    state = j.get("state", {})
+    return CronJob(
+        id=j["id"],
+        name=j["name"],
+        enabled=j.get("enabled", True),
+        schedule=CronSchedule(
+            kind=j["schedule"]["kind"],
+            at_ms=j["schedule"].get("atMs"),
+            every_ms=j["schedule"].get("everyMs"),
+            expr=j["schedule"].get("expr"),
+            tz=j["schedule"].get("tz"),
+        ),
+        payload=CronPayload(
+            kind=j["payload"].get("kind", "agent_turn"),
+            message=j["payload"].get("message", ""),
+            deliver=j["payload"].get("deliver", False),
+            channel=j["payload"].get("channel"),
+            to=j["payload"].get("to"),
+        ),
+        state=CronJobState(
+            next_run_at_ms=state.get("nextRunAtMs"),
+            last_run_at_ms=state.get("lastRunAtMs"),
+            last_status=state.get("lastStatus"),
+            last_error=state.get("lastError"),
+            last_lateness_ms=state.get("lastLatenessMs"),
+            last_duration_ms=state.get("lastDurationMs"),
+        ),
+        created_at_ms=j.get("createdAtMs", 0),
+        updated_at_ms=j.get("updatedAtMs", 0),
+        delete_after_run=j.get("deleteAfterRun", False),
+        timeout_s=j.get("timeoutS"),
+        skip_if_running=j.get("skipIfRunning", True),
+        misfire=j.get("misfire", "once"),
+    )
+
+
+class CronJobStore:
+    """
+    One row per job in a SQLite database (WAL journal).
+
+    Saving a job rewrites only that job's row in a single transaction, so a
+    crash can lose at most the change being written and never corrupts the
+    other jobs. Several processes may share the database; ``changed()``
+    reports commits made by other connections and ``changes()`` returns just
+    the jobs written or deleted since this connection last looked. Every job
+    write stamps its rows with the next value of a shared sequence, and
+    deletions leave a tombstone carrying theirs.
+
+    The same database keeps an append-only run history, trimmed to the most
+    recent runs of each job.
+    """
+
+    # Checkpoint the WAL and reclaim free pages after this many writes.
+    COMPACT_EVERY = 1000
+    # Deletion tombstones kept for readers catching up; older readers reload.
+    TOMBSTONES_KEPT = 1000
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " job_id TEXT NOT NULL,"
+            " scheduled_at_ms INTEGER,"
+            " started_at_ms INTEGER NOT NULL,"
+            " duration_ms INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " error TEXT,"
+            " tokens INTEGER,"
+            " response_chars INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS runs_job ON runs (job_id, id)")
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "seq" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_seq ON jobs (seq)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS deleted_jobs ("
+            " id TEXT PRIMARY KEY,"
+            " seq INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta ("
+            " key TEXT PRIMARY KEY,"
+            " value INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO meta (key, value) VALUES ('seq', 0), ('trimmed_seq', 0)"
+        )
+        self._writes = 0
+        self._seq = 0  # Sequence value of the newest job change seen here
+        self._data_version = self._read_data_version()
+
+    def load(self) -> list[CronJob]:
+        """Return all jobs in creation order."""
+        self._conn.execute("BEGIN")
+        try:
+            seq = self._meta("seq")
+            rows = self._conn.execute("SELECT id, data FROM jobs ORDER BY rowid").fetchall()
+        finally:
+            self._conn.execute("COMMIT")
+        self._seq = seq
+        self._data_version = self._read_data_version()
+        return self._parse(rows)
+
+    def changes(self) -> tuple[list[CronJob], list[str]] | None:
+        """
+        Jobs written and ids deleted since the last ``load()`` or ``changes()``.
+
+        Returns None when tombstones this connection has not seen were
+        already trimmed; the caller must ``load()`` everything instead.
+        """
+        self._conn.execute("BEGIN")
+        try:
+            seq = self._meta("seq")
+            if self._seq < self._meta("trimmed_seq"):
+                return None
+            rows = self._conn.execute(
+                "SELECT id, data FROM jobs WHERE seq > ? ORDER BY rowid", (self._seq,)
+            ).fetchall()
+            deleted = [row[0] for row in self._conn.execute(
+                "SELECT id FROM deleted_jobs WHERE seq > ?", (self._seq,)
+            )]
+        finally:
+            self._conn.execute("COMMIT")
+        self._seq = seq
+        self._data_version = self._read_data_version()
+        return self._parse(rows), deleted
+
+    def save(self, *jobs: CronJob) -> None:
+        """Insert or update the given jobs atomically."""
+        if not jobs:
+            return
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            seq = self._next_seq()
+            for job in jobs:
+                self._conn.execute(
+                    "INSERT INTO jobs (id, data, seq) VALUES (?, ?, ?)"
+                    " ON CONFLICT(id) DO UPDATE SET data = excluded.data, seq = excluded.seq",
+                    (job.id, json.dumps(job_to_dict(job)), seq),
+                )
+                self._conn.execute("DELETE FROM deleted_jobs WHERE id = ?", (job.id,))
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._saw(seq)
+        self._after_write(len(jobs))
+
+    def delete(self, job_id: str) -> None:
+        """Remove a job and its run history."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        seq = self._next_seq()
+        self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        self._conn.execute("DELETE FROM runs WHERE job_id = ?", (job_id,))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO deleted_jobs (id, seq) VALUES (?, ?)", (job_id, seq)
+        )
+        self._conn.execute("COMMIT")
+        self._saw(seq)
+        self._after_write(1)
+
+    def add_run(self, run: CronRun, keep: int) -> None:
+        """Append a run record, keeping only the job's ``keep`` newest runs."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._conn.execute(
+            "INSERT INTO runs (job_id, scheduled_at_ms, started_at_ms, duration_ms,"
+            " status, error, tokens, response_chars) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (run.job_id, run.scheduled_at_ms, run.started_at_ms, run.duration_ms,
+             run.status, run.error, run.tokens, run.response_chars),
+        )
+        self._conn.execute(
+            "DELETE FROM runs WHERE job_id = ? AND id <= ("
+            " SELECT id FROM runs WHERE job_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (run.job_id, run.job_id, max(1, keep)),
+        )
+        self._conn.execute("COMMIT")
+        self._after_write(1)
+
+    def runs(
+        self, job_id: str | None = None, limit: int | None = None, since_ms: int | None = None
+    ) -> list[CronRun]:
+        """Return recorded runs, newest first."""
+        query = (
+            "SELECT job_id, scheduled_at_ms, started_at_ms, duration_ms, status,"
+            " error, tokens, response_chars FROM runs WHERE 1 = 1"
+        )
+        params: list[Any] = []
+        if job_id is not None:
+            query += " AND job_id = ?"
+            params.append(job_id)
+        if since_ms is not None:
+            query += " AND started_at_ms >= ?"
+            params.append(since_ms)
+        query += " ORDER BY id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [
+            CronRun(
+                job_id=row[0], scheduled_at_ms=row[1], started_at_ms=row[2],
+                duration_ms=row[3], status=row[4], error=row[5], tokens=row[6],
+                response_chars=row[7],
+            )
+            for row in self._conn.execute(query, params)
+        ]
+
+    def changed(self) -> bool:
+        """True if another connection committed since our last load."""
+        return self._read_data_version() != self._data_version
+
+    def import_json(self, json_path: Path) -> int:
+        """Import jobs from a legacy jobs.json file; returns how many."""
+        data = json.loads(json_path.read_text())
+        jobs = [job_from_dict(j) for j in data.get("jobs", [])]
+        self.save(*jobs)
+        return len(jobs)
+
+    def compact(self) -> None:
+        """Trim old tombstones, fold the WAL back into the database and drop free pages."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        row = self._conn.execute(
+            "SELECT seq FROM deleted_jobs ORDER BY seq DESC LIMIT 1 OFFSET ?",
+            (self.TOMBSTONES_KEPT,),
+        ).fetchone()
+        if row:
+            self._conn.execute("DELETE FROM deleted_jobs WHERE seq <= ?", (row[0],))
+            self._conn.execute(
+                "UPDATE meta SET value = max(value, ?) WHERE key = 'trimmed_seq'", (row[0],)
+            )
+        self._conn.execute("COMMIT")
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        free = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+        total = self._conn.execute("PRAGMA page_count").fetchone()[0]
+        if free and free * 4 > total:
+            self._conn.execute("VACUUM")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _after_write(self, n: int) -> None:
+        self._writes += n
+        if self._writes >= self.COMPACT_EVERY:
+            self._writes = 0
+            self.compact()
+
+    @staticmethod
+    def _parse(rows: list[tuple[str, str]]) -> list[CronJob]:
+        jobs = []
+        for job_id, data in rows:
+            try:
+                jobs.append(job_from_dict(json.loads(data)))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping unreadable cron job {job_id}: {e}")
+        return jobs
+
+    def _meta(self, key: str) -> int:
+        return self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0]
+
+    def _next_seq(self) -> int:
+        # Only called inside a write transaction, which serializes writers.
+        self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'seq'")
+        return self._meta("seq")
+
+    def _saw(self, seq: int) -> None:
+        # Skip our own write on the next changes() unless others wrote in between.
+        if seq == self._seq + 1:
+            self._seq = seq
+
+    def _read_data_version(self) -> int:
+        # Only changes when *another* connection commits.
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
@@ -14,7 +14,7 @@ class CronSchedule:
     every_ms: int | None = None
     # For "cron": cron expression (e.g. "0 9 * * *")
     expr: str | None = None
-    # Timezone for cron expressions
+    # IANA timezone for cron expressions (server local time if unset)
     tz: str | None = None
 
 
@@ -36,6 +36,9 @@ class CronJobState:
     last_run_at_ms: int | None = None
     last_status: Literal["ok", "error", "skipped"] | None = None
     last_error: str | None = None
+    # How long after its scheduled time the last run actually started
+    last_lateness_ms: int | None = None
+    last_duration_ms: int | None = None
 
 
 @dataclass
@@ -50,6 +53,32 @@ class CronJob:
     created_at_ms: int = 0
     updated_at_ms: int = 0
     delete_after_run: bool = False
+    # Per-run timeout; None uses the service default
+    timeout_s: float | None = None
+    # Skip a slot when the previous run of this job is still in flight
+    skip_if_running: bool = True
+    # Slots missed during downtime: run once, skip them, or run them all
+    misfire: Literal["once", "skip", "all"] = "once"
+
+
+@dataclass
+class CronRun:
+    """One recorded execution of a job."""
+    job_id: str
+    started_at_ms: int
+    # Slot the run was due at; None for manual runs
+    scheduled_at_ms: int | None = None
+    duration_ms: int = 0
+    status: Literal["ok", "error", "skipped"] = "ok"
+    error: str | None = None
+    tokens: int | None = None
+    response_chars: int | None = None
+    
+    @property
+    def lateness_ms(self) -> int | None:
+        if self.scheduled_at_ms is None:
+            return None
+        return max(0, self.started_at_ms - self.scheduled_at_ms)
 
 
 @dataclass
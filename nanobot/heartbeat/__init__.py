@@ -1,5 +1,6 @@
 """Heartbeat service for periodic agent wake-ups."""
 
+from nanobot.heartbeat.scheduler import HeartbeatScheduler
 from nanobot.heartbeat.service import HeartbeatService
 
-__all__ = ["HeartbeatService"]
+__all__ = ["HeartbeatScheduler", "HeartbeatService"]
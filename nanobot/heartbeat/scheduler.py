@@ -0,0 +1,127 @@
+"""Heartbeat scheduler for many workspaces in one process."""
+
+import asyncio
+import heapq
+import time
+from pathlib import Path
+from typing import Any, Callable, Coroutine
+
+from loguru import logger
+
+from nanobot.heartbeat.service import (
+    DEFAULT_HEARTBEAT_INTERVAL_S,
+    DEFAULT_HEARTBEAT_RECHECK_S,
+    HeartbeatService,
+)
+
+
+class HeartbeatScheduler:
+    """
+    Runs heartbeats for several workspaces from a single loop.
+
+    Each workspace keeps its own HeartbeatService state (change detection),
+    but wake-ups are staggered: workspace i of n first fires at
+    (i + 1) / n of the interval, so ticks are spread evenly instead of all
+    landing at once. At most ``max_concurrency`` heartbeat turns run at a
+    time, and a workspace whose previous tick is still running is skipped.
+    """
+
+    def __init__(
+        self,
+        workspaces: list[Path],
+        on_heartbeat: Callable[[Path, str], Coroutine[Any, Any, str]] | None = None,
+        interval_s: int = DEFAULT_HEARTBEAT_INTERVAL_S,
+        enabled: bool = True,
+        jitter_s: float = 0.0,
+        recheck_s: float = DEFAULT_HEARTBEAT_RECHECK_S,
+        max_concurrency: int = 4,
+    ):
+        self.on_heartbeat = on_heartbeat
+        self.interval_s = interval_s
+        self.enabled = enabled
+        self.max_concurrency = max(1, max_concurrency)
+        self.services: dict[Path, HeartbeatService] = {
+            ws: HeartbeatService(
+                ws,
+                on_heartbeat=self._bind(ws),
+                interval_s=interval_s,
+                jitter_s=jitter_s,
+                recheck_s=recheck_s,
+            )
+            for ws in dict.fromkeys(workspaces)
+        }
+        self._running = False
+        self._task: asyncio.Task | None = None
+        self._ticks: dict[Path, asyncio.Task] = {}
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    def _bind(self, workspace: Path) -> Callable[[str], Coroutine[Any, Any, str]]:
+        async def on_heartbeat(prompt: str) -> str:
+            if self.on_heartbeat is None:
+                return ""
+            return await self.on_heartbeat(workspace, prompt)
+        return on_heartbeat
+
+    async def start(self) -> None:
+        """Start the shared heartbeat loop."""
+        if not self.enabled or not self.services:
+            logger.info("Heartbeat disabled")
+            return
+
+        self._running = True
+        self._task = asyncio.create_task(self._run_loop())
+        logger.info(
+            f"Heartbeat started for {len(self.services)} workspaces "
+            f"(every {self.interval_s}s, up to {self.max_concurrency} at once)"
+        )
+
+    def stop(self) -> None:
+        """Stop the loop and cancel running ticks."""
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for task in self._ticks.values():
+            task.cancel()
+        self._ticks.clear()
+
+    def get_status(self) -> dict[str, dict[str, Any]]:
+        """Per-workspace skip counts and whether a tick is in progress."""
+        return {
+            str(ws): {"skipped": svc.skipped, "running": ws in self._ticks}
+            for ws, svc in self.services.items()
+        }
+
+    async def _run_loop(self) -> None:
+        now = time.monotonic()
+        n = len(self.services)
+        due = [
+            (now + self.interval_s * (i + 1) / n, i, ws)
+            for i, ws in enumerate(self.services)
+        ]
+        heapq.heapify(due)
+
+        while self._running:
+            at, i, ws = due[0]
+            delay = at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            service = self.services[ws]
+            # Keep the slot grid anchored to the schedule, not to when we woke.
+            heapq.heapreplace(due, (at + service.next_delay(), i, ws))
+
+            if ws in self._ticks:
+                logger.warning(f"Heartbeat: previous tick for {ws} still running, skipping")
+                continue
+            task = asyncio.create_task(self._run_tick(ws, service))
+            self._ticks[ws] = task
+
+    async def _run_tick(self, workspace: Path, service: HeartbeatService) -> None:
+        try:
+            async with self._slots:
+                await service.tick()
+        except Exception as e:
+            logger.error(f"Heartbeat error for {workspace}: {e}")
+        finally:
+            self._ticks.pop(workspace, None)
@@ -1,6 +1,10 @@
 """Heartbeat service - periodic agent wake-up to check for tasks."""
 
 import asyncio
+import hashlib
+import random
+import re
+import time
 from pathlib import Path
 from typing import Any, Callable, Coroutine
 
@@ -9,6 +13,13 @@ from loguru import logger
 # Default interval: 30 minutes
 DEFAULT_HEARTBEAT_INTERVAL_S = 30 * 60
 
+# Even when nothing changed, run a real check at least this often (6 hours)
+DEFAULT_HEARTBEAT_RECHECK_S = 6 * 60 * 60
+
+# Workspace files mentioned in HEARTBEAT.md as [text](path) or `path`
+_FILE_REF_RE = re.compile(r"\]\(([^)\s]+)\)|`([^`\s]+)`")
+MAX_REFERENCED_FILES = 50
+
 # The prompt sent to agent during heartbeat
 HEARTBEAT_PROMPT = """Read HEARTBEAT.md in your workspace (if it exists).
 Follow any instructions or tasks listed there.
@@ -35,12 +46,20 @@ def _is_heartbeat_empty(content: str | None) -> bool:
     return True
 
 
+def _is_heartbeat_ok(response: str) -> bool:
+    return HEARTBEAT_OK_TOKEN.replace("_", "") in response.upper().replace("_", "")
+
+
 class HeartbeatService:
     """
     Periodic heartbeat service that wakes the agent to check for tasks.
     
     The agent reads HEARTBEAT.md from the workspace and executes any
     tasks listed there. If nothing needs attention, it replies HEARTBEAT_OK.
+    
+    After an OK, the service remembers a fingerprint of HEARTBEAT.md and the
+    workspace files it references, and skips the LLM turn while that
+    fingerprint is unchanged (but still checks every ``recheck_s``).
     """
     
     def __init__(
@@ -49,13 +68,21 @@ class HeartbeatService:
         on_heartbeat: Callable[[str], Coroutine[Any, Any, str]] | None = None,
         interval_s: int = DEFAULT_HEARTBEAT_INTERVAL_S,
         enabled: bool = True,
+        jitter_s: float = 0.0,
+        recheck_s: float = DEFAULT_HEARTBEAT_RECHECK_S,
     ):
         self.workspace = workspace
         self.on_heartbeat = on_heartbeat
         self.interval_s = interval_s
         self.enabled = enabled
+        self.jitter_s = max(0.0, jitter_s)
+        self.recheck_s = recheck_s  # 0 = skip for as long as nothing changes
         self._running = False
         self._task: asyncio.Task | None = None
+        # Fingerprint and time of the last HEARTBEAT_OK
+        self._ok_fingerprint: str | None = None
+        self._ok_at: float = 0.0
+        self.skipped = 0
     
     @property
     def heartbeat_file(self) -> Path:
@@ -70,6 +97,34 @@ class HeartbeatService:
                 return None
         return None
     
+    def _fingerprint(self, content: str) -> str:
+        """Hash HEARTBEAT.md plus the size and mtime of files it references."""
+        digest = hashlib.sha256(content.encode("utf-8"))
+        root = self.workspace.resolve()
+        seen: set[Path] = set()
+        for match in _FILE_REF_RE.finditer(content):
+            if len(seen) >= MAX_REFERENCED_FILES:
+                break
+            ref = (match.group(1) or match.group(2)).split("#", 1)[0]
+            if not ref or "://" in ref:
+                continue
+            try:
+                path = (root / ref).resolve()
+                if path in seen or not path.is_relative_to(root) or not path.is_file():
+                    continue
+                stat = path.stat()
+            except (OSError, ValueError):
+                continue
+            seen.add(path)
+            digest.update(f"\0{path}\0{stat.st_size}\0{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
+    
+    def next_delay(self) -> float:
+        """Seconds until the next tick: the interval, plus or minus up to ``jitter_s``."""
+        if not self.jitter_s:
+            return self.interval_s
+        return max(1.0, self.interval_s + random.uniform(-self.jitter_s, self.jitter_s))
+    
     async def start(self) -> None:
         """Start the heartbeat service."""
         if not self.enabled:
@@ -91,16 +146,16 @@ class HeartbeatService:
         """Main heartbeat loop."""
         while self._running:
             try:
-                await asyncio.sleep(self.interval_s)
+                await asyncio.sleep(self.next_delay())
                 if self._running:
-                    await self._tick()
+                    await self.tick()
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Heartbeat error: {e}")
     
-    async def _tick(self) -> None:
-        """Execute a single heartbeat tick."""
+    async def tick(self) -> None:
+        """Run one heartbeat check (skipped if HEARTBEAT.md is empty or unchanged since OK)."""
         content = self._read_heartbeat_file()
         
         # Skip if HEARTBEAT.md is empty or doesn't exist
@@ -108,6 +163,13 @@ class HeartbeatService:
             logger.debug("Heartbeat: no tasks (HEARTBEAT.md empty)")
             return
         
+        fingerprint = self._fingerprint(content)
+        recheck_due = self.recheck_s and time.monotonic() - self._ok_at >= self.recheck_s
+        if fingerprint == self._ok_fingerprint and not recheck_due:
+            self.skipped += 1
+            logger.debug("Heartbeat: unchanged since last OK, skipping")
+            return
+        
         logger.info("Heartbeat: checking for tasks...")
         
         if self.on_heartbeat:
@@ -115,10 +177,13 @@ class HeartbeatService:
                 response = await self.on_heartbeat(HEARTBEAT_PROMPT)
                 
                 # Check if agent said "nothing to do"
-                if HEARTBEAT_OK_TOKEN.replace("_", "") in response.upper().replace("_", ""):
+                if _is_heartbeat_ok(response):
                     logger.info("Heartbeat: OK (no action needed)")
+                    self._ok_fingerprint = fingerprint
+                    self._ok_at = time.monotonic()
                 else:
                     logger.info(f"Heartbeat: completed task")
+                    self._ok_fingerprint = None
                     
             except Exception as e:
                 logger.error(f"Heartbeat execution failed: {e}")
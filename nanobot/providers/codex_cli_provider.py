@@ -1,8 +1,10 @@
 """Codex CLI-backed provider implementation."""
 
 import asyncio
+import copy
 import json
 import tempfile
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
@@ -12,6 +14,12 @@ from nanobot.providers.base import LLMProvider, LLMResponse
 class CodexCLIProvider(LLMProvider):
     """Provider that delegates generation to the local authenticated `codex` CLI."""
 
+    # Rendered message blocks kept between calls. A tool loop re-sends the
+    # same message objects on every iteration, so blocks are keyed by the
+    # identity of the content and reused while it compares equal to a
+    # snapshot taken at render time (no serialization needed to check).
+    RENDER_CACHE_SIZE = 512
+
     def __init__(
         self,
         default_model: str = "openai/gpt-5.3-codex",
@@ -19,6 +27,7 @@ class CodexCLIProvider(LLMProvider):
         working_dir: str | None = None,
         sandbox_mode: str = "read-only",
         timeout: int = 180,
+        max_prompt_chars: int | None = None,
     ):
         super().__init__(api_key=None, api_base=None)
         self.default_model = default_model
@@ -26,6 +35,10 @@ class CodexCLIProvider(LLMProvider):
         self.working_dir = str(Path(working_dir or Path.cwd()).resolve())
         self.sandbox_mode = sandbox_mode
         self.timeout = timeout
+        # Optional transcript budget; older history is dropped beyond it.
+        self.max_prompt_chars = max_prompt_chars
+        # (role, id(content)) -> (content, snapshot of content, rendered block)
+        self._render_cache: OrderedDict[tuple[str, int], tuple[Any, Any, str]] = OrderedDict()
 
     async def chat(
         self,
@@ -36,7 +49,7 @@ class CodexCLIProvider(LLMProvider):
         temperature: float = 0.7,
     ) -> LLMResponse:
         del max_tokens, temperature
-        prompt = self._build_prompt(messages, tools=tools)
+        prompt_chunks = self._build_prompt_chunks(messages, tools=tools)
         model_name = self._resolve_model_name(model or self.default_model)
 
         output_path = self._new_output_path()
@@ -78,8 +91,7 @@ class CodexCLIProvider(LLMProvider):
 
         try:
             stdout, stderr = await asyncio.wait_for(
-                process.communicate(input=prompt.encode("utf-8")),
-                timeout=self.timeout,
+                self._communicate(process, prompt_chunks), timeout=self.timeout
             )
             return_code = process.returncode or 0
             stdout_text = stdout.decode("utf-8", errors="replace")
@@ -124,12 +136,14 @@ class CodexCLIProvider(LLMProvider):
         messages: list[dict[str, Any]],
         tools: list[dict[str, Any]] | None = None,
     ) -> str:
-        rendered_messages: list[str] = []
-        for message in messages:
-            role = str(message.get("role", "user")).upper()
-            content = self._render_content(message.get("content"))
-            rendered_messages.append(f"{role}:\n{content}")
+        return "".join(self._build_prompt_chunks(messages, tools=tools))
 
+    def _build_prompt_chunks(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+    ) -> list[str]:
+        """Build the prompt as a list of chunks that can be streamed to stdin."""
         prompt_parts = [
             "You are the model backend for goodbot.",
             "Respond with the assistant's next message only.",
@@ -142,16 +156,98 @@ class CodexCLIProvider(LLMProvider):
                 "Available tool definitions are provided for context only; do not emit tool calls."
             )
 
-        prompt_parts.extend(
-            [
-                "",
-                "Conversation transcript:",
-                "\n\n".join(rendered_messages),
-                "",
-                "ASSISTANT:",
-            ]
+        prompt_parts.extend(["", "Conversation transcript:", ""])
+
+        blocks = self._trim_to_budget(
+            [self._render_message(m) for m in messages],
+            keep_first=bool(messages) and messages[0].get("role") == "system",
         )
-        return "\n".join(prompt_parts)
+        chunks = ["\n".join(prompt_parts)]
+        for i, block in enumerate(blocks):
+            if i:
+                chunks.append("\n\n")
+            chunks.append(block)
+        chunks.append("\n\nASSISTANT:")
+        return chunks
+
+    def _render_message(self, message: dict[str, Any]) -> str:
+        """Render one transcript block, reusing the cached block when possible."""
+        role = str(message.get("role", "user")).upper()
+        content = message.get("content")
+        key = (role, id(content))
+        cached = self._render_cache.get(key)
+        # Strings are immutable; containers must still equal their snapshot,
+        # which short-circuits on the (shared) string leaves.
+        if cached is not None and cached[0] is content and (
+            isinstance(content, str) or cached[1] == content
+        ):
+            self._render_cache.move_to_end(key)
+            return cached[2]
+
+        block = f"{role}:\n{self._render_content(content)}"
+        try:
+            snapshot = content if isinstance(content, str) else copy.deepcopy(content)
+        except Exception:
+            return block
+        self._render_cache[key] = (content, snapshot, block)
+        if len(self._render_cache) > self.RENDER_CACHE_SIZE:
+            self._render_cache.popitem(last=False)
+        return block
+
+    def _trim_to_budget(self, blocks: list[str], keep_first: bool = False) -> list[str]:
+        """Drop the oldest history blocks until the transcript fits max_prompt_chars.
+
+        The latest message is always kept, and so is the first block when
+        ``keep_first`` says it is the system prompt.
+        """
+        head_len = 1 if keep_first else 0
+        if not self.max_prompt_chars or len(blocks) <= head_len + 1:
+            return blocks
+        total = sum(len(b) + 2 for b in blocks)
+        if total <= self.max_prompt_chars:
+            return blocks
+
+        head, history, tail = blocks[:head_len], blocks[head_len:-1], blocks[-1:]
+        start = 0
+        while start < len(history) and total > self.max_prompt_chars:
+            total -= len(history[start]) + 2
+            start += 1
+        return head + history[start:] + tail
+
+    async def _communicate(self, process: Any, chunks: list[str]) -> tuple[bytes, bytes]:
+        """Write the prompt while draining stdout/stderr, then wait for exit.
+
+        ``process.communicate()`` is not used: it feeds (and closes) stdin
+        itself, which cuts off a prompt that is still being written.
+        """
+        readers = [
+            asyncio.create_task(process.stdout.read()),
+            asyncio.create_task(process.stderr.read()),
+        ]
+        try:
+            await self._write_prompt(process, chunks)
+            stdout, stderr = await asyncio.gather(*readers)
+            await process.wait()
+            return stdout, stderr
+        finally:
+            for task in readers:
+                task.cancel()
+
+    async def _write_prompt(self, process: Any, chunks: list[str]) -> None:
+        """Stream prompt chunks to the subprocess stdin and close it."""
+        stdin = process.stdin
+        try:
+            for chunk in chunks:
+                stdin.write(chunk.encode("utf-8"))
+                await stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            stdin.close()
+            try:
+                await stdin.wait_closed()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
 
     def _render_content(self, content: Any) -> str:
         if content is None:
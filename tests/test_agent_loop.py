@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.base import LLMProvider, LLMResponse
+
+
+class _SlowProvider(LLMProvider):
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+        self.calls = 0
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return LLMResponse(content="done")
+
+    def get_default_model(self) -> str:
+        return "fake"
+
+
+@pytest.mark.asyncio
+async def test_timed_out_scheduled_turns_never_reach_the_user(tmp_path) -> None:
+    bus = MessageBus()
+    provider = _SlowProvider(delay=0.2)
+    agent = AgentLoop(bus=bus, provider=provider, workspace=tmp_path)
+    runner = asyncio.create_task(agent.run())
+    await asyncio.sleep(0)
+
+    # Keep the loop busy with a user turn so the scheduled turn stays queued.
+    await bus.publish_inbound(InboundMessage(
+        channel="telegram", sender_id="u", chat_id="1", content="hi"
+    ))
+    await asyncio.sleep(0.01)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(
+            agent.process_scheduled("queued job", channel="telegram", chat_id="1"), 0.05
+        )
+    assert bus.inbound_size == 0
+
+    # A turn that is already running when its caller gives up is not delivered either.
+    await asyncio.sleep(0.3)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(
+            agent.process_scheduled("running job", channel="telegram", chat_id="1"), 0.05
+        )
+    await asyncio.sleep(0.3)
+
+    agent.stop()
+    await runner
+    assert provider.calls == 2
+    assert bus.outbound_size == 1
+    assert (await bus.consume_outbound()).content == "done"
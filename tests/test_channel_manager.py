@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from nanobot.bus.events import OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.base import BaseChannel
+from nanobot.channels.manager import ChannelManager
+from nanobot.config.schema import Config
+
+
+class _RecordingChannel(BaseChannel):
+    def __init__(self, name: str, bus: MessageBus, delay: float = 0.0, fail: bool = False):
+        super().__init__(config=None, bus=bus)
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.sent: list[str] = []
+
+    async def start(self) -> None:
+        self._running = True
+
+    async def stop(self) -> None:
+        self._running = False
+
+    async def send(self, msg: OutboundMessage) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("send failed")
+        self.sent.append(msg.content)
+
+
+def _manager(bus: MessageBus, **channels: BaseChannel) -> ChannelManager:
+    manager = ChannelManager(Config(), bus)
+    manager.channels = dict(channels)
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_slow_channel_does_not_block_other_channels() -> None:
+    bus = MessageBus()
+    slow = _RecordingChannel("email", bus, delay=5.0)
+    fast = _RecordingChannel("telegram", bus)
+    manager = _manager(bus, email=slow, telegram=fast)
+    dispatch = asyncio.create_task(manager._dispatch_outbound())
+
+    await bus.publish_outbound(OutboundMessage(channel="email", chat_id="a", content="slow"))
+    await bus.publish_outbound(OutboundMessage(channel="telegram", chat_id="b", content="fast"))
+
+    for _ in range(50):
+        if fast.sent:
+            break
+        await asyncio.sleep(0.01)
+
+    assert fast.sent == ["fast"]
+    assert slow.sent == []
+    assert manager.get_status()["email"]["outbound"]["in_flight"] == 1
+
+    dispatch.cancel()
+    await manager.stop_all()
+
+
+@pytest.mark.asyncio
+async def test_outbox_preserves_per_chat_order_and_counts_failures() -> None:
+    bus = MessageBus()
+    channel = _RecordingChannel("slack", bus, delay=0.01)
+    broken = _RecordingChannel("discord", bus, fail=True)
+    manager = _manager(bus, slack=channel, discord=broken)
+    dispatch = asyncio.create_task(manager._dispatch_outbound())
+
+    for i in range(5):
+        await bus.publish_outbound(OutboundMessage(channel="slack", chat_id="c1", content=str(i)))
+    await bus.publish_outbound(OutboundMessage(channel="discord", chat_id="c2", content="x"))
+
+    for _ in range(100):
+        if len(channel.sent) == 5 and manager.outboxes.get("discord"):
+            if manager.outboxes["discord"].stats.failed:
+                break
+        await asyncio.sleep(0.01)
+
+    assert channel.sent == ["0", "1", "2", "3", "4"]
+    status = manager.get_status()
+    assert status["slack"]["outbound"]["sent"] == 5
+    assert status["slack"]["outbound"]["queue_depth"] == 0
+    assert status["discord"]["outbound"]["failed"] == 1
+
+    dispatch.cancel()
+    await manager.stop_all()
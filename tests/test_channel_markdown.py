@@ -0,0 +1,58 @@
+from nanobot.channels.markdown import (
+    to_discord,
+    to_feishu_elements,
+    to_plain_text,
+    to_slack_mrkdwn,
+    to_telegram_html,
+)
+
+SAMPLE = (
+    "# Report\n"
+    "Some **bold [docs](https://x.io/?a=1&b=2)** and _it_ plus `a<b`\n"
+    "- first\n"
+    "> quoted ~~old~~\n"
+    "```python\nif a < b:\n    pass\n```\n"
+)
+
+TABLE = "Stats:\n| name | n |\n|---|---|\n| a | 1 |\n"
+
+
+def test_one_parse_renders_each_channel_format() -> None:
+    assert to_telegram_html(SAMPLE) == (
+        "Report\n"
+        'Some <b>bold <a href="https://x.io/?a=1&amp;b=2">docs</a></b> and <i>it</i> plus <code>a&lt;b</code>\n'
+        "• first\n"
+        "quoted <s>old</s>\n"
+        "<pre><code>if a &lt; b:\n    pass\n</code></pre>\n"
+    )
+    assert to_slack_mrkdwn(SAMPLE) == (
+        "*Report*\n"
+        "Some *bold <https://x.io/?a=1&b=2|docs>* and _it_ plus `a&lt;b`\n"
+        "• first\n"
+        "> quoted ~old~\n"
+        "```\nif a &lt; b:\n    pass\n```\n"
+    )
+    assert to_plain_text(SAMPLE) == (
+        "Report\n"
+        "Some bold docs (https://x.io/?a=1&b=2) and it plus a<b\n"
+        "- first\n"
+        "> quoted old\n"
+        "if a < b:\n    pass\n\n"
+    )
+    assert to_discord(SAMPLE) == SAMPLE
+
+
+def test_tables_become_native_or_preformatted() -> None:
+    elements = to_feishu_elements(TABLE)
+    assert elements[0] == {"tag": "markdown", "content": "Stats:"}
+    assert elements[1]["tag"] == "table"
+    assert elements[1]["rows"] == [{"c0": "a", "c1": "1"}]
+    assert to_discord(TABLE) == "Stats:\n```\n| name | n |\n|---|---|\n| a | 1 |\n```\n"
+
+    # A table inside a code block stays code.
+    fenced = "```\n" + TABLE + "```"
+    assert to_feishu_elements(fenced) == [{"tag": "markdown", "content": fenced}]
+
+
+def test_identifiers_with_underscores_are_not_italicised() -> None:
+    assert to_telegram_html("call snake_case_name now") == "call snake_case_name now"
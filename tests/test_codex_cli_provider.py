@@ -1,5 +1,7 @@
 import asyncio
 import json
+import os
+import sys
 from pathlib import Path
 
 import pytest
@@ -7,16 +9,42 @@ import pytest
 from nanobot.providers.codex_cli_provider import CodexCLIProvider
 
 
+class _DummyStdin:
+    def __init__(self) -> None:
+        self.writes: list[bytes] = []
+        self.closed = False
+
+    def write(self, data: bytes) -> None:
+        self.writes.append(data)
+
+    async def drain(self) -> None:
+        return None
+
+    def close(self) -> None:
+        self.closed = True
+
+    async def wait_closed(self) -> None:
+        return None
+
+
+class _DummyStream:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+    async def read(self) -> bytes:
+        return self.data
+
+
 class _DummyProcess:
     def __init__(self, stdout: bytes = b"", stderr: bytes = b"", returncode: int = 0):
-        self._stdout = stdout
-        self._stderr = stderr
+        self.stdout = _DummyStream(stdout)
+        self.stderr = _DummyStream(stderr)
         self.returncode = returncode
         self.killed = False
+        self.stdin = _DummyStdin()
 
-    async def communicate(self, input: bytes | None = None) -> tuple[bytes, bytes]:
-        self.input = input
-        return self._stdout, self._stderr
+    async def wait(self) -> int:
+        return self.returncode
 
     def kill(self) -> None:
         self.killed = True
@@ -96,3 +124,131 @@ async def test_codex_cli_provider_returns_error_on_nonzero_exit(tmp_path, monkey
     assert response.finish_reason == "error"
     assert response.content is not None
     assert "fatal" in response.content
+
+
+@pytest.mark.asyncio
+async def test_codex_cli_provider_streams_prompt_to_stdin(tmp_path, monkeypatch) -> None:
+    processes: list[_DummyProcess] = []
+
+    async def fake_create_subprocess_exec(*args, **kwargs):
+        output_path = args[args.index("--output-last-message") + 1]
+        Path(output_path).write_text("ok", encoding="utf-8")
+        process = _DummyProcess(returncode=0)
+        processes.append(process)
+        return process
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_create_subprocess_exec)
+
+    provider = CodexCLIProvider(default_model="openai/gpt-5.3-codex", working_dir=str(tmp_path))
+    messages = [
+        {"role": "system", "content": "be brief"},
+        {"role": "user", "content": "hello"},
+    ]
+    await provider.chat(messages)
+
+    stdin = processes[0].stdin
+    assert stdin.closed is True
+    assert len(stdin.writes) > 1
+    assert b"".join(stdin.writes).decode("utf-8") == provider._build_prompt(messages)
+
+
+def test_codex_cli_provider_reuses_rendered_message_blocks(tmp_path) -> None:
+    provider = CodexCLIProvider(working_dir=str(tmp_path))
+
+    image_content = [{"type": "text", "text": "look"}]
+    messages = [
+        {"role": "system", "content": "be brief"},
+        {"role": "user", "content": image_content},
+    ]
+    first = provider._build_prompt(messages)
+    messages.append({"role": "assistant", "content": "seen"})
+    second = provider._build_prompt(messages)
+
+    assert len(provider._render_cache) == 3
+    assert second.startswith(first[: -len("ASSISTANT:")])
+    assert '"text": "look"' in second
+
+    # Content changed in place must not come back from the cache.
+    image_content[0]["text"] = "changed"
+    third = provider._build_prompt(messages)
+    assert '"text": "changed"' in third and '"text": "look"' not in third
+
+
+def test_codex_cli_provider_does_not_reserialize_unchanged_history(tmp_path, monkeypatch) -> None:
+    provider = CodexCLIProvider(working_dir=str(tmp_path))
+    rendered: list[object] = []
+    real_render = CodexCLIProvider._render_content
+
+    def counting_render(self, content):
+        rendered.append(content)
+        return real_render(self, content)
+
+    monkeypatch.setattr(CodexCLIProvider, "_render_content", counting_render)
+    messages = [
+        {"role": "system", "content": "be brief"},
+        {"role": "user", "content": [{"type": "text", "text": "x" * 10_000}]},
+        {"role": "assistant", "content": "ok"},
+    ]
+    first = provider._build_prompt(messages)
+    assert len(rendered) == 3
+
+    messages.append({"role": "tool", "content": {"result": 1}})
+    second = provider._build_prompt(messages)
+
+    assert rendered[3:] == [{"result": 1}]
+    assert second.startswith(first[: -len("ASSISTANT:")])
+
+
+@pytest.mark.asyncio
+async def test_codex_cli_provider_delivers_large_prompt_to_real_process(tmp_path) -> None:
+    script = tmp_path / "fake-codex"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys, time\n"
+        "time.sleep(0.1)  # start reading only after the writer has filled the pipe\n"
+        "data = sys.stdin.buffer.read()\n"
+        "out = sys.argv[sys.argv.index('--output-last-message') + 1]\n"
+        "open(out, 'w').write(str(len(data)))\n"
+    )
+    os.chmod(script, 0o755)
+
+    provider = CodexCLIProvider(
+        codex_command=str(script), working_dir=str(tmp_path), max_prompt_chars=0
+    )
+    messages = [{"role": "user", "content": "x" * 1_200_000}]
+    response = await provider.chat(messages)
+
+    assert response.finish_reason == "stop"
+    assert int(response.content) == len(provider._build_prompt(messages).encode("utf-8"))
+
+
+def test_codex_cli_provider_trims_oldest_history_to_budget(tmp_path) -> None:
+    provider = CodexCLIProvider(working_dir=str(tmp_path), max_prompt_chars=60)
+    messages = [
+        {"role": "system", "content": "sys"},
+        {"role": "user", "content": "old " * 20},
+        {"role": "assistant", "content": "middle"},
+        {"role": "user", "content": "latest"},
+    ]
+
+    prompt = provider._build_prompt(messages)
+
+    assert "SYSTEM:\nsys" in prompt
+    assert "old old" not in prompt
+    assert "ASSISTANT:\nmiddle" in prompt
+    assert "USER:\nlatest" in prompt
+
+
+def test_codex_cli_provider_keeps_history_by_default_and_trims_without_system(tmp_path) -> None:
+    messages = [
+        {"role": "user", "content": "old " * 20},
+        {"role": "assistant", "content": "middle"},
+        {"role": "user", "content": "latest"},
+    ]
+
+    assert "old old" in CodexCLIProvider(working_dir=str(tmp_path))._build_prompt(messages)
+
+    prompt = CodexCLIProvider(working_dir=str(tmp_path), max_prompt_chars=40)._build_prompt(messages)
+    assert "old old" not in prompt
+    assert "ASSISTANT:\nmiddle" in prompt
+    assert "USER:\nlatest" in prompt
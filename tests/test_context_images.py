@@ -0,0 +1,89 @@
+import base64
+import io
+import threading
+
+import pytest
+
+from nanobot.agent.context import ContextBuilder
+from nanobot.agent.images import ImageEncoder, max_image_side
+
+
+@pytest.mark.asyncio
+async def test_images_are_encoded_once_and_reused(tmp_path, monkeypatch) -> None:
+    photo = tmp_path / "photo.png"
+    photo.write_bytes(b"\x89PNG fake image")
+    (tmp_path / "notes.txt").write_text("not an image")
+
+    prepared = []
+    real_prepare = ImageEncoder._prepare
+
+    def counting_prepare(self, raw, mime):
+        prepared.append(mime)
+        return real_prepare(self, raw, mime)
+
+    monkeypatch.setattr(ImageEncoder, "_prepare", counting_prepare)
+    builder = ContextBuilder(tmp_path)
+    media = [str(photo), str(tmp_path / "notes.txt"), str(tmp_path / "missing.jpg")]
+
+    first = await builder._build_user_content("look", media)
+    second = await builder._build_user_content("again", media)
+
+    assert prepared == ["image/png"]
+    assert [part["type"] for part in first] == ["image_url", "text"]
+    assert first[0]["image_url"]["url"] is second[0]["image_url"]["url"]
+    encoded = first[0]["image_url"]["url"].split(",", 1)[1]
+    assert base64.b64decode(encoded) == b"\x89PNG fake image"
+
+    # A copy of the same file under another name hits the cache too.
+    copy = tmp_path / "copy.png"
+    copy.write_bytes(photo.read_bytes())
+    await builder._build_user_content("copy", [str(copy)])
+    assert prepared == ["image/png"]
+
+
+@pytest.mark.asyncio
+async def test_build_messages_encodes_images_off_the_event_loop(tmp_path, monkeypatch) -> None:
+    photo = tmp_path / "photo.png"
+    photo.write_bytes(b"\x89PNG fake image")
+    threads = []
+    real_data_url = ImageEncoder.data_url
+
+    def recording_data_url(self, path):
+        threads.append(threading.current_thread())
+        return real_data_url(self, path)
+
+    monkeypatch.setattr(ImageEncoder, "data_url", recording_data_url)
+    messages = await ContextBuilder(tmp_path).build_messages([], "look", media=[str(photo)])
+
+    assert messages[-1]["content"][0]["type"] == "image_url"
+    assert threads and threading.main_thread() not in threads
+
+
+def test_cache_is_bounded(tmp_path) -> None:
+    encoder = ImageEncoder(cache_bytes=100)
+    for i in range(5):
+        path = tmp_path / f"{i}.jpg"
+        path.write_bytes(bytes([i]) * 40)
+        encoder.data_url(path)
+    assert len(encoder._cache) == 1
+    assert encoder.data_url(tmp_path / "4.jpg") is next(iter(encoder._cache.values()))
+
+
+def test_max_side_depends_on_model() -> None:
+    assert max_image_side("anthropic/claude-opus-4-5") == 1568
+    assert max_image_side("gemini/gemini-2.0-flash") == 3072
+    assert max_image_side("openai/gpt-4o") == 2048
+
+
+def test_large_photos_are_downscaled_to_jpeg(tmp_path) -> None:
+    pil_image = pytest.importorskip("PIL.Image")
+    path = tmp_path / "big.png"
+    pil_image.effect_noise((3000, 1500), 64).convert("RGB").save(path)
+
+    url = ImageEncoder(max_side=1024).data_url(path)
+
+    assert url.startswith("data:image/jpeg;base64,")
+    data = base64.b64decode(url.split(",", 1)[1])
+    with pil_image.open(io.BytesIO(data)) as img:
+        assert img.size == (1024, 512)
+    assert len(data) < path.stat().st_size
@@ -0,0 +1,389 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from nanobot.cron import service as cron_service
+from nanobot.cron.service import CronService, _compute_next_run
+from nanobot.cron.types import CronJob, CronJobState, CronSchedule
+
+
+def _every(seconds: float) -> CronSchedule:
+    return CronSchedule(kind="every", every_ms=int(seconds * 1000))
+
+
+def test_next_wake_follows_add_remove_and_disable(tmp_path) -> None:
+    service = CronService(tmp_path / "jobs.db")
+    slow = service.add_job("slow", _every(3600), "hourly")
+    fast = service.add_job("fast", _every(60), "minutely")
+
+    assert service.status()["next_wake_at_ms"] == fast.state.next_run_at_ms
+
+    service.enable_job(fast.id, enabled=False)
+    assert service.status()["next_wake_at_ms"] == slow.state.next_run_at_ms
+
+    service.enable_job(fast.id, enabled=True)
+    assert service.status()["next_wake_at_ms"] == fast.state.next_run_at_ms
+
+    assert service.remove_job(fast.id)
+    assert service.status()["next_wake_at_ms"] == slow.state.next_run_at_ms
+    assert [j.id for j in service.list_jobs()] == [slow.id]
+
+    reopened = CronService(tmp_path / "jobs.db")
+    assert [j.id for j in reopened.list_jobs()] == [slow.id]
+
+
+@pytest.mark.asyncio
+async def test_timer_runs_only_due_jobs_and_reschedules(tmp_path) -> None:
+    ran: list[str] = []
+
+    async def on_job(job: CronJob) -> str:
+        ran.append(job.name)
+        return "ok"
+
+    service = CronService(tmp_path / "jobs.db", on_job=on_job)
+    due = service.add_job("due", _every(60), "x")
+    later = service.add_job("later", _every(3600), "y")
+    once = service.add_job(
+        "once", CronSchedule(kind="at", at_ms=int(time.time() * 1000) + 60_000), "z",
+        delete_after_run=True,
+    )
+    # Pretend both slots have come around.
+    for job in (due, once):
+        job.state.next_run_at_ms = int(time.time() * 1000) - 1
+        service._schedule(job)
+
+    await service._on_timer()
+    await asyncio.gather(*service._run_tasks)
+
+    assert sorted(ran) == ["due", "once"]
+    assert once.id not in {j.id for j in service.list_jobs(include_disabled=True)}
+    assert due.state.next_run_at_ms > int(time.time() * 1000)
+    assert service.status()["next_wake_at_ms"] == due.state.next_run_at_ms
+    assert later.state.last_run_at_ms is None
+
+
+def test_legacy_json_store_is_migrated(tmp_path) -> None:
+    legacy = tmp_path / "jobs.json"
+    legacy.write_text(json.dumps({"version": 1, "jobs": [{
+        "id": "abc123",
+        "name": "daily",
+        "schedule": {"kind": "cron", "expr": "0 9 * * *"},
+        "payload": {"message": "good morning"},
+        "state": {"lastStatus": "ok"},
+    }]}))
+
+    jobs = CronService(tmp_path / "jobs.db").list_jobs()
+
+    assert [(j.id, j.payload.message, j.state.last_status) for j in jobs] == [
+        ("abc123", "good morning", "ok")
+    ]
+    assert not legacy.exists()
+    assert (tmp_path / "jobs.json.migrated").exists()
+
+
+def test_changes_from_another_process_are_picked_up(tmp_path) -> None:
+    scheduler = CronService(tmp_path / "jobs.db")
+    assert scheduler.list_jobs() == []
+
+    other = CronService(tmp_path / "jobs.db")
+    job = other.add_job("reminder", _every(60), "ping")
+    other.enable_job(job.id, enabled=False)
+
+    listed = scheduler.list_jobs(include_disabled=True)
+    assert [(j.id, j.enabled) for j in listed] == [(job.id, False)]
+
+
+def _make_due(service: CronService, *jobs: CronJob, late_ms: int = 1) -> None:
+    for job in jobs:
+        job.state.next_run_at_ms = int(time.time() * 1000) - late_ms
+        service._schedule(job)
+
+
+@pytest.mark.asyncio
+async def test_due_jobs_run_concurrently_within_pool_limit(tmp_path) -> None:
+    active = 0
+    peak = 0
+
+    async def on_job(job: CronJob) -> str:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        return "ok"
+
+    service = CronService(tmp_path / "jobs.db", on_job=on_job, max_concurrency=3)
+    jobs = [service.add_job(f"job {i}", _every(60), "x") for i in range(6)]
+    _make_due(service, *jobs, late_ms=250)
+
+    start = time.perf_counter()
+    await service._on_timer()
+    await asyncio.gather(*service._run_tasks)
+
+    assert peak == 3
+    assert time.perf_counter() - start < 0.25  # two waves, not six sequential runs
+    assert all(j.state.last_status == "ok" for j in jobs)
+    assert all(j.state.last_lateness_ms >= 250 for j in jobs)
+
+
+@pytest.mark.asyncio
+async def test_hung_job_times_out_and_overlapping_slot_is_skipped(tmp_path) -> None:
+    release = asyncio.Event()
+
+    async def on_job(job: CronJob) -> str:
+        if job.name == "hung":
+            await release.wait()
+        return "ok"
+
+    service = CronService(tmp_path / "jobs.db", on_job=on_job)
+    hung = service.add_job("hung", _every(60), "x", timeout_s=0.05)
+    quick = service.add_job("quick", _every(60), "y")
+    _make_due(service, hung, quick)
+    await service._on_timer()
+    await asyncio.sleep(0.01)
+
+    assert quick.state.last_status == "ok"
+    _make_due(service, hung)
+    await service._on_timer()
+    assert hung.state.last_status == "skipped"
+
+    await asyncio.gather(*service._run_tasks)
+    assert hung.state.last_status == "error"
+    assert "timed out" in hung.state.last_error
+    assert service.status()["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_runs_are_recorded_with_bounded_retention_and_metrics(tmp_path) -> None:
+    async def on_job(job: CronJob) -> str:
+        CronService.current_run().tokens = 42
+        if job.name == "broken":
+            raise RuntimeError("boom")
+        return "hello"
+
+    service = CronService(tmp_path / "jobs.db", on_job=on_job, history_limit=3)
+    good = service.add_job("good", _every(60), "x")
+    broken = service.add_job("broken", _every(60), "y")
+
+    for _ in range(5):
+        _make_due(service, good, broken, late_ms=100)
+        await service._on_timer()
+        await asyncio.gather(*service._run_tasks)
+
+    runs = service.history(good.id)
+    assert len(runs) == 3
+    assert runs[0].status == "ok"
+    assert runs[0].tokens == 42
+    assert runs[0].response_chars == 5
+    assert runs[0].lateness_ms >= 100
+
+    metrics = service.metrics()
+    assert metrics["all"]["runs"] == 6
+    assert metrics["jobs"][broken.id]["errors"] == 3
+    assert metrics["jobs"][good.id]["tokens"] == 126
+    assert metrics["all"]["lateness_max_ms"] >= 100
+
+    service.remove_job(broken.id)
+    assert service.history(broken.id) == []
+
+
+def _ms(dt: datetime) -> int:
+    return int(dt.timestamp() * 1000)
+
+
+def test_cron_expressions_follow_their_timezone_across_dst() -> None:
+    berlin = ZoneInfo("Europe/Berlin")
+    schedule = CronSchedule(kind="cron", expr="0 9 * * *", tz="Europe/Berlin")
+
+    # Germany moves to summer time on 2026-03-29.
+    before = _compute_next_run(schedule, _ms(datetime(2026, 3, 27, 12, tzinfo=berlin)))
+    after = _compute_next_run(schedule, before)
+
+    assert datetime.fromtimestamp(before / 1000, berlin) == datetime(2026, 3, 28, 9, tzinfo=berlin)
+    assert datetime.fromtimestamp(after / 1000, berlin) == datetime(2026, 3, 29, 9, tzinfo=berlin)
+    assert after - before == 23 * 3600 * 1000
+
+    # One parsed iterator per (expression, timezone).
+    _compute_next_run(CronSchedule(kind="cron", expr="0 9 * * *", tz="Europe/Berlin"), after)
+    assert len([k for k in cron_service._cron_cache if k == ("0 9 * * *", "Europe/Berlin")]) == 1
+
+
+def test_invalid_timezone_or_expression_is_rejected(tmp_path) -> None:
+    service = CronService(tmp_path / "jobs.db")
+    with pytest.raises(ValueError):
+        service.add_job("x", CronSchedule(kind="cron", expr="0 9 * * *", tz="Mars/Olympus"), "m")
+    with pytest.raises(ValueError):
+        service.add_job("x", CronSchedule(kind="cron", expr="not a cron"), "m")
+    assert service.list_jobs() == []
+
+
+@pytest.mark.parametrize("policy, expected_runs", [("once", 1), ("skip", 0), ("all", 3)])
+@pytest.mark.asyncio
+async def test_misfire_policy_after_downtime(tmp_path, policy, expected_runs) -> None:
+    ran: list[int | None] = []
+
+    async def on_job(job: CronJob) -> str:
+        ran.append(CronService.current_run().scheduled_at_ms)
+        return "ok"
+
+    service = CronService(tmp_path / "jobs.db", misfire_grace_s=1)
+    job = service.add_job("every 10 min", _every(600), "x", misfire=policy)
+    # The gateway was down for ~25 minutes: three slots were missed.
+    job.state.next_run_at_ms = int(time.time() * 1000) - 25 * 60 * 1000
+    service._save(job)
+    service.stop()
+
+    restarted = CronService(tmp_path / "jobs.db", on_job=on_job, misfire_grace_s=1)
+    await restarted.start()
+    await restarted._on_timer()
+    await asyncio.gather(*restarted._run_tasks)
+    restarted.stop()
+
+    assert len(ran) == expected_runs
+    assert ran == sorted(ran)
+    history = restarted.history(job.id)
+    assert history[0].status == ("skipped" if policy == "skip" else "ok")
+    assert restarted.list_jobs()[0].state.next_run_at_ms > int(time.time() * 1000)
+
+
+def test_scheduler_operations_scale_to_100k_jobs(tmp_path) -> None:
+    service = CronService(tmp_path / "jobs.db")
+    service._load_store()
+    now = int(time.time() * 1000)
+    for i in range(100_000):
+        job = CronJob(
+            id=f"j{i}",
+            name=f"job {i}",
+            schedule=_every(60 + i),
+            state=CronJobState(next_run_at_ms=now + 60_000 + i),
+        )
+        service._jobs[job.id] = job
+    service._rebuild_heap()
+
+    start = time.perf_counter()
+    for i in range(0, 100_000, 10):
+        job = service._jobs[f"j{i}"]
+        job.state.next_run_at_ms += 1_000_000
+        service._schedule(job)
+        assert service._get_next_wake_ms() is not None
+    due = service._pop_due(now + 60_000 + 999)
+    elapsed = time.perf_counter() - start
+
+    # 10k reschedules + 10k next-wake lookups + popping ~900 due jobs.
+    assert len(due) == 900
+    assert elapsed < 2.0
+    assert len(service._heap) <= 2 * len(service._jobs) + 64
+
+
+@pytest.mark.asyncio
+async def test_processes_sharing_a_store_fire_only_their_own_jobs(tmp_path) -> None:
+    ran: dict[str, list[str]] = {"a": [], "b": []}
+
+    def worker(name: str) -> CronService:
+        async def on_job(job: CronJob) -> str:
+            ran[name].append(job.name)
+            return "ok"
+
+        return CronService(
+            tmp_path / "jobs.db",
+            on_job=on_job,
+            owns=lambda job: (job.payload.to == "alice") == (name == "a"),
+        )
+
+    a, b = worker("a"), worker("b")
+    await a.start()
+    await b.start()
+    a.add_job("for alice", _every(60), "x", channel="telegram", to="alice")
+    b.add_job("for bob", _every(60), "y", channel="telegram", to="bob")
+
+    for service in (a, b):
+        service._load_store()
+        _make_due(service, *service.list_jobs())
+        await service._on_timer()
+        await asyncio.gather(*service._run_tasks)
+        service.stop()
+
+    assert ran == {"a": ["for alice"], "b": ["for bob"]}
+
+
+@pytest.mark.asyncio
+async def test_one_shot_job_runs_once_when_another_process_writes_meanwhile(tmp_path) -> None:
+    ran: list[str] = []
+    other = CronService(tmp_path / "jobs.db")
+
+    async def on_job(job: CronJob) -> str:
+        ran.append(job.name)
+        # Another worker commits while this run is in progress; pick it up
+        # both incrementally and through a full reload.
+        other.add_job("elsewhere", _every(3600), "y")
+        await service._on_timer()
+        service._reload()
+        await service._on_timer()
+        return "ok"
+
+    service = CronService(tmp_path / "jobs.db", on_job=on_job)
+    once = service.add_job(
+        "once", CronSchedule(kind="at", at_ms=int(time.time() * 1000) + 60_000), "z"
+    )
+    _make_due(service, once)
+
+    await service._on_timer()
+    while service._run_tasks:
+        await asyncio.gather(*service._run_tasks)
+
+    assert ran == ["once"]
+    assert [(r.status, r.error) for r in service.history(once.id)] == [("ok", None)]
+    assert service._jobs[once.id].state.last_status == "ok"
+
+
+def test_other_processes_changes_are_applied_without_a_full_reload(tmp_path, monkeypatch) -> None:
+    scheduler = CronService(tmp_path / "jobs.db")
+    kept = scheduler.add_job("kept", _every(60), "a")
+    other = CronService(tmp_path / "jobs.db")
+    gone = other.add_job("gone", _every(60), "b")
+    assert {j.id for j in scheduler.list_jobs()} == {kept.id, gone.id}
+
+    monkeypatch.setattr(scheduler, "_reload", lambda: pytest.fail("full reload"))
+    added = other.add_job("added", _every(30), "c")
+    other.remove_job(gone.id)
+    other._db.add_run(cron_service.CronRun(job_id=added.id, started_at_ms=0), keep=10)
+
+    assert {j.id for j in scheduler.list_jobs()} == {kept.id, added.id}
+    # Untouched jobs keep their objects; the new job is armed.
+    assert scheduler._jobs[kept.id] is kept
+    assert scheduler.status()["next_wake_at_ms"] == scheduler._jobs[added.id].state.next_run_at_ms
+
+
+def test_readers_behind_trimmed_tombstones_fall_back_to_a_full_reload(tmp_path) -> None:
+    scheduler = CronService(tmp_path / "jobs.db")
+    scheduler.add_job("kept", _every(60), "a")
+    other = CronService(tmp_path / "jobs.db")
+    doomed = [other.add_job(f"doomed {i}", _every(60), "b") for i in range(3)]
+    other._db.TOMBSTONES_KEPT = 1
+    for job in doomed:
+        other.remove_job(job.id)
+    other._db.compact()
+
+    assert [j.name for j in scheduler.list_jobs()] == ["kept"]
+
+
+def test_store_written_before_change_tracking_is_upgraded(tmp_path) -> None:
+    import sqlite3
+
+    from nanobot.cron.store import job_to_dict
+
+    job = CronJob(id="old1", name="old", schedule=_every(60))
+    conn = sqlite3.connect(tmp_path / "jobs.db")
+    conn.execute("CREATE TABLE jobs (id TEXT PRIMARY KEY, data TEXT NOT NULL)")
+    conn.execute("INSERT INTO jobs VALUES (?, ?)", (job.id, json.dumps(job_to_dict(job))))
+    conn.commit()
+    conn.close()
+
+    scheduler = CronService(tmp_path / "jobs.db")
+    assert [j.id for j in scheduler.list_jobs()] == ["old1"]
+    added = CronService(tmp_path / "jobs.db").add_job("new", _every(60), "x")
+    assert {j.id for j in scheduler.list_jobs()} == {"old1", added.id}
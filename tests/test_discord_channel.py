@@ -0,0 +1,121 @@
+import json
+import time
+
+import httpx
+import pytest
+
+from nanobot.bus.events import OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.discord import DiscordChannel
+from nanobot.config.schema import DiscordConfig
+
+
+def _channel() -> DiscordChannel:
+    return DiscordChannel(DiscordConfig(enabled=True, token="t"), MessageBus())
+
+
+class _FakeGateway:
+    def __init__(self, *events: dict):
+        self.events = [json.dumps(e) for e in events]
+        self.sent: list[dict] = []
+        self.close_code: int | None = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        if not self.events:
+            raise StopAsyncIteration
+        return self.events.pop(0)
+
+    async def send(self, raw: str) -> None:
+        self.sent.append(json.loads(raw))
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        self.close_code = code
+
+
+@pytest.mark.asyncio
+async def test_sends_wait_for_exhausted_bucket_instead_of_hitting_429() -> None:
+    sent_at: list[float] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent_at.append(time.monotonic())
+        remaining = "0" if len(sent_at) == 1 else "4"
+        return httpx.Response(200, json={}, headers={
+            "X-RateLimit-Bucket": "abc",
+            "X-RateLimit-Remaining": remaining,
+            "X-RateLimit-Reset-After": "0.2",
+        })
+
+    channel = _channel()
+    channel._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    await channel.send(OutboundMessage(channel="discord", chat_id="42", content="one"))
+    await channel.send(OutboundMessage(channel="discord", chat_id="42", content="two"))
+
+    assert len(sent_at) == 2
+    assert sent_at[1] - sent_at[0] >= 0.2
+    await channel._http.aclose()
+
+
+@pytest.mark.asyncio
+async def test_global_429_is_retried_after_retry_after() -> None:
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            return httpx.Response(429, json={"retry_after": 0.1, "global": True})
+        return httpx.Response(200, json={})
+
+    channel = _channel()
+    channel._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    start = time.monotonic()
+    await channel.send(OutboundMessage(channel="discord", chat_id="42", content="hi"))
+
+    assert calls == 2
+    assert time.monotonic() - start >= 0.1
+    await channel._http.aclose()
+
+
+@pytest.mark.asyncio
+async def test_reconnect_resumes_session_and_invalid_session_reidentifies() -> None:
+    channel = _channel()
+    channel._ws = _FakeGateway(
+        {"op": 10, "d": {"heartbeat_interval": 45000}},
+        {"op": 0, "t": "READY", "s": 1, "d": {
+            "session_id": "sess", "resume_gateway_url": "wss://resume.discord.gg",
+        }},
+        {"op": 0, "t": "GUILD_CREATE", "s": 2, "d": {}},
+        {"op": 7, "d": None},
+    )
+    await channel._gateway_loop()
+    assert channel._ws.sent[0]["op"] == 2
+    assert channel._gateway_url() == "wss://resume.discord.gg/?v=10&encoding=json"
+
+    channel._ws = _FakeGateway({"op": 10, "d": {"heartbeat_interval": 45000}})
+    await channel._gateway_loop()
+    assert channel._ws.sent == [
+        {"op": 6, "d": {"token": "t", "session_id": "sess", "seq": 2}}
+    ]
+
+    channel._ws = _FakeGateway({"op": 9, "d": False})
+    await channel._gateway_loop()
+    assert [p["op"] for p in channel._ws.sent] == [2]
+    assert channel._session_id is None
+    assert channel._gateway_url() == channel.config.gateway_url
+
+
+@pytest.mark.asyncio
+async def test_reconnect_closes_with_a_code_that_keeps_the_session_resumable() -> None:
+    channel = _channel()
+    channel._session_id, channel._seq = "sess", 2
+    channel._ws = _FakeGateway({"op": 7, "d": None})
+    await channel._gateway_loop()
+    assert channel._ws.close_code not in (None, 1000, 1001)
+
+    channel._ws = _FakeGateway({"op": 9, "d": True})
+    await channel._gateway_loop()
+    assert channel._ws.close_code not in (None, 1000, 1001)
+    assert channel._session_id == "sess"
@@ -39,49 +39,134 @@ def _make_raw_email(
     return msg.as_bytes()
 
 
-def test_fetch_new_messages_parses_unseen_and_marks_seen(monkeypatch) -> None:
-    raw = _make_raw_email(subject="Invoice", body="Please pay")
-
-    class FakeIMAP:
-        def __init__(self) -> None:
-            self.store_calls: list[tuple[bytes, str, str]] = []
-
-        def login(self, _user: str, _pw: str):
-            return "OK", [b"logged in"]
-
-        def select(self, _mailbox: str):
-            return "OK", [b"1"]
+@pytest.fixture(autouse=True)
+def _state_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr("nanobot.channels.email.get_data_path", lambda: tmp_path)
+
+
+class FakeIMAP:
+    """In-memory mailbox answering the UID commands the channel issues."""
+
+    def __init__(self, messages: dict[int, bytes] | None = None, uidvalidity: int = 1) -> None:
+        self.messages = dict(messages or {})
+        self.seen: set[int] = set()
+        self.uidvalidity = uidvalidity
+        self.logins = 0
+        self.commands: list[tuple[str, ...]] = []
+
+    def login(self, _user: str, _pw: str):
+        self.logins += 1
+        return "OK", [b"logged in"]
+
+    def select(self, _mailbox: str):
+        return "OK", [str(len(self.messages)).encode()]
+
+    def response(self, code: str):
+        return code, [str(self.uidvalidity).encode()]
+
+    def uid(self, command: str, *args: str):
+        self.commands.append((command, *args))
+        if command == "SEARCH":
+            uids = sorted(self.messages)
+            if "UNSEEN" in args:
+                uids = [u for u in uids if u not in self.seen]
+            if "UID" in args:
+                low = int(args[args.index("UID") + 1].split(":")[0])
+                # Like real servers, "n:*" still matches the newest message.
+                uids = [u for u in uids if u >= low or u == max(self.messages)]
+            return "OK", [" ".join(map(str, uids)).encode()]
+        if command == "FETCH":
+            data: list = []
+            for uid in self._expand(args[0]):
+                raw = self.messages[uid]
+                if "HEADER.FIELDS" in args[1]:
+                    raw = raw.split(b"\n\n", 1)[0] + b"\n\n"
+                elif "<0." in args[1]:
+                    raw = raw[: int(args[1].split("<0.")[1].split(">")[0])]
+                data += [(f"{uid} (UID {uid} BODY[] {{{len(raw)}}}".encode(), raw), b")"]
+            return "OK", data
+        if command == "STORE":
+            self.seen.update(self._expand(args[0]))
+            return "OK", [b""]
+        raise AssertionError(command)
 
-        def search(self, *_args):
-            return "OK", [b"1"]
+    @staticmethod
+    def _expand(uid_set: str) -> list[int]:
+        uids: list[int] = []
+        for part in uid_set.split(","):
+            low, _, high = part.partition(":")
+            uids.extend(range(int(low), int(high or low) + 1))
+        return uids
 
-        def fetch(self, _imap_id: bytes, _parts: str):
-            return "OK", [(b"1 (UID 123 BODY[] {200})", raw), b")"]
+    def capability(self):
+        return "OK", [b"IMAP4rev1"]
 
-        def store(self, imap_id: bytes, op: str, flags: str):
-            self.store_calls.append((imap_id, op, flags))
-            return "OK", [b""]
+    def logout(self):
+        return "BYE", [b""]
 
-        def logout(self):
-            return "BYE", [b""]
 
-    fake = FakeIMAP()
+def test_fetch_new_messages_parses_unseen_and_marks_seen(monkeypatch) -> None:
+    raw = _make_raw_email(subject="Invoice", body="Please pay")
+    fake = FakeIMAP({123: raw})
     monkeypatch.setattr("nanobot.channels.email.imaplib.IMAP4_SSL", lambda _h, _p: fake)
 
-    channel = EmailChannel(_make_config(), MessageBus())
+    cfg = _make_config()
+    cfg.allow_from = ["alice@example.com"]
+    channel = EmailChannel(cfg, MessageBus())
     items = channel._fetch_new_messages()
 
     assert len(items) == 1
     assert items[0]["sender"] == "alice@example.com"
     assert items[0]["subject"] == "Invoice"
     assert "Please pay" in items[0]["content"]
-    assert fake.store_calls == [(b"1", "+FLAGS", "\\Seen")]
+    assert ("STORE", "123", "+FLAGS", "(\\Seen)") in fake.commands
 
-    # Same UID should be deduped in-process.
+    # Same UID is not handed out again, even if it becomes unread.
+    fake.seen.clear()
     items_again = channel._fetch_new_messages()
     assert items_again == []
 
 
+def test_backlog_is_fetched_in_batches_with_persisted_high_water_mark(monkeypatch) -> None:
+    messages = {
+        uid: _make_raw_email(
+            from_addr="alice@example.com" if uid % 2 else "spam@example.net",
+            subject=f"#{uid}",
+            body="x" * 5000,
+        )
+        for uid in range(1, 251)
+    }
+    fake = FakeIMAP(messages)
+    monkeypatch.setattr("nanobot.channels.email.imaplib.IMAP4_SSL", lambda _h, _p: fake)
+    cfg = _make_config()
+    cfg.allow_from = ["alice@example.com"]
+    cfg.max_fetch_bytes = 1000
+
+    items = EmailChannel(cfg, MessageBus())._fetch_new_messages()
+
+    assert [i["subject"] for i in items] == [f"#{uid}" for uid in range(1, 251, 2)]
+    assert all(len(i["content"]) < 1000 for i in items)
+    # 1 search + 3 batches x (headers, bodies, store) instead of ~500 round trips.
+    assert len(fake.commands) == 10
+    assert fake.seen == set(messages)
+    # Bodies are only downloaded for allowed senders, and only up to the cap.
+    bodies = [u for c in fake.commands if c[0] == "FETCH" and "<0.1000>" in c[2]
+              for u in FakeIMAP._expand(c[1])]
+    assert bodies == list(range(1, 251, 2))
+
+    # A restarted channel resumes after the stored high-water mark.
+    fake.messages[251] = _make_raw_email(subject="#251")
+    fake.seen.clear()
+    items = EmailChannel(cfg, MessageBus())._fetch_new_messages()
+    assert [i["subject"] for i in items] == ["#251"]
+
+    # A new UIDVALIDITY invalidates the mark.
+    fake.uidvalidity = 2
+    fake.seen = set(messages)
+    items = EmailChannel(cfg, MessageBus())._fetch_new_messages()
+    assert [i["subject"] for i in items] == ["#251"]
+
+
 def test_extract_text_body_falls_back_to_html() -> None:
     msg = EmailMessage()
     msg["From"] = "alice@example.com"
@@ -267,45 +352,203 @@ async def test_send_skips_when_consent_not_granted(monkeypatch) -> None:
 
 def test_fetch_messages_between_dates_uses_imap_since_before_without_mark_seen(monkeypatch) -> None:
     raw = _make_raw_email(subject="Status", body="Yesterday update")
+    fake = FakeIMAP({999: raw})
+    monkeypatch.setattr("nanobot.channels.email.imaplib.IMAP4_SSL", lambda _h, _p: fake)
+
+    channel = EmailChannel(_make_config(), MessageBus())
+    items = channel.fetch_messages_between_dates(
+        start_date=date(2026, 2, 6),
+        end_date=date(2026, 2, 7),
+        limit=10,
+    )
 
-    class FakeIMAP:
-        def __init__(self) -> None:
-            self.search_args = None
-            self.store_calls: list[tuple[bytes, str, str]] = []
+    assert len(items) == 1
+    assert items[0]["subject"] == "Status"
+    assert fake.commands[0] == ("SEARCH", "SINCE", "06-Feb-2026", "BEFORE", "07-Feb-2026")
+    assert not any(c[0] == "STORE" for c in fake.commands)
 
-        def login(self, _user: str, _pw: str):
-            return "OK", [b"logged in"]
 
-        def select(self, _mailbox: str):
-            return "OK", [b"1"]
+class _IdleIMAP(FakeIMAP):
+    """Fake IMAP session that announces one new mail while idling."""
 
-        def search(self, *_args):
-            self.search_args = _args
-            return "OK", [b"5"]
+    def __init__(self, raw: bytes, announce: bool = True) -> None:
+        import queue
 
-        def fetch(self, _imap_id: bytes, _parts: str):
-            return "OK", [(b"5 (UID 999 BODY[] {200})", raw), b")"]
+        super().__init__()
+        self.raw = raw
+        self.announce = announce
+        self.sent: list[bytes] = []
+        self.lines: queue.Queue[bytes] = queue.Queue()
 
-        def store(self, imap_id: bytes, op: str, flags: str):
-            self.store_calls.append((imap_id, op, flags))
-            return "OK", [b""]
+    def capability(self):
+        return "OK", [b"IMAP4rev1 IDLE"]
+
+    def send(self, data: bytes) -> None:
+        self.sent.append(data)
+        if data.endswith(b" IDLE\r\n"):
+            self.tag = data.split()[0]
+            self.lines.put(b"+ idling\r\n")
+            if self.announce and len(self.sent) == 1:
+                self.messages[1] = self.raw
+                self.lines.put(b"* 1 EXISTS\r\n")
+        elif data == b"DONE\r\n":
+            self.lines.put(self.tag + b" OK IDLE terminated\r\n")
+
+    def readline(self) -> bytes:
+        return self.lines.get()
+
+    def socket(self):
+        fake = self
+
+        class _Sock:
+            def settimeout(self, _t) -> None:
+                pass
+
+            def shutdown(self, _how) -> None:
+                fake.lines.put(b"")
 
-        def logout(self):
-            return "BYE", [b""]
+        return _Sock()
 
-    fake = FakeIMAP()
+    def logout(self):
+        return "BYE", [b""]
+
+
+@pytest.mark.asyncio
+async def test_idle_delivers_new_mail_on_one_persistent_session(monkeypatch) -> None:
+    import asyncio
+
+    fake = _IdleIMAP(_make_raw_email(subject="Ping", body="new mail"))
     monkeypatch.setattr("nanobot.channels.email.imaplib.IMAP4_SSL", lambda _h, _p: fake)
+    cfg = _make_config()
+    cfg.allow_from = ["alice@example.com"]
+    bus = MessageBus()
+    channel = EmailChannel(cfg, bus)
+
+    task = asyncio.create_task(channel.start())
+    msg = await asyncio.wait_for(bus.consume_inbound(), 2)
+    assert "new mail" in msg.content
 
+    # Back in IDLE on the same session after handling the notification.
+    while len(fake.sent) < 3:
+        await asyncio.sleep(0.01)
+    await channel.stop()
+    await asyncio.wait_for(task, 2)
+
+    assert fake.logins == 1
+    assert fake.sent[1] == b"DONE\r\n" and fake.sent[2].endswith(b" IDLE\r\n")
+
+
+def test_idle_wait_polls_again_for_mail_announced_during_fetch() -> None:
+    fake = _IdleIMAP(b"", announce=False)
+    fake.untagged_responses = {"EXISTS": [b"3"], "RECENT": [b"1"], "FLAGS": [b"()"]}
     channel = EmailChannel(_make_config(), MessageBus())
-    items = channel.fetch_messages_between_dates(
-        start_date=date(2026, 2, 6),
-        end_date=date(2026, 2, 7),
-        limit=10,
-    )
+    channel._imap = fake
+    channel._running = True
 
-    assert len(items) == 1
-    assert items[0]["subject"] == "Status"
-    # search(None, "SINCE", "06-Feb-2026", "BEFORE", "07-Feb-2026")
-    assert fake.search_args is not None
-    assert fake.search_args[1:] == ("SINCE", "06-Feb-2026", "BEFORE", "07-Feb-2026")
-    assert fake.store_calls == []
+    channel._idle_wait()
+
+    assert fake.sent == []
+    assert fake.untagged_responses == {"FLAGS": [b"()"]}
+
+
+def test_idle_wait_handles_untagged_lines_before_continuation() -> None:
+    fake = _IdleIMAP(b"", announce=False)
+    fake.lines.put(b"* 4 EXISTS\r\n")
+    fake.lines.put(b"* 1 RECENT\r\n")
+    channel = EmailChannel(_make_config(), MessageBus())
+    channel._imap = fake
+    channel._running = True
+
+    channel._idle_wait()
+
+    # The EXISTS seen before "+" ends IDLE right away instead of failing it.
+    assert fake.sent[0].endswith(b" IDLE\r\n")
+    assert fake.sent[1] == b"DONE\r\n"
+    assert fake.lines.empty()
+
+
+@pytest.mark.asyncio
+async def test_reconnects_with_backoff_after_connection_failure(monkeypatch) -> None:
+    import asyncio
+
+    fake = _IdleIMAP(_make_raw_email())
+    attempts: list[str] = []
+
+    def _connect(host, _p):
+        attempts.append(host)
+        if len(attempts) < 3:
+            raise OSError("connection refused")
+        return fake
+
+    monkeypatch.setattr("nanobot.channels.email.imaplib.IMAP4_SSL", _connect)
+    monkeypatch.setattr(EmailChannel, "_RECONNECT_MIN_S", 0.01)
+    cfg = _make_config()
+    cfg.imap_idle = False
+    channel = EmailChannel(cfg, MessageBus())
+
+    task = asyncio.create_task(channel.start())
+    while fake.logins == 0:
+        await asyncio.sleep(0.01)
+    await channel.stop()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert len(attempts) == 3
+    assert fake.logins == 1
+
+
+@pytest.mark.asyncio
+async def test_send_reuses_pooled_smtp_session_and_relogs_after_drop(monkeypatch) -> None:
+    import smtplib
+
+    class FakeSMTP:
+        def __init__(self, _host: str, _port: int, timeout: int = 30) -> None:
+            self.logins = 0
+            self.sent: list[EmailMessage] = []
+            self.dropped = False
+            self.quit_called = False
+
+        def starttls(self, context=None):
+            return None
+
+        def login(self, _user: str, _pw: str):
+            self.logins += 1
+
+        def noop(self):
+            return (421, b"closing") if self.dropped else (250, b"OK")
+
+        def send_message(self, msg: EmailMessage):
+            if self.dropped:
+                raise smtplib.SMTPServerDisconnected("gone")
+            self.sent.append(msg)
+
+        def quit(self):
+            self.quit_called = True
+
+    sessions: list[FakeSMTP] = []
+
+    def _smtp_factory(host: str, port: int, timeout: int = 30):
+        sessions.append(FakeSMTP(host, port, timeout=timeout))
+        return sessions[-1]
+
+    monkeypatch.setattr("nanobot.channels.email.smtplib.SMTP", _smtp_factory)
+    channel = EmailChannel(_make_config(), MessageBus())
+
+    async def reply(text: str) -> None:
+        await channel.send(OutboundMessage(channel="email", chat_id="alice@example.com", content=text))
+
+    for i in range(3):
+        await reply(f"reply {i}")
+    assert len(sessions) == 1
+    assert sessions[0].logins == 1 and len(sessions[0].sent) == 3
+
+    # The server closed the idle session: NOOP fails and a new one logs in.
+    sessions[0].dropped = True
+    await reply("after drop")
+    assert len(sessions) == 2
+    assert sessions[0].quit_called
+    assert len(sessions[1].sent) == 1
+
+    await channel.stop()
+    assert sessions[1].quit_called
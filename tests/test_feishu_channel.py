@@ -0,0 +1,78 @@
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from nanobot.bus.events import OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.feishu import FeishuChannel
+from nanobot.config.schema import FeishuConfig
+
+
+class _SlowMessageAPI:
+    """Stands in for client.im.v1.message with a blocking HTTP call."""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+        self.cards: list[dict] = []
+        self._lock = threading.Lock()
+
+    def create(self, request):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.1)
+        with self._lock:
+            self.active -= 1
+            self.cards.append(json.loads(request.request_body.content))
+
+        class _Response:
+            def success(self) -> bool:
+                return True
+
+        return _Response()
+
+
+@pytest.mark.asyncio
+async def test_send_does_not_block_event_loop_and_bounds_concurrency() -> None:
+    channel = FeishuChannel(FeishuConfig(send_concurrency=2), MessageBus())
+    api = _SlowMessageAPI()
+    channel._client = SimpleNamespace(im=SimpleNamespace(v1=SimpleNamespace(message=api)))
+
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticking = asyncio.create_task(ticker())
+    await asyncio.gather(*(
+        channel.send(OutboundMessage(channel="feishu", chat_id="oc_1", content=f"reply {i}"))
+        for i in range(4)
+    ))
+    ticking.cancel()
+
+    assert len(api.cards) == 4
+    assert api.peak == 2
+    # Two waves of 100 ms each; the loop kept running meanwhile.
+    assert ticks >= 10
+    await channel.stop()
+
+
+@pytest.mark.asyncio
+async def test_channel_sends_again_after_stop() -> None:
+    channel = FeishuChannel(FeishuConfig(), MessageBus())
+    api = _SlowMessageAPI()
+    channel._client = SimpleNamespace(im=SimpleNamespace(v1=SimpleNamespace(message=api)))
+
+    await channel.stop()
+    await channel.send(OutboundMessage(channel="feishu", chat_id="oc_1", content="after restart"))
+
+    assert len(api.cards) == 1
+    await channel.stop()
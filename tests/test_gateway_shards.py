@@ -0,0 +1,231 @@
+import asyncio
+
+import pytest
+
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.ipc import ShardRouter, WorkerBus, shard_for
+from nanobot.bus.queue import MessageBus
+
+
+class _FakeWorkerProcess:
+    """Stands in for a worker subprocess: an echo agent on a WorkerBus."""
+
+    def __init__(self, socket_path, shard: int):
+        self.pid = 1000 + shard
+        self.returncode: int | None = None
+        self.bus = WorkerBus(socket_path, shard)
+        self._tasks = [
+            asyncio.create_task(self.bus.run_link()),
+            asyncio.create_task(self._echo(shard)),
+        ]
+        self._exited = asyncio.Event()
+
+    async def _echo(self, shard: int) -> None:
+        from nanobot.bus.events import OutboundMessage
+
+        while True:
+            msg = await self.bus.consume_inbound()
+            await self.bus.publish_outbound(
+                OutboundMessage(
+                    channel=msg.channel,
+                    chat_id=msg.chat_id,
+                    content=f"{shard}:{msg.content}",
+                )
+            )
+            self.bus.ack_inbound(msg)
+
+    async def wait(self) -> int:
+        await self._exited.wait()
+        return self.returncode or 0
+
+    def terminate(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self.returncode = 0
+        self._exited.set()
+
+    kill = terminate
+
+
+def test_shard_for_is_stable_and_spreads_sessions() -> None:
+    keys = [f"telegram:{i}" for i in range(400)]
+    first = [shard_for(k, 4) for k in keys]
+
+    assert first == [shard_for(k, 4) for k in keys]
+    assert all(first.count(i) > 50 for i in range(4))
+    assert shard_for("telegram:1", 1) == 0
+
+
+def test_shard_for_only_moves_sessions_of_new_worker() -> None:
+    keys = [f"slack:{i}" for i in range(400)]
+    moved = [k for k in keys if shard_for(k, 4) != shard_for(k, 5)]
+
+    assert moved
+    assert all(shard_for(k, 5) == 4 for k in moved)
+
+
+@pytest.mark.asyncio
+async def test_router_keeps_sessions_on_one_worker_and_acks_turns(tmp_path) -> None:
+    bus = MessageBus(wal_path=tmp_path / "inbound.db")
+    socket_path = tmp_path / "workers.sock"
+
+    async def spawn(shard: int) -> _FakeWorkerProcess:
+        return _FakeWorkerProcess(socket_path, shard)
+
+    router = ShardRouter(bus, socket_path, workers=2, spawn_worker=spawn)
+    await router.start()
+    try:
+        for chat in ("a", "b", "c"):
+            for i in range(3):
+                await bus.publish_inbound(
+                    InboundMessage(channel="telegram", sender_id="u", chat_id=chat, content=str(i))
+                )
+
+        replies: dict[str, list[str]] = {}
+        for _ in range(9):
+            out = await asyncio.wait_for(bus.consume_outbound(), timeout=5)
+            replies.setdefault(out.chat_id, []).append(out.content)
+
+        for chat, contents in replies.items():
+            shard = shard_for(f"telegram:{chat}", 2)
+            assert contents == [f"{shard}:0", f"{shard}:1", f"{shard}:2"]
+
+        for _ in range(50):
+            if len(bus.wal) == 0:
+                break
+            await asyncio.sleep(0.02)
+        assert len(bus.wal) == 0
+        assert all(s["in_flight"] == 0 for s in router.get_status().values())
+    finally:
+        await router.stop()
+        bus.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_sends_replies_before_acknowledging_the_turn(tmp_path) -> None:
+    import json
+
+    from nanobot.bus.events import OutboundMessage
+
+    socket_path = tmp_path / "workers.sock"
+    frames: list[dict] = []
+    done = asyncio.Event()
+
+    async def front_end(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await reader.readline()  # hello
+        msg = InboundMessage(channel="telegram", sender_id="u", chat_id="a", content="hi")
+        writer.write(json.dumps({"type": "inbound", "id": 7, "message": msg.to_dict()}).encode() + b"\n")
+        await writer.drain()
+        while len(frames) < 3:
+            frames.append(json.loads(await reader.readline()))
+        done.set()
+
+    server = await asyncio.start_unix_server(front_end, path=str(socket_path))
+    bus = WorkerBus(socket_path, 0)
+    link = asyncio.create_task(bus.run_link())
+    try:
+        msg = await asyncio.wait_for(bus.consume_inbound(), timeout=5)
+        for part in ("one", "two"):
+            await bus.publish_outbound(OutboundMessage(channel="telegram", chat_id="a", content=part))
+        bus.ack_inbound(msg)
+        await asyncio.wait_for(done.wait(), timeout=5)
+    finally:
+        link.cancel()
+        server.close()
+
+    assert [(f["type"], f.get("id")) for f in frames] == [("outbound", None), ("outbound", None), ("ack", 7)]
+
+
+class _SilentWorkerProcess:
+    """A worker that never connects, so everything routed to it stays queued."""
+
+    pid = 999
+    returncode = None
+
+    def __init__(self) -> None:
+        self._exited = asyncio.Event()
+
+    async def wait(self) -> int:
+        await self._exited.wait()
+        return 0
+
+    def terminate(self) -> None:
+        self._exited.set()
+
+    kill = terminate
+
+
+@pytest.mark.asyncio
+async def test_shard_queues_apply_the_bus_bound_and_overflow_policy(tmp_path) -> None:
+    bus = MessageBus(inbound_maxsize=2, overflow_policy="busy", wal_path=tmp_path / "inbound.db")
+    socket_path = tmp_path / "workers.sock"
+
+    async def spawn(shard: int) -> _SilentWorkerProcess:
+        return _SilentWorkerProcess()
+
+    router = ShardRouter(bus, socket_path, workers=1, spawn_worker=spawn)
+    await router.start()
+    try:
+        for i in range(5):
+            await bus.publish_inbound(
+                InboundMessage(channel="telegram", sender_id="u", chat_id="a", content=str(i))
+            )
+        busy = [await asyncio.wait_for(bus.consume_outbound(), timeout=5) for _ in range(3)]
+
+        assert [m.content for m in busy] == [bus.busy_message] * 3
+        assert router.get_status()[0]["queued"] == 2
+        # Rejected messages are acknowledged; the queued ones stay durable.
+        assert len(bus.wal) == 2
+    finally:
+        await router.stop()
+        bus.close()
+
+
+@pytest.mark.asyncio
+async def test_router_hands_workers_a_bounded_window_of_messages(tmp_path) -> None:
+    bus = MessageBus()
+    socket_path = tmp_path / "workers.sock"
+    workers: list[WorkerBus] = []
+
+    class _StalledWorker(_SilentWorkerProcess):
+        def __init__(self) -> None:
+            super().__init__()
+            self.bus = WorkerBus(socket_path, 0)
+            workers.append(self.bus)
+            self.link = asyncio.create_task(self.bus.run_link())
+
+        def terminate(self) -> None:
+            self.link.cancel()
+            super().terminate()
+
+    async def spawn(shard: int) -> _StalledWorker:
+        return _StalledWorker()
+
+    router = ShardRouter(bus, socket_path, workers=1, spawn_worker=spawn, max_in_flight=2)
+    await router.start()
+    try:
+        for i in range(5):
+            await bus.publish_inbound(
+                InboundMessage(channel="telegram", sender_id="u", chat_id="a", content=str(i))
+            )
+        for _ in range(100):
+            if workers and workers[0].inbound_size == 2:
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+
+        assert workers[0].inbound_size == 2
+        assert router.get_status()[0] | {"pid": None} == {
+            "connected": True, "queued": 3, "in_flight": 2, "pid": None,
+        }
+
+        first = await workers[0].consume_inbound()
+        workers[0].ack_inbound(first)
+        for _ in range(100):
+            if router.get_status()[0]["queued"] == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert router.get_status()[0]["in_flight"] == 2
+    finally:
+        await router.stop()
+        bus.close()
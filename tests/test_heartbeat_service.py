@@ -0,0 +1,107 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from nanobot.heartbeat.scheduler import HeartbeatScheduler
+from nanobot.heartbeat.service import HEARTBEAT_OK_TOKEN, HeartbeatService
+
+
+def _service(tmp_path, replies: list[str], **kwargs) -> tuple[HeartbeatService, list[str]]:
+    calls: list[str] = []
+
+    async def on_heartbeat(prompt: str) -> str:
+        calls.append(prompt)
+        return replies.pop(0) if replies else HEARTBEAT_OK_TOKEN
+
+    return HeartbeatService(tmp_path, on_heartbeat=on_heartbeat, **kwargs), calls
+
+
+@pytest.mark.asyncio
+async def test_unchanged_heartbeat_skips_llm_after_ok(tmp_path) -> None:
+    (tmp_path / "HEARTBEAT.md").write_text("- Check the build status\n")
+    service, calls = _service(tmp_path, [HEARTBEAT_OK_TOKEN])
+
+    await service.tick()
+    await service.tick()
+    await service.tick()
+
+    assert len(calls) == 1
+    assert service.skipped == 2
+
+    (tmp_path / "HEARTBEAT.md").write_text("- Check the build status\n- Water the plants\n")
+    await service.tick()
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_referenced_file_change_and_pending_work_trigger_a_turn(tmp_path) -> None:
+    (tmp_path / "todo.md").write_text("nothing yet")
+    (tmp_path / "HEARTBEAT.md").write_text("- Work through [the list](todo.md)\n")
+    service, calls = _service(tmp_path, ["Did a thing", HEARTBEAT_OK_TOKEN])
+
+    await service.tick()  # not OK: keep checking
+    await service.tick()  # OK: remember the fingerprint
+    await service.tick()
+    assert len(calls) == 2
+
+    todo = tmp_path / "todo.md"
+    todo.write_text("- renew passport")
+    stat = todo.stat()
+    os.utime(todo, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    await service.tick()
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_recheck_interval_forces_turn_even_if_unchanged(tmp_path) -> None:
+    (tmp_path / "HEARTBEAT.md").write_text("- Check email\n")
+    service, calls = _service(tmp_path, [], recheck_s=0.01)
+
+    await service.tick()
+    service._ok_at -= 1
+    await service.tick()
+
+    assert len(calls) == 2
+
+
+def test_jitter_spreads_delay_around_interval(tmp_path) -> None:
+    service = HeartbeatService(tmp_path, interval_s=600, jitter_s=60)
+    delays = {service.next_delay() for _ in range(50)}
+    assert all(540 <= d <= 660 for d in delays)
+    assert len(delays) > 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_staggers_workspaces_within_concurrency_limit(tmp_path) -> None:
+    workspaces = []
+    for i in range(4):
+        ws = tmp_path / f"tenant{i}"
+        ws.mkdir()
+        (ws / "HEARTBEAT.md").write_text(f"- task for tenant {i}\n")
+        workspaces.append(ws)
+
+    fired: list[tuple[float, str]] = []
+    active = 0
+    peak = 0
+
+    async def on_heartbeat(workspace, prompt: str) -> str:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        fired.append((time.monotonic(), workspace.name))
+        await asyncio.sleep(0.15)
+        active -= 1
+        return "did something"
+
+    scheduler = HeartbeatScheduler(
+        workspaces, on_heartbeat=on_heartbeat, interval_s=0.2, max_concurrency=2
+    )
+    await scheduler.start()
+    await asyncio.sleep(0.19)
+    scheduler.stop()
+
+    assert [name for _, name in fired[:2]] == ["tenant0", "tenant1"]
+    assert fired[1][0] - fired[0][0] >= 0.04  # spread over the interval, not all at once
+    assert peak <= 2
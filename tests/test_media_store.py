@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+
+import httpx
+import pytest
+
+from nanobot.channels.media import MediaStore, MediaTooLargeError
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+@pytest.mark.asyncio
+async def test_same_content_is_stored_once_and_known_keys_skip_download(tmp_path) -> None:
+    store = MediaStore(tmp_path)
+    first = await store.save_stream(_chunks(b"pho", b"to"), ".jpg", key="telegram:a")
+    again = await store.save_stream(_chunks(b"photo"), ".JPG", key="telegram:b")
+
+    assert first == again and first.suffix == ".jpg"
+    assert first.read_bytes() == b"photo"
+    assert [p.name for p in tmp_path.iterdir() if not p.name.startswith(".")] == [first.name]
+    assert not list((tmp_path / ".tmp").iterdir())
+
+    requests = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal requests
+        requests += 1
+        return httpx.Response(200, content=b"photo")
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        reopened = MediaStore(tmp_path)
+        assert await reopened.download(client, "https://x/y", key="telegram:b") == first
+        assert await reopened.download(client, "https://x/z", ".jpg", key="discord:1") == first
+    assert requests == 1
+
+
+@pytest.mark.asyncio
+async def test_oversized_downloads_are_refused_without_leftovers(tmp_path) -> None:
+    store = MediaStore(tmp_path, max_file_bytes=4)
+    with pytest.raises(MediaTooLargeError):
+        await store.save_stream(_chunks(b"abc", b"def"))
+
+    src = store.temp_path(".bin")
+    src.write_bytes(b"too big")
+    with pytest.raises(MediaTooLargeError):
+        store.add_file(src)
+
+    assert not list((tmp_path / ".tmp").iterdir())
+    assert [p for p in tmp_path.iterdir() if not p.name.startswith(".")] == []
+
+
+@pytest.mark.asyncio
+async def test_gc_evicts_expired_then_least_recently_used(tmp_path) -> None:
+    store = MediaStore(tmp_path, max_bytes=10, max_age_s=3600, gc_interval_s=3600)
+    old = await store.save_stream(_chunks(b"old"), key="k:old")
+    a = await store.save_stream(_chunks(b"aaaa"), key="k:a")
+    b = await store.save_stream(_chunks(b"bbbb"))
+    c = await store.save_stream(_chunks(b"cccc"))
+    now = time.time()
+    os.utime(old, (now - 7200, now - 7200))
+    os.utime(a, (now - 30, now - 30))
+    os.utime(b, (now - 20, now - 20))
+    os.utime(c, (now - 10, now - 10))
+    assert store.lookup("k:a") == a  # marks it as recently used
+
+    assert store.gc() == 7
+    assert not old.exists() and not b.exists()
+    assert a.exists() and c.exists()
+    assert store.lookup("k:old") is None
+
+
+@pytest.mark.asyncio
+async def test_periodic_gc_runs_off_the_event_loop(tmp_path) -> None:
+    store = MediaStore(tmp_path, gc_interval_s=0)
+    threads: list[threading.Thread] = []
+    gc = store.gc
+
+    def recording_gc(keep=None) -> int:
+        threads.append(threading.current_thread())
+        return gc(keep)
+
+    store.gc = recording_gc
+    path = await store.save_stream(_chunks(b"photo"))
+
+    assert path.exists()
+    assert threads and threads[0] is not threading.main_thread()
+
+
+class _InterleavingLock:
+    """Lock that runs a loop-side action the next times the GC thread takes it."""
+
+    def __init__(self, *actions):
+        self._lock = threading.Lock()
+        self._actions = list(actions)
+        self._busy = False
+
+    def __enter__(self):
+        if self._actions and not self._busy:
+            self._busy = True
+            action = self._actions.pop(0)
+            if action:
+                action()
+            self._busy = False
+        self._lock.acquire()
+
+    def __exit__(self, *exc) -> None:
+        self._lock.release()
+
+
+@pytest.mark.asyncio
+async def test_gc_keeps_files_used_or_stored_while_it_runs(tmp_path) -> None:
+    store = MediaStore(tmp_path / "media", max_age_s=3600, gc_interval_s=3600)
+    a = await store.save_stream(_chunks(b"aaaa"), key="k:a")
+    b = await store.save_stream(_chunks(b"bbbb"), key="k:b")
+    now = time.time()
+    os.utime(a, (now - 7300, now - 7300))
+    os.utime(b, (now - 7200, now - 7200))
+    src = tmp_path / "again"
+    src.write_bytes(b"bbbb")
+
+    store._lock = _InterleavingLock(
+        lambda: store.lookup("k:a"),  # before evicting a: a is used again
+        None,  # b is evicted
+        lambda: store.add_file(src, key="k:b2"),  # before pruning: b is stored again
+    )
+    assert store.gc() == 4
+
+    assert store.lookup("k:a") == a and a.exists()
+    assert store.lookup("k:b2") == b and b.exists()
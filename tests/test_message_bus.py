@@ -0,0 +1,198 @@
+import asyncio
+
+import pytest
+
+from nanobot.bus.events import (
+    PRIORITY_INTERACTIVE,
+    PRIORITY_SCHEDULED,
+    PRIORITY_SYSTEM,
+    InboundMessage,
+)
+from nanobot.bus.queue import MessageBus
+
+
+def _msg(chat_id: str, content: str, channel: str = "telegram") -> InboundMessage:
+    return InboundMessage(channel=channel, sender_id="u", chat_id=chat_id, content=content)
+
+
+@pytest.mark.asyncio
+async def test_block_policy_waits_for_free_slot() -> None:
+    bus = MessageBus(inbound_maxsize=1, overflow_policy="block")
+    await bus.publish_inbound(_msg("a", "first"))
+
+    producer = asyncio.create_task(bus.publish_inbound(_msg("a", "second")))
+    await asyncio.sleep(0.01)
+    assert not producer.done()
+
+    assert (await bus.consume_inbound()).content == "first"
+    await asyncio.wait_for(producer, timeout=0.5)
+    assert (await bus.consume_inbound()).content == "second"
+    assert bus.get_stats()["blocked"] == 1
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_prefers_same_session() -> None:
+    bus = MessageBus(inbound_maxsize=2, overflow_policy="drop_oldest")
+    await bus.publish_inbound(_msg("a", "a1"))
+    await bus.publish_inbound(_msg("b", "b1"))
+    await bus.publish_inbound(_msg("b", "b2"))
+
+    contents = [(await bus.consume_inbound()).content for _ in range(2)]
+    assert contents == ["a1", "b2"]
+    assert bus.get_stats()["dropped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_coalesce_merges_into_queued_message_of_same_session() -> None:
+    bus = MessageBus(inbound_maxsize=2, overflow_policy="coalesce")
+    await bus.publish_inbound(_msg("a", "hello"))
+    await bus.publish_inbound(_msg("b", "other"))
+    await bus.publish_inbound(_msg("a", "are you there?"))
+
+    first = await bus.consume_inbound()
+    assert first.content == "hello\n\nare you there?"
+    assert bus.inbound_size == 1
+    assert bus.get_stats()["coalesced"] == 1
+
+
+@pytest.mark.asyncio
+async def test_busy_policy_rejects_and_notifies_sender() -> None:
+    bus = MessageBus(inbound_maxsize=1, overflow_policy="busy", busy_message="busy!")
+    await bus.publish_inbound(_msg("a", "first"))
+    await bus.publish_inbound(_msg("b", "second"))
+
+    assert bus.inbound_size == 1
+    notice = await asyncio.wait_for(bus.consume_outbound(), timeout=0.2)
+    assert notice.chat_id == "b"
+    assert notice.content == "busy!"
+    assert bus.get_stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stats_track_depth_and_wait_time() -> None:
+    bus = MessageBus()
+    await bus.publish_inbound(_msg("a", "1"))
+    await bus.publish_inbound(_msg("a", "2"))
+    await asyncio.sleep(0.02)
+    await bus.consume_inbound()
+
+    stats = bus.get_stats()
+    assert stats["max_depth"] == 2
+    assert stats["consumed"] == 1
+    assert stats["last_wait_ms"] >= 10
+
+
+def test_unknown_overflow_policy_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        MessageBus(overflow_policy="shrug")
+
+
+@pytest.mark.asyncio
+async def test_interactive_messages_overtake_background_burst() -> None:
+    bus = MessageBus()
+    for i in range(30):
+        await bus.publish_inbound(
+            InboundMessage(
+                channel="system",
+                sender_id="subagent",
+                chat_id="telegram:a",
+                content=f"done {i}",
+                priority=PRIORITY_SYSTEM,
+            )
+        )
+    for i in range(5):
+        await bus.publish_inbound(
+            InboundMessage(
+                channel="cli", sender_id="user", chat_id="direct",
+                content=f"cron {i}", priority=PRIORITY_SCHEDULED,
+            )
+        )
+    await bus.publish_inbound(_msg("human", "hello?"))
+
+    first = [await bus.consume_inbound() for _ in range(3)]
+
+    assert "hello?" in [m.content for m in first]
+    lanes = bus.get_stats()["lanes"]
+    assert lanes["system"]["size"] + lanes["scheduled"]["size"] == 33
+
+
+@pytest.mark.asyncio
+async def test_weighted_fair_share_across_lanes() -> None:
+    bus = MessageBus(priority_weights={"interactive": 2, "system": 1, "scheduled": 1})
+    for i in range(8):
+        await bus.publish_inbound(_msg(str(i), f"user {i}"))
+        await bus.publish_inbound(
+            InboundMessage(
+                channel="cli", sender_id="user", chat_id="direct",
+                content=f"sched {i}", priority=PRIORITY_SCHEDULED,
+            )
+        )
+
+    order = [(await bus.consume_inbound()).priority for _ in range(9)]
+
+    assert order.count(PRIORITY_INTERACTIVE) == 6
+    assert order.count(PRIORITY_SCHEDULED) == 3
+    assert (await bus.consume_inbound()).enqueued_at is not None
+
+
+@pytest.mark.asyncio
+async def test_background_messages_are_never_shed() -> None:
+    bus = MessageBus(inbound_maxsize=1, overflow_policy="busy")
+    await bus.publish_inbound(_msg("a", "first"))
+
+    producer = asyncio.create_task(bus.publish_inbound(
+        InboundMessage(
+            channel="system", sender_id="subagent", chat_id="telegram:a",
+            content="result", priority=PRIORITY_SYSTEM,
+        )
+    ))
+    await asyncio.sleep(0.01)
+    assert not producer.done()
+
+    await bus.consume_inbound()
+    await asyncio.wait_for(producer, timeout=0.5)
+    assert (await bus.consume_inbound()).content == "result"
+    assert bus.get_stats()["rejected"] == 0
+
+
+@pytest.mark.asyncio
+async def test_durable_bus_replays_unacknowledged_messages(tmp_path) -> None:
+    wal_path = tmp_path / "inbound.db"
+    bus = MessageBus(wal_path=wal_path)
+    await bus.publish_inbound(_msg("a", "answered"))
+    await bus.publish_inbound(_msg("b", "in flight"))
+    await bus.publish_inbound(
+        InboundMessage(
+            channel="cli", sender_id="user", chat_id="direct",
+            content="heartbeat", priority=PRIORITY_SCHEDULED,
+        )
+    )
+
+    done = await bus.consume_inbound()
+    bus.ack_inbound(done)
+    await bus.consume_inbound()  # taken by the agent, then the process dies
+    bus.close()
+
+    restarted = MessageBus(wal_path=wal_path)
+    assert restarted.recover() == 1
+    replayed = await restarted.consume_inbound()
+    assert replayed.content == "in flight"
+    assert replayed.chat_id == "b"
+
+    restarted.ack_inbound(replayed)
+    restarted.close()
+    assert MessageBus(wal_path=wal_path).recover() == 0
+
+
+@pytest.mark.asyncio
+async def test_durable_bus_acks_shed_and_rewrites_coalesced_messages(tmp_path) -> None:
+    wal_path = tmp_path / "inbound.db"
+    bus = MessageBus(inbound_maxsize=1, overflow_policy="coalesce", wal_path=wal_path)
+    await bus.publish_inbound(_msg("a", "one"))
+    await bus.publish_inbound(_msg("a", "two"))
+    bus.close()
+
+    restarted = MessageBus(wal_path=wal_path)
+    assert restarted.recover() == 1
+    assert (await restarted.consume_inbound()).content == "one\n\ntwo"
+    restarted.close()
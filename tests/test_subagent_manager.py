@@ -0,0 +1,170 @@
+import asyncio
+
+import pytest
+
+from nanobot.agent.subagent import SubagentManager
+from nanobot.agent.tools.base import ToolContext
+from nanobot.agent.tools.spawn import SpawnTool
+from nanobot.bus.queue import MessageBus
+from nanobot.config.schema import SubagentConfig
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+
+
+class _SlowProvider(LLMProvider):
+    """Answers after a delay; optionally keeps calling tools forever."""
+
+    def __init__(self, delay: float = 0.05, loop_tools: bool = False, tokens: int = 10):
+        super().__init__()
+        self.delay = delay
+        self.loop_tools = loop_tools
+        self.tokens = tokens
+        self.active = 0
+        self.peak = 0
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        usage = {"total_tokens": self.tokens}
+        if self.loop_tools:
+            return LLMResponse(
+                content=None,
+                tool_calls=[ToolCallRequest(id="1", name="list_dir", arguments={"path": "."})],
+                usage=usage,
+            )
+        return LLMResponse(content="done", usage=usage)
+
+    def get_default_model(self) -> str:
+        return "fake"
+
+
+def _manager(tmp_path, provider: LLMProvider, **limits) -> tuple[SubagentManager, MessageBus]:
+    bus = MessageBus()
+    manager = SubagentManager(
+        provider=provider,
+        workspace=tmp_path,
+        bus=bus,
+        subagent_config=SubagentConfig(**limits),
+    )
+    return manager, bus
+
+
+async def _drain(bus: MessageBus, n: int) -> list[str]:
+    return [(await asyncio.wait_for(bus.consume_inbound(), 2)).content for _ in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_spawns_beyond_limits_wait_in_queue(tmp_path) -> None:
+    provider = _SlowProvider()
+    manager, bus = _manager(tmp_path, provider, max_concurrent=2, max_per_session=1)
+
+    replies = [
+        await manager.spawn("a1", origin_channel="telegram", origin_chat_id="a"),
+        await manager.spawn("a2", origin_channel="telegram", origin_chat_id="a"),
+        await manager.spawn("b1", origin_channel="telegram", origin_chat_id="b"),
+        await manager.spawn("c1", origin_channel="telegram", origin_chat_id="c"),
+    ]
+
+    assert ["started" in r for r in replies] == [True, False, True, False]
+    assert manager.get_running_count() == 2
+
+    results = await _drain(bus, 4)
+    assert all("completed successfully" in r for r in results)
+    assert provider.peak == 2
+    assert {t.status for t in manager.list_tasks()} == {"ok"}
+
+
+@pytest.mark.asyncio
+async def test_token_budget_and_timeout_stop_runaway_subagents(tmp_path) -> None:
+    manager, bus = _manager(
+        tmp_path, _SlowProvider(delay=0.01, loop_tools=True, tokens=400), token_budget=1000
+    )
+    await manager.spawn("loop forever")
+    (announce,) = await _drain(bus, 1)
+    assert "failed" in announce and "budget 1000" in announce
+
+    manager, bus = _manager(tmp_path, _SlowProvider(delay=1.0), timeout_s=0.05)
+    await manager.spawn("too slow")
+    (announce,) = await _drain(bus, 1)
+    assert "time limit" in announce
+    assert manager.list_tasks()[0].status == "timeout"
+
+
+@pytest.mark.asyncio
+async def test_spawn_tool_lists_and_cancels_tasks(tmp_path) -> None:
+    manager, bus = _manager(tmp_path, _SlowProvider(delay=1.0), max_per_session=1)
+    tool = SpawnTool(manager)
+    ctx = ToolContext(channel="slack", chat_id="c1")
+
+    await tool.execute(task="first job", label="first", context=ctx)
+    await tool.execute(task="second job", label="second", context=ctx)
+    second = manager.list_tasks()[1]
+    assert second.status == "queued"
+    assert second.session_key == "slack:c1"
+
+    listing = await tool.execute(action="list", context=ctx)
+    assert "first" in listing and "running" in listing
+    assert "second" in listing and "queued" in listing
+    assert await tool.execute(action="list", context=ToolContext("slack", "c2")) == (
+        "No background tasks."
+    )
+
+    await tool.execute(action="cancel", task_id=second.id, context=ctx)
+    first = manager.list_tasks()[0]
+    await tool.execute(action="cancel", task_id=first.id, context=ctx)
+    await asyncio.sleep(0.01)
+
+    assert manager.get_running_count() == 0
+    assert [t.status for t in manager.list_tasks()] == ["cancelled", "cancelled"]
+    assert bus.inbound_size == 0
+
+
+class _RecordingProvider(_SlowProvider):
+    def __init__(self) -> None:
+        super().__init__(delay=0)
+        self.tool_lists: list = []
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+        self.tool_lists.append(tools)
+        return await super().chat(messages, tools, model, max_tokens, temperature)
+
+
+@pytest.mark.asyncio
+async def test_subagents_share_one_frozen_tool_set(tmp_path) -> None:
+    provider = _RecordingProvider()
+    manager, bus = _manager(tmp_path, provider)
+    tools = manager.tools
+
+    await manager.spawn("one", origin_chat_id="a")
+    await manager.spawn("two", origin_chat_id="b")
+    await _drain(bus, 2)
+
+    assert manager.tools is tools and tools.frozen
+    first, second = provider.tool_lists
+    assert first is second
+    assert {d["function"]["name"] for d in first} >= {"read_file", "exec", "web_fetch"}
+    with pytest.raises(RuntimeError):
+        tools.register(SpawnTool(manager))
+
+
+@pytest.mark.asyncio
+async def test_spawn_tool_cannot_cancel_another_chats_task(tmp_path) -> None:
+    manager, _ = _manager(tmp_path, _SlowProvider(delay=1.0))
+    tool = SpawnTool(manager)
+    owner = ToolContext(channel="slack", chat_id="c1")
+
+    await tool.execute(task="private job", label="private", context=owner)
+    record = manager.list_tasks()[0]
+
+    result = await tool.execute(
+        action="cancel", task_id=record.id, context=ToolContext("slack", "c2")
+    )
+    assert result.startswith("Error")
+    assert record.status == "running"
+
+    await tool.execute(action="cancel", task_id=record.id, context=owner)
+    await asyncio.sleep(0.01)
+    assert record.status == "cancelled"
@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from telegram.error import BadRequest, RetryAfter
+
+from nanobot.bus.events import OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.media import MediaStore, MediaTooLargeError
+from nanobot.channels.telegram import (
+    TELEGRAM_MAX_MESSAGE_LEN,
+    TelegramChannel,
+    _markdown_to_telegram_html,
+    _split_markdown,
+)
+from nanobot.config.schema import TelegramConfig
+
+
+def test_long_replies_split_between_lines_and_keep_code_blocks_whole() -> None:
+    code = "```python\n" + "\n".join(f"print({i})  # <&>" for i in range(400)) + "\n```"
+    text = "\n".join(f"**Point {i}**: " + "word " * 30 for i in range(60)) + "\n\n" + code
+
+    chunks = _split_markdown(text)
+
+    assert len(chunks) > 2
+    for chunk in chunks:
+        html = _markdown_to_telegram_html(chunk)
+        assert len(html) <= TELEGRAM_MAX_MESSAGE_LEN
+        assert chunk.count("```") % 2 == 0
+        assert html.count("<b>") == html.count("</b>")
+    rendered = "".join(_markdown_to_telegram_html(c) for c in chunks)
+    assert rendered.count("print(") == 400
+    assert _split_markdown("short") == ["short"]
+
+
+def test_single_huge_line_is_cut_at_whitespace() -> None:
+    chunks = _split_markdown("lorem " * 2000, limit=500)
+    assert all(len(_markdown_to_telegram_html(c)) <= 500 for c in chunks)
+    assert " ".join(chunks).split() == ["lorem"] * 2000
+
+
+class _FakeBot:
+    def __init__(self) -> None:
+        self.sent: list[tuple[int, str, str | None]] = []
+        self.fail_with: list[Exception] = []
+
+    async def send_message(self, chat_id: int, text: str, parse_mode: str | None = None) -> None:
+        if self.fail_with:
+            raise self.fail_with.pop(0)
+        self.sent.append((chat_id, text, parse_mode))
+
+
+def _channel() -> tuple[TelegramChannel, _FakeBot]:
+    channel = TelegramChannel(TelegramConfig(token="t"), MessageBus())
+    bot = _FakeBot()
+
+    class _App:
+        pass
+
+    channel._app = _App()
+    channel._app.bot = bot
+    return channel, bot
+
+
+@pytest.mark.asyncio
+async def test_send_waits_out_retry_after_and_falls_back_to_plain_text(monkeypatch) -> None:
+    channel, bot = _channel()
+    bot.fail_with = [RetryAfter(0), BadRequest("Can't parse entities")]
+
+    await channel.send(OutboundMessage(channel="telegram", chat_id="42", content="**hi**"))
+
+    assert bot.sent == [(42, "**hi**", None)]
+
+
+@pytest.mark.asyncio
+async def test_group_sends_are_paced_and_ordered(monkeypatch) -> None:
+    monkeypatch.setattr(TelegramChannel, "GROUP_CHAT_RATE", (20.0, 2.0))
+    channel, bot = _channel()
+
+    start = time.monotonic()
+    await asyncio.gather(*(
+        channel.send(OutboundMessage(channel="telegram", chat_id="-100", content=f"m{i}"))
+        for i in range(6)
+    ))
+    elapsed = time.monotonic() - start
+
+    assert [text for _, text, _ in bot.sent] == [f"m{i}" for i in range(6)]
+    # Burst of 2, then 4 more at 20/s.
+    assert elapsed >= 0.18
+
+
+@pytest.mark.asyncio
+async def test_media_download_stops_at_the_size_cap(tmp_path) -> None:
+    channel = TelegramChannel(
+        TelegramConfig(token="t"), MessageBus(), media_store=MediaStore(tmp_path, max_file_bytes=10)
+    )
+
+    async def body():
+        for _ in range(100):
+            yield b"x" * 4
+
+    # No content-length and a small declared file_size: only streaming catches it.
+    channel._http = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body()))
+    )
+
+    class _Bot:
+        async def get_file(self, file_id: str):
+            class _File:
+                file_path = "https://api.telegram.org/file/bott/photos/1.jpg"
+
+            return _File()
+
+    class _App:
+        bot = _Bot()
+
+    class _Photo:
+        file_id = "f1"
+        file_unique_id = "u1"
+        file_size = 4
+
+    channel._app = _App()
+    with pytest.raises(MediaTooLargeError):
+        await channel._download_media(_Photo(), "image")
+
+    assert [p for p in tmp_path.iterdir() if not p.name.startswith(".")] == []
+    await channel._http.aclose()
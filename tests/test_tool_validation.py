@@ -1,6 +1,9 @@
+import asyncio
+import time
 from typing import Any
 
-from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.base import Tool, ToolContext
+from nanobot.agent.tools.message import MessageTool
 from nanobot.agent.tools.registry import ToolRegistry
 
 
@@ -86,3 +89,53 @@ async def test_registry_returns_validation_error() -> None:
     reg.register(SampleTool())
     result = await reg.execute("sample", {"query": "hi"})
     assert "Invalid parameters" in result
+
+
+def test_registry_caches_definitions_until_tools_change() -> None:
+    reg = ToolRegistry()
+    reg.register(SampleTool())
+    defs = reg.get_definitions()
+    assert reg.get_definitions() is defs
+
+    reg.unregister("sample")
+    assert reg.get_definitions() == []
+
+
+async def test_concurrent_turns_keep_their_own_context() -> None:
+    sent = []
+
+    async def send(msg) -> None:
+        await asyncio.sleep(0.01)
+        sent.append((msg.channel, msg.chat_id, msg.content))
+
+    reg = ToolRegistry()
+    reg.register(MessageTool(send_callback=send))
+    a = ToolContext(channel="telegram", chat_id="a")
+    b = ToolContext(channel="slack", chat_id="b")
+
+    await asyncio.gather(
+        reg.execute("message", {"content": "to a"}, a),
+        reg.execute("message", {"content": "to b"}, b),
+    )
+
+    assert sorted(sent) == [("slack", "b", "to b"), ("telegram", "a", "to a")]
+    assert [(name, ok) for name, _, ok in a.calls] == [("message", True)]
+
+
+async def test_registry_honours_deadline_and_cancellation() -> None:
+    async def hang(msg) -> None:
+        await asyncio.sleep(10)
+
+    reg = ToolRegistry()
+    reg.register(MessageTool(send_callback=hang))
+    ctx = ToolContext(channel="cli", chat_id="x", deadline=time.monotonic() + 0.05)
+
+    result = await reg.execute("message", {"content": "hi"}, ctx)
+    assert "ran out of time" in result
+    assert await reg.execute("message", {"content": "hi"}, ctx) == (
+        "Error: message not run, the turn ran out of time"
+    )
+
+    ctx = ToolContext(channel="cli", chat_id="x")
+    ctx.cancel()
+    assert "cancelled" in await reg.execute("message", {"content": "hi"}, ctx)